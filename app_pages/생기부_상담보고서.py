@@ -1,12 +1,24 @@
 # pages/생기부_상담보고서.py
 import streamlit as st
 import pandas as pd
+import hmac
+import os
+import time
+import uuid
 
 from utils.sidebar import render_sidebar
-from utils.parser_seteuk import load_seteuk
-from utils.parser_haengteuk import load_haengteuk
-from utils.parser_changche import load_changche
-from utils.ai_report_generator import generate_sh_insight_report
+from utils.ingest import load_batch
+from utils.frame_memory import compact_frame, memory_report
+from utils.record_archive import RecordArchive
+from utils.duplicate_sentences import find_duplicate_sentences, clusters_table
+from utils.student_store import StudentStore
+from utils.text_builder import build_student_texts, build_student_sections
+from utils.report_batch import ReportJob, generate_reports, generate_reports_live
+from utils.report_bulk import bulk_reports, discard_run, list_runs, poll_bulk, start_bulk
+from utils.prompt_budget import fit_to_budget, SOURCE_TOKEN_BUDGET
+from utils.evidence_check import EVIDENCE_MODE, unverified_count
+from utils.report_routing import LATENCY_TARGET, calibrate, route as route_report
+from utils import llm_backend, llm_cache, llm_ledger
 
 # ✅ UI/PDF/Chart
 from utils.report_ui import inject_report_css, render_report_modal
@@ -39,40 +51,171 @@ def normalize_id_series(s: pd.Series) -> pd.Series:
     return s.astype(str).str.strip()
 
 # -----------------------------
-# 유틸: 원문 텍스트 추출 (빈약/기록없음 방지)
+# 유틸: 세특/행특/창체 DF → 세션 명렬·학생 인덱스
 # -----------------------------
-def extract_text(df: pd.DataFrame) -> str:
-    if df is None or df.empty:
-        return ""
+def prepare_roster(df_seteuk: pd.DataFrame, df_haeng: pd.DataFrame, df_chang: pd.DataFrame):
+    # 번호 통일
+    for df in (df_seteuk, df_haeng, df_chang):
+        id_col = get_id_col(df)
+        if id_col in df.columns:
+            df[id_col] = normalize_id_series(df[id_col])
+
+    # 학생 명렬 생성(기존 로직 유지)
+    frames = []
+    for df in (df_seteuk, df_haeng, df_chang):
+        id_col = get_id_col(df)
+        if {id_col, "성명"}.issubset(df.columns):
+            tmp = df[[id_col, "성명"]].copy()
+            tmp.columns = ["번호", "성명"]  # 표준
+            frames.append(tmp)
+
+    df_students = (
+        pd.concat(frames, ignore_index=True)
+        .dropna()
+        .drop_duplicates()
+    )
 
-    drop_cols = {"번호", "학번", "학생번호", "성명", "이름", "학년", "반", "담임", "과목", "영역", "구분"}
-    cols = [c for c in df.columns if str(c).strip() and str(c) not in drop_cols]
-    if not cols:
-        return ""
+    df_students["번호"] = df_students["번호"].astype(str).str.strip()
+    df_students = df_students[df_students["번호"].str.isdigit()]
+
+    if df_students.empty:
+        st.error("학생 명렬을 생성할 수 없습니다.")
+        st.stop()
+
+    def mask_name(x):
+        x = str(x)
+        return x[0] + "ㅇ" + x[-1] if len(x) >= 3 else x
+
+    df_students["성명"] = df_students["성명"].apply(mask_name)
+
+    # 세션에 오래 보관하므로 반복 값은 category, 긴 원문은 Arrow 문자열로 압축
+    raw_frames = {"세특": df_seteuk, "행특": df_haeng, "창체": df_chang}
+    compact = {k: compact_frame(v) for k, v in raw_frames.items()}
+    st.session_state["frames_memory"] = memory_report(compact, before=raw_frames)
+
+    st.session_state["df_seteuk"] = compact["세특"]
+    st.session_state["df_haeng"] = compact["행특"]
+    st.session_state["df_chang"] = compact["창체"]
+
+    # 학생별 인덱스(세특/행특/창체 조각 + 학년 수)를 한 번만 만들어 둠
+    store = StudentStore(compact["세특"], compact["행특"], compact["창체"])
+    st.session_state["student_store"] = store
+
+    eligibility = store.eligibility(df_students["번호"].tolist())
+    st.session_state.pop("duplicate_table", None)
+    st.session_state["students_table"] = pd.DataFrame({
+        "선택": [False] * len(df_students),
+        "학번": df_students["번호"].tolist(),
+        "성명": df_students["성명"].tolist(),
+        "자료 학년 수": eligibility["자료 학년 수"].tolist(),
+        "생성 가능": eligibility["생성 가능"].tolist(),
+    })
+
+
+# -----------------------------
+# 유틸: 기록 보관소 (학기별 내보내기 누적)
+# -----------------------------
+@st.cache_resource
+def get_archive() -> RecordArchive:
+    return RecordArchive()
+
+@st.cache_resource
+def get_llm_backend() -> llm_backend.LLMBackend:
+    # 모든 세션이 같은 백엔드(= 같은 연결 풀)를 씀. 클라이언트는 첫 요청 때 만들어 API 키도 그때 읽음
+    return llm_backend.get_backend()
+
+llm_backend.set_backend(get_llm_backend())
+
+def uploaded_ids(frames) -> list:
+    ids = set()
+    for df in frames.values():
+        id_col = get_id_col(df)
+        if id_col in df.columns:
+            ids.update(normalize_id_series(df[id_col].dropna()))
+    return sorted(ids)
+
+# -----------------------------
+# 유틸: 생성 결과 마무리 (즉시 생성·대량 배치 공통)
+# -----------------------------
+def finish_reports(results: list) -> None:
+    """results: 명렬 순서의 (학번, 성명, 보고서 또는 안내 문구). 근거 검증 안내·첫 보고서 모달·결과 목록 저장."""
+    first_report = None
+    first_meta = None
+    first_radar_png = None
+    first_pdf_bytes = None
+
+    # 원문에서 찾지 못한 '평가 근거 문장' (drop 모드면 보고서·PDF에서 이미 빠짐)
+    unverified = {sid: unverified_count(r) for sid, _, r in results if isinstance(r, dict) and unverified_count(r)}
+    if unverified:
+        action = "보고서에서 제외했습니다" if EVIDENCE_MODE == "drop" else "보고서에 ⚠️로 표시했습니다"
+        st.caption(
+            f"🔎 원문에서 찾지 못한 평가 근거 문장 {sum(unverified.values())}개({len(unverified)}명)를 {action}."
+        )
+
+    # ✅ (5) 레이더 그래프가 반드시 나오게: 명렬상 첫 보고서 점수 → PNG 생성
+    for sid, sname, report in results:
+        if isinstance(report, dict):
+            detail = report.get("3대 평가 항목별 상세 분석", {}) or {}
+            scores = {}
+            if isinstance(detail, dict):
+                for kname in ["학업역량", "학업태도", "학업 외 소양"]:
+                    v = detail.get(kname, {})
+                    if isinstance(v, dict):
+                        scores[kname] = v.get("점수", 0)
+
+            first_report = report
+            first_meta = (sid, sname)
+            first_radar_png = build_radar_png(scores)  # ✅ 그래프 생성(실패하면 None)
+
+            # PDF도 “첫 리포트” 기준으로 즉시 생성
+            try:
+                first_pdf_bytes = build_pdf_bytes(first_report, first_radar_png, sid, sname)
+            except Exception:
+                first_pdf_bytes = None
+            break
+
+    st.session_state["reports"] = results
+    st.success("보고서 생성이 완료되었습니다.")
+
+    # 첫 학생 자동 모달
+    if first_report is not None and first_meta is not None:
+        render_report_modal(
+            st,
+            first_report,
+            first_meta[0],
+            first_meta[1],
+            radar_png=first_radar_png,
+            pdf_bytes=first_pdf_bytes
+        )
+
+
+def bulk_owner() -> str:
+    """
+    대량 배치 실행의 주인. 로그인했으면 계정, 아니면 이 탭 주소(?bulk=...)에 남긴 임의 키
+    (새로고침해도 유지되고, 같은 주소를 다시 열면 이어 받음. 다른 교사의 실행은 보이지 않음).
+    """
+    try:
+        if st.user.is_logged_in and st.user.get("email"):
+            return f"user:{st.user.get('email')}"
+    except (AttributeError, KeyError, st.errors.StreamlitAPIException):
+        pass  # 로그인 설정이 없는 배포
+    key = st.query_params.get("bulk", "")
+    if len(key) < 32:
+        key = uuid.uuid4().hex
+        st.query_params["bulk"] = key
+    return f"link:{key}"
+
+
+def finish_bulk(run) -> None:
+    """끝난 대량 배치 실행의 보고서를 제출 당시 명렬 자리에 채워 마무리하고 보관 기록을 지움."""
+    results = [tuple(r) for r in run.meta.get("results", [])]
+    for slot, (job, report) in zip(run.meta.get("job_slots", []), zip(run.report_jobs(), bulk_reports(run))):
+        results[slot] = (job.student_id, job.masked_name, report)
+    finish_reports(results)
+    discard_run(run.run_id, owner=run.owner)
+    if st.session_state.get("bulk_run_id") == run.run_id:
+        del st.session_state["bulk_run_id"]
 
-    preferred_kw = ["세부", "특기", "행동", "종합", "의견", "창체", "체험", "활동", "기록", "내용", "서술", "요약"]
-    preferred = [c for c in cols if any(k in str(c) for k in preferred_kw)]
-    target_cols = preferred if preferred else cols
-
-    parts = []
-    for c in target_cols:
-        s = df[c]
-        if isinstance(s, pd.DataFrame):
-            s = s.iloc[:, 0]
-        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
-            vals = s.dropna().astype(str).map(lambda x: x.strip()).tolist()
-            vals = [v for v in vals if v and v.lower() != "nan"]
-            if vals:
-                parts.append(f"[{c}]\n" + "\n".join(vals))
-
-    return "\n\n".join(parts).strip()
-
-def calc_year_count(*dfs):
-    years = set()
-    for df in dfs:
-        if df is not None and "학년" in df.columns:
-            years.update(df["학년"].dropna().astype(str).str.strip().tolist())
-    return len(years)
 
 # -----------------------------
 # 1️⃣ 파일 업로드 (아이콘 변경 요청 반영)
@@ -80,81 +223,87 @@ def calc_year_count(*dfs):
 st.header("📁 파일 업로드")  # ✅ (3) 아이콘 변경
 
 uploaded_files = st.file_uploader(
-    "세특·행특·창체 파일 3개 업로드 (파일명에 세특/행특/창체 포함)",
-    type=["xlsx"],
+    "세특·행특·창체 파일 업로드 (학급별 여러 파일·여러 시트·ZIP 가능, 내용으로 자동 구분)",
+    type=["xlsx", "zip"],
     accept_multiple_files=True,
 )
 
-file_seteuk = file_haeng = file_chang = None
-if uploaded_files:
-    for f in uploaded_files:
-        if "세특" in f.name:
-            file_seteuk = f
-        elif "행특" in f.name:
-            file_haeng = f
-        elif "창체" in f.name:
-            file_chang = f
+use_archive = st.checkbox(
+    "🗄️ 기록 보관소에 누적 저장하고 이전 학기 기록과 합쳐서 보기",
+    help="학번·학년별로 바뀐 기록만 저장합니다. 이번 학기 파일만 올려도 지난 학년 기록을 함께 불러옵니다.",
+)
 
 # -----------------------------
 # 2️⃣ 명렬 불러오기
 # -----------------------------
-if st.button("📋 명렬 보기"):
+col_load, col_archive = st.columns([1, 3])
+with col_load:
+    load_clicked = st.button("📋 명렬 보기")
+with col_archive:
+    archive_clicked = st.button("🗄️ 보관소에서 명렬 불러오기")
+
+if archive_clicked:
+    with st.spinner("보관된 기록을 불러오는 중입니다…"):
+        frames = get_archive().load_frames()
+        if all(df.empty for df in frames.values()):
+            st.error("기록 보관소가 비어 있습니다. 파일을 업로드해 먼저 저장하세요.")
+            st.stop()
+        prepare_roster(frames["세특"], frames["행특"], frames["창체"])
+    st.success("보관소에서 명렬을 불러왔습니다.")
+
+if load_clicked:
 
-    if not file_seteuk or not file_haeng or not file_chang:
+    if not uploaded_files:
         st.error("세특·행특·창체 파일을 모두 업로드하세요.")
         st.stop()
 
     with st.spinner("데이터 분석 중입니다…"):
-        df_seteuk = load_seteuk(file_seteuk)
-        df_haeng = load_haengteuk(file_haeng)
-        df_chang = load_changche(file_chang)
-
-        # 번호 통일
-        for df in (df_seteuk, df_haeng, df_chang):
-            id_col = get_id_col(df)
-            if id_col in df.columns:
-                df[id_col] = normalize_id_series(df[id_col])
-
-        # 학생 명렬 생성(기존 로직 유지)
-        frames = []
-        for df in (df_seteuk, df_haeng, df_chang):
-            id_col = get_id_col(df)
-            if {id_col, "성명"}.issubset(df.columns):
-                tmp = df[[id_col, "성명"]].copy()
-                tmp.columns = ["번호", "성명"]  # 표준
-                frames.append(tmp)
-
-        df_students = (
-            pd.concat(frames, ignore_index=True)
-            .dropna()
-            .drop_duplicates()
-        )
-
-        df_students["번호"] = df_students["번호"].astype(str).str.strip()
-        df_students = df_students[df_students["번호"].str.isdigit()]
+        # 모든 파일·시트를 동시에 파싱 (같은 파일은 디스크 캐시에서 바로 불러옴)
+        load_status = st.empty()
+
+        def _on_sheet_loaded(label, seconds, done_files, total_files):
+            load_status.caption(f"시트 분석 {done_files}/{total_files} 완료 · {label} ({seconds:.1f}초)")
+
+        batch = load_batch(uploaded_files, on_progress=_on_sheet_loaded)
+
+        with st.expander(f"📑 분석한 시트 {len(batch.sheets)}개", expanded=bool(batch.missing)):
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "파일": r.file_name,
+                        "시트": r.sheet_name,
+                        "구분": r.kind or "판별 불가",
+                        "행 수": r.rows,
+                        "소요(초)": round(r.seconds, 2),
+                        "오류": r.error,
+                    }
+                    for r in batch.sheets
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
 
-        if df_students.empty:
-            st.error("학생 명렬을 생성할 수 없습니다.")
+        frames = dict(batch.frames)
+        if use_archive:
+            # 이번 업로드를 보관소에 병합하고, 업로드된 학생의 이전 학기 기록까지 합쳐서 사용
+            archive = get_archive()
+            stats = archive.ingest({k: v for k, v in frames.items() if not v.empty})
+            st.caption(f"🗄️ 기록 보관소 병합: {stats.summary()}")
+            frames = archive.load_frames(ids=uploaded_ids(frames))
+
+        missing = [k for k in ("세특", "행특", "창체") if frames[k].empty]
+        if missing:
+            st.error(f"{'·'.join(missing)} 자료를 찾지 못했습니다. 세특·행특·창체 파일을 모두 업로드하세요.")
             st.stop()
 
-        def mask_name(x):
-            x = str(x)
-            return x[0] + "ㅇ" + x[-1] if len(x) >= 3 else x
-
-        df_students["성명"] = df_students["성명"].apply(mask_name)
-
-        st.session_state["students_table"] = pd.DataFrame({
-            "선택": [False] * len(df_students),
-            "학번": df_students["번호"].tolist(),
-            "성명": df_students["성명"].tolist(),
-        })
-
-        st.session_state["df_seteuk"] = df_seteuk
-        st.session_state["df_haeng"] = df_haeng
-        st.session_state["df_chang"] = df_chang
+        prepare_roster(frames["세특"], frames["행특"], frames["창체"])
 
     st.success("명렬을 불러왔습니다.")
 
+if "frames_memory" in st.session_state:
+    with st.expander("🧮 세션 메모리 사용량", expanded=False):
+        st.dataframe(st.session_state["frames_memory"], hide_index=True, use_container_width=True)
+
 # -----------------------------
 # 3️⃣ 명렬 표 표시 + 보고서 생성
 # -----------------------------
@@ -175,25 +324,71 @@ if "students_table" in st.session_state:
             "선택": st.column_config.CheckboxColumn("선택", width="small"),
             "학번": st.column_config.TextColumn("학번", disabled=True),
             "성명": st.column_config.TextColumn("성명", disabled=True),
+            "자료 학년 수": st.column_config.NumberColumn("자료 학년 수", disabled=True, width="small"),
+            "생성 가능": st.column_config.CheckboxColumn("생성 가능", disabled=True, width="small"),
         },
-        disabled=["학번", "성명"],
+        disabled=["학번", "성명", "자료 학년 수", "생성 가능"],
     )
     st.session_state["students_table"] = edited_df
 
+    # 학년 전체에서 여러 학생에게 거의 그대로 쓰인 세특·행특 문장 찾기
+    with st.expander("🔁 학생 간 중복 문장 점검", expanded="duplicate_table" in st.session_state):
+        if st.button("중복 문장 찾기"):
+            with st.spinner("문장 비교 중…"):
+                frames = st.session_state["student_store"].frames
+                clusters = find_duplicate_sentences(frames["세특"], frames["행특"])
+                st.session_state["duplicate_table"] = clusters_table(clusters)
+
+        if "duplicate_table" in st.session_state:
+            dup = st.session_state["duplicate_table"]
+            if dup.empty:
+                st.info("여러 학생에게 반복된 문장이 없습니다.")
+            else:
+                st.caption(f"2명 이상에게 거의 같은 문장이 쓰인 묶음 {len(dup)}개")
+                st.dataframe(dup, hide_index=True, use_container_width=True)
+
     st.divider()
     st.header("📄 보고서 생성")
 
     selected = edited_df[edited_df["선택"] == True]
     st.write(f"선택된 학생 수: **{len(selected)}명**")
 
-    for k in ["df_seteuk", "df_haeng", "df_chang"]:
+    for k in ["df_seteuk", "df_haeng", "df_chang", "student_store"]:
         if k not in st.session_state:
             st.error("먼저 '명렬 보기'를 눌러 데이터를 불러와 주세요.")
             st.stop()
 
-    df_seteuk = st.session_state["df_seteuk"]
-    df_haeng = st.session_state["df_haeng"]
-    df_chang = st.session_state["df_chang"]
+    store = st.session_state["student_store"]
+
+    force_fresh = st.checkbox(
+        "♻️ 저장된 보고서 무시하고 새로 생성",
+        help="원문이 같으면 이전에 생성한 보고서를 API 호출 없이 바로 불러옵니다. 체크하면 다시 생성합니다.",
+    )
+
+    bulk_mode = st.radio(
+        "생성 방식",
+        ["⚡ 즉시 생성", "📦 대량 배치 (학년 전체용 · 저렴하지만 완료까지 최대 24시간)"],
+        horizontal=True,
+    ).startswith("📦")
+
+    live_preview = st.checkbox(
+        "👀 첫 학생 보고서 실시간 미리보기",
+        value=True,
+        help="첫 학생의 보고서를 항목이 완성되는 대로 먼저 보여 줍니다 (즉시 생성에만 적용).",
+    )
+
+    r1, r2 = st.columns([2, 1])
+    route_mode = r1.radio(
+        "분석 방식 (즉시 생성)",
+        ["🤖 자동", "한 번에", "🧩 항목별 동시"],
+        horizontal=True,
+        help="자동: 학생마다 원문 분량으로 모델·출력 상한을 정하고, 한 번에 생성하면 목표 시간을 넘길 것 같으면 "
+             "평가·성장 제안·추천 학과를 나눠 동시에 요청합니다 (요청 수는 3배).",
+    )
+    latency_target = r2.number_input(
+        "학생당 목표 시간(초)", min_value=5, max_value=300, value=int(LATENCY_TARGET), step=5,
+        disabled=not route_mode.startswith("🤖"),
+    )
 
     if st.button("🧠 선택 학생 보고서 생성"):
 
@@ -202,10 +397,6 @@ if "students_table" in st.session_state:
             st.stop()
 
         results = []
-        first_report = None
-        first_meta = None
-        first_radar_png = None
-        first_pdf_bytes = None
 
         # ✅ (4) 진행률 UI
         progress_wrap = st.container()
@@ -218,88 +409,181 @@ if "students_table" in st.session_state:
         total = int(len(selected))
         done = 0
 
-        set_col = get_id_col(df_seteuk)
-        hae_col = get_id_col(df_haeng)
-        cha_col = get_id_col(df_chang)
+        # 선택 학생 전체의 세특/행특/창체 원문을 한 번에 준비
+        selected_ids = selected["학번"].astype(str).str.strip().tolist()
+        student_texts = build_student_texts(
+            store.frames["세특"], store.frames["행특"], store.frames["창체"], ids=selected_ids
+        )
+
+        # 최근 7일 호출 기록으로 출력 속도 보정 (기록이 적으면 기본값)
+        speed = calibrate(llm_ledger.load(since=time.time() - 7 * 24 * 3600))
 
+        # 명렬 순서대로 자리를 잡아 두고, 자료 부족 학생은 바로 채움
+        jobs = []
+        job_slots = []
+        token_rows = []
+        long_jobs = []
         for idx, row in selected.reset_index(drop=True).iterrows():
             sid = str(row["학번"]).strip()
             sname = row["성명"]
 
-            stu_seteuk = df_seteuk[normalize_id_series(df_seteuk[set_col]) == sid] if set_col in df_seteuk.columns else df_seteuk.iloc[0:0]
-            stu_haeng = df_haeng[normalize_id_series(df_haeng[hae_col]) == sid] if hae_col in df_haeng.columns else df_haeng.iloc[0:0]
-            stu_chang = df_chang[normalize_id_series(df_chang[cha_col]) == sid] if cha_col in df_chang.columns else df_chang.iloc[0:0]
-
-            year_count = calc_year_count(stu_seteuk, stu_haeng, stu_chang)
-            if year_count < 2:
+            rec = store.get(sid)
+            if not rec.eligible:
                 results.append((sid, sname, "❌ 1개년 이상 자료 없음"))
                 done += 1
-                pct = int(done / total * 100)
-                progress_bar.progress(min(pct, 100))
-                progress_text.markdown(f"**{pct}%** 완료 · {done}/{total} (자료 부족 건은 제외됨)")
                 continue
 
-            seteuk_text = extract_text(stu_seteuk)
-            haeng_text = extract_text(stu_haeng)
-            chang_text = extract_text(stu_chang)
-
-            with st.spinner(f"{sid} {sname} 보고서 생성 중…"):
-                report = generate_sh_insight_report(
-                    student_id=sid,
-                    masked_name=sname,
-                    year_count=year_count,
-                    seteuk_text=seteuk_text,
-                    haengteuk_text=haeng_text,
-                    changche_text=chang_text,
-                )
-
-            results.append((sid, sname, report))
-
-            # ✅ (5) 레이더 그래프가 반드시 나오게: 보고서 점수 → PNG 생성
-            if isinstance(report, dict) and (first_report is None):
-                detail = report.get("3대 평가 항목별 상세 분석", {}) or {}
-                scores = {}
-                if isinstance(detail, dict):
-                    for kname in ["학업역량", "학업태도", "학업 외 소양"]:
-                        v = detail.get(kname, {})
-                        if isinstance(v, dict):
-                            scores[kname] = v.get("점수", 0)
+            # 중복 문장·머리글 정리 후 토큰 상한에 맞춤 (전/후 토큰 수 기록)
+            fitted = fit_to_budget(student_texts.get(sid, {}))
+            # 분량·목표 시간으로 모델·출력 상한·방식 결정 (대량 배치는 한 번에 분석 고정)
+            route = route_report(
+                fitted.tokens_after,
+                over_budget=fitted.trimmed and not bulk_mode,
+                latency_target=float(latency_target),
+                speed=speed,
+                allow_parallel=not bulk_mode,
+                strategy=None if route_mode.startswith("🤖") else "parallel" if route_mode.startswith("🧩") else "single",
+            )
+            token_rows.append({
+                "학번": sid,
+                "원문 토큰": fitted.tokens_before,
+                "전송 토큰": fitted.tokens_after,
+                "생략 줄 수": sum(fitted.dropped_lines.values()),
+                "방식": route.describe() if not bulk_mode else "대량 배치",
+                "근거": route.reason if not bulk_mode else "",
+            })
+
+            results.append((sid, sname, None))
+            job_slots.append(len(results) - 1)
+            jobs.append(ReportJob(
+                student_id=sid,
+                masked_name=sname,
+                year_count=rec.year_count,
+                seteuk_text=fitted.texts["세특"],
+                haengteuk_text=fitted.texts["행특"],
+                changche_text=fitted.texts["창체"],
+                strategy="parallel" if route.strategy == "parallel" else "single",
+                model=route.model if not bulk_mode else "",
+                max_tokens=route.max_tokens if not bulk_mode else None,
+                est_seconds=route.est_seconds if not bulk_mode else None,
+            ))
+            if route.strategy == "map_reduce":
+                long_jobs.append(len(jobs) - 1)
+
+        # 정리해도 상한을 넘는 학생은 잘라 내지 않고 학년·영역별로 나눠 요약한 뒤 분석 (즉시 생성만)
+        if long_jobs and not bulk_mode:
+            sections = build_student_sections(
+                store.frames["세특"], store.frames["행특"], store.frames["창체"],
+                ids=[jobs[j].student_id for j in long_jobs],
+            )
+            for j in long_jobs:
+                jobs[j].sections = sections.get(jobs[j].student_id, {})
 
-                first_report = report
-                first_meta = (sid, sname)
-                first_radar_png = build_radar_png(scores)  # ✅ 그래프 생성(실패하면 None)
+        def _update_progress(note: str = ""):
+            pct = int(done / total * 100)
+            progress_bar.progress(min(pct, 100))
+            progress_text.markdown(f"**{pct}%** 완료 · {done}/{total}{note}")
 
-                # PDF도 “첫 리포트” 기준으로 즉시 생성
-                try:
-                    first_pdf_bytes = build_pdf_bytes(first_report, first_radar_png, sid, sname)
-                except Exception:
-                    first_pdf_bytes = None
+        if done:
+            _update_progress(" (자료 부족 건은 제외됨)")
 
+        # 여러 학생을 동시에 요청하고, 끝나는 대로 진행률 갱신 (결과는 명렬 순서 유지)
+        def _on_done(i, job, report, finished, job_total):
+            global done
+            results[job_slots[i]] = (job.student_id, job.masked_name, report)
             done += 1
-            pct = int(done / total * 100)
-            progress_bar.progress(min(pct, 100))
-            progress_text.markdown(f"**{pct}%** 완료 · {done}/{total}")
-
-        st.session_state["reports"] = results
-        st.success("보고서 생성이 완료되었습니다.")
-
-        # 완료 후 진행 UI 정리(원하시면 지울 수도 있음)
-        progress_text.markdown("✅ 완료되었습니다.")
-
-        # 첫 학생 자동 모달
-        if first_report is not None and first_meta is not None:
-            render_report_modal(
-                st,
-                first_report,
-                first_meta[0],
-                first_meta[1],
-                radar_png=first_radar_png,
-                pdf_bytes=first_pdf_bytes
-            )
+            _update_progress(f" · 방금 완료: {job.student_id}")
+
+        if bulk_mode:
+            # 제출만 하고 바로 돌아옴: 배치 id·회차는 서버에 저장되어 새로고침·탭을 닫아도 아래 '대량 배치'에서 이어 받음
+            with llm_cache.refreshing(force_fresh):
+                bulk_run = start_bulk(jobs, meta={"results": results, "job_slots": job_slots}, owner=bulk_owner())
+            if token_rows:
+                st.session_state["prompt_tokens"] = pd.DataFrame(token_rows)
+            if bulk_run.done:
+                finish_bulk(bulk_run)
+            else:
+                st.session_state["bulk_run_id"] = bulk_run.run_id
+                progress_text.markdown(
+                    f"📦 {len(bulk_run.pending)}명을 배치로 제출했습니다 (저장된 보고서 {len(bulk_run.results)}명). "
+                    "완료까지 최대 24시간 · 이 창을 닫아도 같은 주소(또는 같은 계정)로 다시 열면 아래 '대량 배치'에서 이어 받을 수 있습니다."
+                )
+        else:
+            # 이 실행에서만: 강제 재생성이면 저장본을 읽지 않고 새 결과로 덮어씀, 적중 수도 이 실행 것만 셈
+            with llm_cache.refreshing(force_fresh), llm_cache.counting() as cache_run:
+                if live_preview:
+                    # 첫 학생 보고서는 항목이 완성되는 대로 바로 보여 줌
+                    live_box = st.container(border=True)
+
+                    def _on_section(job, key, value):
+                        with live_box:
+                            if key == "학생 정보":
+                                st.markdown(f"#### 👀 실시간 미리보기 · {job.student_id} {job.masked_name}")
+                                return
+                            st.markdown(f"**{key}**")
+                            if isinstance(value, str):
+                                st.write(value)
+                            else:
+                                st.json(value, expanded=False)
+
+                    generate_reports_live(jobs, on_section=_on_section, on_done=_on_done)
+                else:
+                    generate_reports(jobs, on_done=_on_done)
+            # 요약·항목 묶음·보완 호출의 적중은 빼고, 학생 보고서 단위 재사용만 셈
+            reused = cache_run["reports"]
+            if reused:
+                st.caption(f"💾 저장된 보고서 재사용 {reused}건 · 새로 생성 {max(len(jobs) - reused, 0)}건")
+
+            if token_rows:
+                st.session_state["prompt_tokens"] = pd.DataFrame(token_rows)
+
+            finish_reports(results)
+            # 완료 후 진행 UI 정리(원하시면 지울 수도 있음)
+            progress_text.markdown("✅ 완료되었습니다.")
+
+# -----------------------------
+# 📦 대량 배치 이어 받기 (제출한 배치는 서버에 기록되어 새로고침·탭 닫기 뒤에도 계속)
+# -----------------------------
+# 이 사용자가 제출한 실행만 (다른 교사의 명렬·보고서가 보이거나 수거되지 않게)
+owner = bulk_owner()
+open_runs = list_runs(owner=owner)
+if open_runs:
+    st.subheader("📦 대량 배치")
+    st.caption("완료된 배치를 불러온 보고서는 저장되므로, 같은 학생을 다시 생성해도 API를 다시 부르지 않습니다.")
+    for bulk_run in open_runs:
+        c1, c2, c3 = st.columns([5, 1, 1])
+        # 이 세션에서 제출한 배치는 화면이 다시 그려질 때마다 상태를 확인
+        if c2.button("🔄 확인", key=f"bulk_poll_{bulk_run.run_id}") or \
+                bulk_run.run_id == st.session_state.get("bulk_run_id"):
+            try:
+                bulk_run = poll_bulk(bulk_run.run_id, owner=owner) or bulk_run
+            except Exception as e:
+                st.warning(f"배치 상태 확인 실패: {e}")
+        if bulk_run.done:
+            finish_bulk(bulk_run)
+            continue
+        c1.markdown(
+            f"{time.strftime('%m-%d %H:%M', time.localtime(bulk_run.created))} 제출 · {len(bulk_run.jobs)}명 · "
+            f"{bulk_run.round}차 · 상태 **{bulk_run.status}** · 완료 {bulk_run.completed}/{len(bulk_run.pending)}"
+            + (f" · 실패 {bulk_run.failed}건(다음 차수에 재제출)" if bulk_run.failed else "")
+        )
+        if c3.button("기록 삭제", key=f"bulk_discard_{bulk_run.run_id}",
+                     help="이어 받기 기록만 지웁니다. 이미 제출한 배치는 취소되지 않습니다."):
+            discard_run(bulk_run.run_id, owner=owner)
+            st.rerun()
 
 # -----------------------------
 # 결과 목록(기존 유지)
 # -----------------------------
+if "prompt_tokens" in st.session_state:
+    tokens = st.session_state["prompt_tokens"]
+    with st.expander(
+        f"🔢 입력 토큰 {int(tokens['원문 토큰'].sum()):,} → {int(tokens['전송 토큰'].sum()):,} "
+        f"(학생당 상한 {SOURCE_TOKEN_BUDGET:,})",
+        expanded=False,
+    ):
+        st.dataframe(tokens, hide_index=True, use_container_width=True)
+
 if "reports" in st.session_state:
     st.subheader("📌 생성 결과")
     for sid, sname, content in st.session_state["reports"]:
@@ -309,3 +593,58 @@ if "reports" in st.session_state:
         else:
             st.json(content)
         st.divider()
+
+# -----------------------------
+# 관리자: LLM 호출 기록 (지연·토큰·재시도) → 동시 요청 수·토큰 상한 조정 근거
+# -----------------------------
+def admin_password() -> str:
+    """관리자 화면 비밀번호: 환경변수 또는 secrets의 SEHWA_ADMIN_PASSWORD. 없으면 관리자 화면을 열지 않음."""
+    value = os.environ.get("SEHWA_ADMIN_PASSWORD", "")
+    if value:
+        return value
+    try:
+        return str(st.secrets.get("SEHWA_ADMIN_PASSWORD", "") or "")
+    except Exception:  # secrets.toml이 없을 때
+        return ""
+
+with st.expander("📈 LLM 호출 기록 (관리자)", expanded=False):
+    expected_pw = admin_password()
+    if not expected_pw:
+        st.caption("관리자 비밀번호(SEHWA_ADMIN_PASSWORD)를 환경변수나 secrets에 설정하면 볼 수 있습니다.")
+    elif not st.session_state.get("ledger_admin"):
+        pw = st.text_input("관리자 비밀번호", type="password", key="ledger_admin_pw")
+        if pw:
+            if hmac.compare_digest(pw.encode(), expected_pw.encode()):
+                st.session_state["ledger_admin"] = True
+                st.rerun()
+            else:
+                st.error("비밀번호가 틀렸습니다.")
+    else:
+        period = st.radio("기간", ["최근 24시간", "최근 7일", "전체"], horizontal=True, key="ledger_period")
+        since = {"최근 24시간": time.time() - 24 * 3600, "최근 7일": time.time() - 7 * 24 * 3600}.get(period)
+        ledger = llm_ledger.load(since=since)
+        if ledger.empty:
+            st.caption(f"기록이 없습니다. ({llm_ledger.LEDGER_PATH})")
+        else:
+            per_report = llm_ledger.summarize_reports(ledger)
+            if per_report:
+                cols = st.columns(len(per_report))
+                for col, (label, value) in zip(cols, per_report.items()):
+                    col.metric(label, f"{value:,}")
+            st.dataframe(llm_ledger.summarize_calls(ledger), hide_index=True, use_container_width=True)
+            routes = llm_ledger.summarize_routes(ledger)
+            if not routes.empty:
+                st.markdown("**분석 방식별 예상 대비 실제 시간** (목표 시간·SEHWA_ROUTE_TIERS 조정용)")
+                st.dataframe(routes, hide_index=True, use_container_width=True)
+            st.caption("지연은 성공한 호출 기준 · 스트리밍(stream) 호출의 토큰은 추정치")
+            c1, c2 = st.columns(2)
+            c1.download_button(
+                "⬇️ 호출 기록 CSV",
+                ledger.to_csv(index=False).encode("utf-8-sig"),
+                file_name="llm_ledger.csv",
+                mime="text/csv",
+            )
+            confirm = c2.checkbox("모든 사용자의 호출 기록을 지웁니다", key="ledger_clear_confirm")
+            if c2.button("🗑️ 호출 기록 비우기", disabled=not confirm):
+                llm_ledger.clear()
+                st.rerun()
@@ -0,0 +1,201 @@
+# bench/batch_stub_server.py
+"""
+Batch API(파일 업로드 / 배치 생성·조회 / 결과 파일 다운로드)를 흉내 내는 로컬 HTTP 서버.
+실제 키·네트워크 없이 utils.report_bulk의 제출 → 폴링 → 결과 매핑 → 재제출 흐름을 확인한다.
+
+- 배치는 조회할 때마다 validating → in_progress → finalizing → completed 로 진행
+- --fail-every N: custom_id 해시 기준 N개 중 1개는 첫 제출에서 실패(재제출 시 성공)
+
+    python -m bench.batch_stub_server --port 8765 --fail-every 5
+
+    from openai import OpenAI
+    client = OpenAI(api_key="stub", base_url="http://127.0.0.1:8765/v1")
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+import zlib
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+PROGRESSION = ["validating", "in_progress", "finalizing", "completed"]
+
+
+def sample_report(custom_id: str) -> dict:
+    """SH-Insight 스키마를 만족하는 최소 보고서."""
+    sid = custom_id.split("-", 1)[-1]
+    return {
+        "학생 정보": {"학번": sid, "성명": "", "학년 수": 0},
+        "종합 평가": f"{sid} 학생 가상 보고서",
+        "핵심 강점": ["성실성: 가상 응답"],
+        "보완 추천 영역": [],
+        "3대 평가 항목별 상세 분석": {
+            k: {"점수": 8, "평가 근거 문장": [], "분석": ""} for k in ("학업역량", "학업태도", "학업 외 소양")
+        },
+        "영역별 심화 탐구 주제 제안": {"자율": "", "진로": "", "동아리": ""},
+        "역량 기반 추천 학과": [],
+        "맞춤형 성장 제안": {"생활기록부 중점 보완 전략": "", "추천 학교 행사": [], "추천 활동 설계": []},
+        "추천 도서": [],
+    }
+
+
+class StubState:
+    def __init__(self, fail_every: int = 0):
+        self.fail_every = fail_every
+        self.files: Dict[str, dict] = {}
+        self.batches: Dict[str, dict] = {}
+        self.failed_once: set = set()
+        self.lock = threading.Lock()
+
+    def add_file(self, data: bytes, filename: str, purpose: str) -> dict:
+        fid = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[fid] = {
+            "id": fid, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed", "_data": data,
+        }
+        return self.files[fid]
+
+    def _should_fail(self, custom_id: str) -> bool:
+        if not self.fail_every or custom_id in self.failed_once:
+            return False
+        if zlib.crc32(custom_id.encode()) % self.fail_every == 0:
+            self.failed_once.add(custom_id)
+            return True
+        return False
+
+    def _finish(self, batch: dict) -> None:
+        requests = [json.loads(line) for line in self.files[batch["input_file_id"]]["_data"].decode().splitlines() if line.strip()]
+        out, err = [], []
+        for req in requests:
+            cid = req["custom_id"]
+            if self._should_fail(cid):
+                err.append({"id": f"req-{uuid.uuid4().hex[:8]}", "custom_id": cid, "response": {
+                    "status_code": 500, "body": {"error": {"message": "stub server error", "type": "server_error"}},
+                }, "error": None})
+                continue
+            body = {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:8]}", "object": "chat.completion",
+                "created": int(time.time()), "model": req["body"].get("model", ""),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                    "role": "assistant", "content": json.dumps(sample_report(cid), ensure_ascii=False),
+                }}],
+            }
+            out.append({"id": f"req-{uuid.uuid4().hex[:8]}", "custom_id": cid,
+                        "response": {"status_code": 200, "body": body}, "error": None})
+
+        def _dump(lines):
+            return ("\n".join(json.dumps(x, ensure_ascii=False) for x in lines) + "\n").encode()
+
+        batch["output_file_id"] = self.add_file(_dump(out), "output.jsonl", "batch_output")["id"] if out else None
+        batch["error_file_id"] = self.add_file(_dump(err), "errors.jsonl", "batch_output")["id"] if err else None
+        batch["request_counts"] = {"total": len(requests), "completed": len(out), "failed": len(err)}
+
+    def advance(self, batch: dict) -> None:
+        step = PROGRESSION.index(batch["status"])
+        if step + 1 < len(PROGRESSION):
+            batch["status"] = PROGRESSION[step + 1]
+            if batch["status"] == "completed":
+                self._finish(batch)
+                batch["completed_at"] = int(time.time())
+
+
+def _public(obj: dict) -> dict:
+    return {k: v for k, v in obj.items() if not k.startswith("_")}
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code: int, payload, content_type="application/json"):
+            data = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def do_POST(self):
+            with state.lock:
+                if self.path == "/v1/files":
+                    raw = self._body()
+                    msg = BytesParser(policy=policy.default).parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw
+                    )
+                    fields, data, filename = {}, b"", "upload.jsonl"
+                    for part in msg.iter_parts():
+                        name = part.get_param("name", header="content-disposition")
+                        if name == "file":
+                            data = part.get_payload(decode=True)
+                            filename = part.get_filename() or filename
+                        else:
+                            fields[name] = part.get_content().strip()
+                    self._send(200, _public(state.add_file(data, filename, fields.get("purpose", "batch"))))
+                elif self.path == "/v1/batches":
+                    req = json.loads(self._body() or b"{}")
+                    if req.get("input_file_id") not in state.files:
+                        return self._send(400, {"error": {"message": "unknown input_file_id"}})
+                    bid = f"batch_{uuid.uuid4().hex[:12]}"
+                    state.batches[bid] = {
+                        "id": bid, "object": "batch", "endpoint": req.get("endpoint"),
+                        "input_file_id": req["input_file_id"], "completion_window": req.get("completion_window"),
+                        "status": "validating", "created_at": int(time.time()), "metadata": req.get("metadata"),
+                        "output_file_id": None, "error_file_id": None,
+                        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                    }
+                    self._send(200, state.batches[bid])
+                else:
+                    self._send(404, {"error": {"message": f"no route {self.path}"}})
+
+        def do_GET(self):
+            with state.lock:
+                parts = self.path.strip("/").split("/")
+                if parts[:2] == ["v1", "batches"] and len(parts) == 3 and parts[2] in state.batches:
+                    batch = state.batches[parts[2]]
+                    state.advance(batch)
+                    self._send(200, batch)
+                elif parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content" and parts[2] in state.files:
+                    self._send(200, state.files[parts[2]]["_data"], "application/octet-stream")
+                elif parts[:2] == ["v1", "files"] and len(parts) == 3 and parts[2] in state.files:
+                    self._send(200, _public(state.files[parts[2]]))
+                else:
+                    self._send(404, {"error": {"message": f"no route {self.path}"}})
+
+    return Handler
+
+
+def serve(port: int = 0, fail_every: int = 0, background: bool = True):
+    """서버를 띄우고 (server, base_url)을 반환. port=0이면 빈 포트 자동 선택."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(StubState(fail_every)))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url
+
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="Batch API 로컬 대역 서버")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--fail-every", type=int, default=0, help="N개 중 1개 요청을 첫 제출에서 실패시킴 (0=실패 없음)")
+    args = ap.parse_args(argv)
+
+    server, base_url = serve(args.port, args.fail_every, background=False)
+    print(f"batch stub listening on {base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# bench/bench_parsers.py
+"""
+세특/행특/창체 로더 벤치마크.
+
+가상 NEIS 파일(bench.synthetic_neis)을 30/300/3000명 규모로 만들고, 로더마다
+파싱 시간(반복 중 최솟값)과 최대 메모리(tracemalloc)를 측정한다.
+빠른 경로(xlsx_fast)와 openpyxl/pandas 경로를 모두 측정하며,
+bench/thresholds.json의 기준을 넘으면 종료 코드 1로 끝난다.
+
+    python -m bench.bench_parsers                 # 30, 300명
+    python -m bench.bench_parsers --students 3000 --repeat 1
+    python -m bench.bench_parsers --json bench_output.json
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from bench.synthetic_neis import file_name, generate
+from utils.parser_seteuk import load_seteuk
+from utils.parser_haengteuk import load_haengteuk
+from utils.parser_changche import load_changche
+
+LOADERS: Dict[str, Callable] = {
+    "세특": load_seteuk,
+    "행특": load_haengteuk,
+    "창체": load_changche,
+}
+MODES = {"fast": True, "openpyxl": False}
+THRESHOLDS_PATH = Path(__file__).with_name("thresholds.json")
+
+
+def measure(loader: Callable, path: Path, fast: bool, repeat: int) -> Dict[str, float]:
+    """repeat회 중 최단 시간과, 별도 1회 실행의 최대 메모리(MB)."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        df = loader(path, fast=fast)
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    loader(path, fast=fast)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": min(times), "peak_mb": peak / 1024 / 1024, "rows": len(df)}
+
+
+def check(results: List[dict], thresholds: dict) -> List[str]:
+    """기준 초과 항목을 사람이 읽을 수 있는 문장 목록으로 반환."""
+    failures = []
+    for r in results:
+        limit = thresholds.get(r["mode"], {}).get(r["loader"], {}).get(str(r["students"]))
+        if not limit:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if metric in limit and r[metric] > limit[metric]:
+                failures.append(
+                    f"{r['loader']} {r['students']}명 [{r['mode']}] {metric} {r[metric]:.3f} > 기준 {limit[metric]}"
+                )
+    return failures
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="세특/행특/창체 파서 벤치마크")
+    ap.add_argument("--students", type=int, nargs="+", default=[30, 300])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--data", default="bench_data", help="가상 xlsx를 만들/재사용할 폴더")
+    ap.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    ap.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    ap.add_argument("--no-check", action="store_true", help="기준 비교 생략")
+    args = ap.parse_args(argv)
+
+    results = []
+    for n in args.students:
+        files = {k: Path(args.data) / file_name(n, k) for k in LOADERS}
+        if not all(p.exists() for p in files.values()):
+            files = generate(args.data, n)
+
+        for kind, loader in LOADERS.items():
+            for mode in args.modes:
+                m = measure(loader, files[kind], MODES[mode], args.repeat)
+                r = {"loader": kind, "students": n, "mode": mode, **m}
+                results.append(r)
+                print(f"{kind}\t{n:>5}명\t{mode:<8}\t{m['seconds']:8.3f}s\t{m['peak_mb']:8.1f}MB\t{m['rows']}행", flush=True)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.no_check or not THRESHOLDS_PATH.exists():
+        return 0
+
+    failures = check(results, json.loads(THRESHOLDS_PATH.read_text(encoding="utf-8")))
+    for f in failures:
+        print(f"❌ {f}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
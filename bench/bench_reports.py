@@ -0,0 +1,104 @@
+# bench/bench_reports.py
+"""
+보고서 생성 처리량 벤치마크 (로컬 목 서버 사용, 네트워크·비용 없음).
+
+bench.mock_openai_server를 띄우고 같은 학생 N명을 동시 요청 수별로 생성해
+총 시간·학생당 시간·429 재시도 수를 잰다. 마지막 줄은 캐시를 켠 상태의 재실행.
+
+    python -m bench.bench_reports                          # 30명, 동시 1/2/4/8
+    python -m bench.bench_reports --students 100 --latency 2 --rate-429 0.05
+    python -m bench.bench_reports --max-concurrent 4       # 서버 쪽 동시 한도 흉내
+    python -m bench.bench_reports --per-kchar 2 --strategy single parallel   # 항목별 동시 생성 비교
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from bench.mock_openai_server import MockOptions, serve
+
+
+def _jobs(n: int, strategy: str = "single"):
+    from utils.report_batch import ReportJob
+    seteuk = "[국어] 토론 수업에서 근거를 들어 자신의 주장을 논리적으로 펼침. " * 20
+    return [ReportJob(f"2{i:04d}", "김*수", 3, seteuk, "성실하고 책임감이 강함.", "자율활동 참여.",
+                      strategy=strategy)
+            for i in range(n)]
+
+
+def run(jobs, concurrency: int, state, cache: bool) -> dict:
+    from utils import llm_cache
+    from utils.report_batch import generate_reports
+
+    before = dict(state.counts)
+    t0 = time.perf_counter()
+    with llm_cache.enabled(cache):
+        reports = generate_reports(jobs, max_concurrency=concurrency)
+    seconds = time.perf_counter() - t0
+    return {
+        "strategy": jobs[0].strategy if jobs else "",
+        "concurrency": concurrency,
+        "cache": cache,
+        "seconds": seconds,
+        "per_student": seconds / len(jobs),
+        "requests": state.counts["requests"] - before["requests"],
+        "rate_limited": state.counts["429"] - before["429"],
+        "errors": sum(1 for r in reports if str(r.get("종합 평가", "")).startswith("보고서 생성 중 오류")),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="보고서 생성 처리량 벤치마크 (목 서버)")
+    ap.add_argument("--students", type=int, default=30)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--latency", type=float, default=0.5)
+    ap.add_argument("--jitter", type=float, default=0.2)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--rate-500", type=float, default=0.0)
+    ap.add_argument("--max-concurrent", type=int, default=0)
+    ap.add_argument("--per-kchar", type=float, default=0.0, help="응답 1000자당 추가 지연(초)")
+    ap.add_argument("--strategy", nargs="+", default=["single"], choices=["single", "parallel"])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = ap.parse_args(argv)
+
+    options = MockOptions(args.latency, args.jitter, args.rate_429, args.rate_500,
+                          args.max_concurrent, per_kchar=args.per_kchar, seed=args.seed)
+    server, base_url, state = serve(options=options)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    os.environ["SEHWA_LLM_CACHE_DIR"] = tempfile.mkdtemp(prefix="sehwa_bench_cache_")
+
+    from utils import llm_backend
+    llm_backend.set_backend(llm_backend.OpenAIBackend())
+
+    results: List[dict] = []
+    try:
+        for strategy in args.strategy:
+            jobs = _jobs(args.students, strategy)
+            for c in args.concurrency:
+                results.append(run(jobs, c, state, cache=False))
+        # 캐시 채우기 → 재실행 (두 번째 실행은 목 서버에 요청하지 않아야 함)
+        run(jobs, max(args.concurrency), state, cache=True)
+        results.append(run(jobs, max(args.concurrency), state, cache=True))
+    finally:
+        server.shutdown()
+
+    for r in results:
+        label = "캐시" if r["cache"] else "    "
+        print(f"{r['strategy']:<8} 동시 {r['concurrency']:>2} {label}\t{r['seconds']:8.2f}s\t학생당 {r['per_student']:6.3f}s\t"
+              f"요청 {r['requests']:>4}\t429 {r['rate_limited']:>3}\t실패 {r['errors']}", flush=True)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
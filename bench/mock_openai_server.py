@@ -0,0 +1,200 @@
+# bench/mock_openai_server.py
+"""
+OpenAI 호환 로컬 목 서버. /v1/chat/completions(일반·stream)와 batch_stub_server의 Batch API를 함께 제공한다.
+지연 시간·오류를 설정으로 주입해 동시 생성·캐시·타임아웃 동작을 네트워크 없이 재현 가능하게 측정한다.
+
+- --latency 초 (+ --jitter 초): 응답 전 대기 (stream이면 조각 사이에 나눠서 대기)
+- --per-kchar 초: 응답 1000자당 추가 대기 (출력 길이가 지연을 좌우하는 실제 모델 흉내)
+- --rate-429 / --rate-500: 해당 비율로 429(Retry-After 포함) / 500 반환
+- --max-concurrent N: 동시에 처리 중인 요청이 N개를 넘으면 429 (실제 한도 흉내)
+- --seed: 오류·지연 난수 고정
+
+    python -m bench.mock_openai_server --port 8766 --latency 1.5 --rate-429 0.1
+    SEHWA_LLM_BACKEND=openai OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=mock streamlit run sehwamain.py
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import ThreadingHTTPServer
+from typing import Optional
+
+from bench.batch_stub_server import StubState, make_handler, sample_report
+
+
+@dataclass
+class MockOptions:
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_429: float = 0.0
+    rate_500: float = 0.0
+    max_concurrent: int = 0
+    retry_after: float = 1.0
+    stream_chunk_chars: int = 24
+    per_kchar: float = 0.0
+    seed: Optional[int] = None
+
+
+class MockState(StubState):
+    def __init__(self, options: MockOptions, fail_every: int = 0):
+        super().__init__(fail_every)
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.active = 0
+        self.counts = {"requests": 0, "429": 0, "500": 0}
+
+
+def _student_id(body: dict) -> str:
+    user = body.get("messages", [{}])[-1].get("content", "")
+    if "학번: " in user:
+        return user.split("학번: ", 1)[1].split("\n", 1)[0].strip()
+    return "unknown"
+
+
+def _content(body: dict) -> str:
+    """요청에 맞춰 스키마를 만족하는 JSON 응답 (요약 요청이면 요약 형식, 일부 항목 요청이면 그 항목만)."""
+    system = body.get("messages", [{}])[0].get("content", "")
+    if "근거 문장" in system and "핵심 활동" in system and "SH-Insight" not in system:
+        return json.dumps({"핵심 활동": [], "드러난 역량": [], "근거 문장": []}, ensure_ascii=False)
+    report = sample_report(f"0-{_student_id(body)}")
+    if "일부 항목만" in system:
+        fragment = system[system.index("{", system.index("일부 항목만")):system.rindex("}") + 1]
+        report = {k: report[k] for k in json.loads(fragment) if k in report}
+    return json.dumps(report, ensure_ascii=False)
+
+
+def make_mock_handler(state: MockState):
+    Base = make_handler(state)
+
+    class Handler(Base):
+        protocol_version = "HTTP/1.1"
+
+        def handle(self):
+            try:
+                super().handle()
+            except (ConnectionResetError, BrokenPipeError):
+                pass
+
+        def do_POST(self):
+            if self.path != "/v1/chat/completions":
+                return super().do_POST()
+
+            body = json.loads(self._body() or b"{}")
+            opts = state.options
+            with state.lock:
+                state.counts["requests"] += 1
+                roll = state.rng.random()
+                delay = opts.latency + state.rng.uniform(0, opts.jitter)
+                limited = roll < opts.rate_429 or (opts.max_concurrent and state.active >= opts.max_concurrent)
+                failed = not limited and roll < opts.rate_429 + opts.rate_500
+                if limited:
+                    state.counts["429"] += 1
+                elif failed:
+                    state.counts["500"] += 1
+                else:
+                    state.active += 1
+
+            if limited:
+                return self._error(429, "Rate limit reached (mock)", "rate_limit_exceeded",
+                                   {"retry-after": str(opts.retry_after)})
+            if failed:
+                return self._error(500, "Internal error (mock)", "server_error")
+
+            try:
+                content = _content(body)
+                delay += opts.per_kchar * len(content) / 1000
+                if body.get("stream"):
+                    self._stream(body, content, delay)
+                else:
+                    time.sleep(delay)
+                    self._send(200, {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:8]}", "object": "chat.completion",
+                        "created": int(time.time()), "model": body.get("model", "mock"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": self._usage(body, content),
+                    })
+            finally:
+                with state.lock:
+                    state.active -= 1
+
+        def _usage(self, body: dict, content: str) -> dict:
+            prompt = sum(len(m.get("content", "")) for m in body.get("messages", []))
+            return {"prompt_tokens": prompt, "completion_tokens": len(content),
+                    "total_tokens": prompt + len(content)}
+
+        def _error(self, code: int, message: str, err_type: str, headers: Optional[dict] = None):
+            data = json.dumps({"error": {"message": message, "type": err_type, "code": err_type}}).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, body: dict, content: str, delay: float):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def _write(data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            size = state.options.stream_chunk_chars
+            pieces = [content[i:i + size] for i in range(0, len(content), size)]
+            cid = f"chatcmpl-{uuid.uuid4().hex[:8]}"
+            for piece in pieces:
+                time.sleep(delay / max(1, len(pieces)))
+                chunk = {"id": cid, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": body.get("model", "mock"),
+                         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                _write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+            _write(b"data: [DONE]\n\n")
+            _write(b"")
+
+    return Handler
+
+
+def serve(port: int = 0, options: Optional[MockOptions] = None, fail_every: int = 0, background: bool = True):
+    """서버를 띄우고 (server, base_url, state)를 반환. port=0이면 빈 포트 자동 선택."""
+    state = MockState(options or MockOptions(), fail_every)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_mock_handler(state))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url, state
+
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="OpenAI 호환 로컬 목 서버")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--rate-500", type=float, default=0.0)
+    ap.add_argument("--max-concurrent", type=int, default=0)
+    ap.add_argument("--per-kchar", type=float, default=0.0)
+    ap.add_argument("--fail-every", type=int, default=0, help="배치 요청 N개 중 1개를 첫 제출에서 실패시킴")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    options = MockOptions(args.latency, args.jitter, args.rate_429, args.rate_500,
+                          args.max_concurrent, per_kchar=args.per_kchar, seed=args.seed)
+    server, base_url, _ = serve(args.port, options, args.fail_every, background=False)
+    print(f"mock OpenAI listening on {base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
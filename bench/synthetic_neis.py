@@ -0,0 +1,156 @@
+# bench/synthetic_neis.py
+"""
+실제 학생 자료 없이 파서를 측정하기 위한 가상 NEIS 내보내기(xlsx) 생성기.
+
+- 세특: 번호/성명 병합셀 + 학년 병합셀(1/2/3) + 과목별 세특 병합셀 (load_seteuk 레이아웃)
+- 행특: "번 호 / 성 명 / 학 년 / 행 동 …" 헤더 + 학년별 행 (load_haengteuk 레이아웃)
+- 창체: "창의적체험활동" 1차 헤더 + "영역/시간/특기사항" 2차 헤더 (load_changche 레이아웃)
+
+    python -m bench.synthetic_neis --students 300 --out /tmp/neis
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+from typing import Dict
+
+import xlsxwriter
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류전홍"
+GIVEN = ["민준", "서연", "도윤", "하은", "지호", "수아", "예준", "지유", "현우", "서윤", "건우", "채원", "우진", "다은"]
+SUBJECTS = ["국어", "수학", "영어", "한국사", "통합사회", "통합과학", "물리학Ⅰ", "화학Ⅰ", "생명과학Ⅰ", "정보"]
+AREAS = ["자율활동", "동아리활동", "진로활동", "봉사활동"]
+# 세특 학년 병합셀 추가 (v2)
+LAYOUT_VERSION = 2
+
+PHRASES = [
+    "수업 시간에 질문을 자주 하며 개념의 원리를 끝까지 탐구함.",
+    "모둠 활동에서 자료를 정리하고 발표를 맡아 협업을 이끎.",
+    "관련 도서를 찾아 읽고 심화 보고서를 작성하여 발표함.",
+    "실험 결과의 오차 원인을 분석하고 개선 방안을 제시함.",
+    "친구들의 학습을 도우며 배려심 있는 태도를 보임.",
+    "진로와 연계한 주제를 스스로 설정하여 탐구를 이어감.",
+    "성실하게 과제를 수행하고 피드백을 반영하여 완성도를 높임.",
+    "토론에서 근거를 들어 자신의 입장을 논리적으로 설명함.",
+]
+
+
+def _name(rng: random.Random) -> str:
+    return rng.choice(SURNAMES) + rng.choice(GIVEN)
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(PHRASES) for _ in range(n))
+
+
+def _roster(students: int, seed: int):
+    rng = random.Random(seed)
+    return [(10101 + i, _name(rng)) for i in range(students)]
+
+
+def write_seteuk(path: Path, students: int, years: int = 3, subjects: int = 4, seed: int = 0) -> Path:
+    if subjects < 2:
+        raise ValueError("subjects는 2 이상이어야 합니다 (학년 칸이 병합셀이어야 load_seteuk가 읽음)")
+    rng = random.Random(seed + 1)
+    wb = xlsxwriter.Workbook(str(path))
+    ws = wb.add_worksheet("세특")
+    ws.write(0, 0, "세부능력 및 특기사항")
+
+    row = 2
+    for sid, name in _roster(students, seed):
+        block = years * subjects
+        ws.merge_range(row, 0, row + block - 1, 0, sid)
+        ws.merge_range(row, 1, row + block - 1, 1, name)
+
+        for year in range(1, years + 1):
+            # 학년은 해당 학년 과목 행 전체에 걸친 병합셀 (번호처럼 숫자라 분류 순서가 중요)
+            start = row + (year - 1) * subjects
+            ws.merge_range(start, 2, start + subjects - 1, 2, year)
+
+        for k in range(block):
+            subject = SUBJECTS[(k + sid) % len(SUBJECTS)]
+            ws.merge_range(row + k, 3, row + k, 8, f"{subject}: {_text(rng, rng.randint(2, 5))}")
+        row += block
+
+    wb.close()
+    return path
+
+
+def write_haengteuk(path: Path, students: int, years: int = 3, seed: int = 0) -> Path:
+    rng = random.Random(seed + 2)
+    wb = xlsxwriter.Workbook(str(path))
+    ws = wb.add_worksheet("행특")
+    ws.write(0, 0, "행동특성 및 종합의견")
+    ws.write_row(2, 0, ["번 호", "성 명", "학 년", "행 동 특 성 및 종 합 의 견"])
+
+    row = 3
+    for sid, name in _roster(students, seed):
+        for y in range(1, years + 1):
+            first = y == 1
+            ws.write_row(row, 0, [sid if first else None, name if first else None, y, _text(rng, rng.randint(3, 6))])
+            row += 1
+
+    wb.close()
+    return path
+
+
+def write_changche(path: Path, students: int, years: int = 3, seed: int = 0) -> Path:
+    rng = random.Random(seed + 3)
+    wb = xlsxwriter.Workbook(str(path))
+    ws = wb.add_worksheet("창체")
+    ws.write(0, 0, "창의적체험활동상황")
+    ws.write_row(1, 0, ["번 호", "성 명", "학 년"])
+    ws.merge_range(1, 3, 1, 5, "창의적체험활동")
+    ws.write_row(2, 3, ["영역", "시간", "특기사항"])
+
+    row = 3
+    for sid, name in _roster(students, seed):
+        first = True
+        for y in range(1, years + 1):
+            for area in AREAS:
+                ws.write_row(row, 0, [
+                    sid if first else None,
+                    name if first else None,
+                    y if area == AREAS[0] else None,
+                    area,
+                    rng.choice([4, 8, 12, 17, 34]),
+                    _text(rng, rng.randint(1, 3)),
+                ])
+                first = False
+                row += 1
+
+    wb.close()
+    return path
+
+
+def file_name(students: int, kind: str) -> str:
+    # 레이아웃이 바뀌면 LAYOUT_VERSION을 올려, 이전에 만들어 둔 파일을 재사용하지 않게
+    return f"{students}명_{kind}_v{LAYOUT_VERSION}.xlsx"
+
+
+def generate(out_dir, students: int, seed: int = 0) -> Dict[str, Path]:
+    """out_dir에 {학생 수}명 규모의 세특/행특/창체 xlsx 3개를 만들고 경로를 반환."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    return {
+        "세특": write_seteuk(out / file_name(students, "세특"), students, seed=seed),
+        "행특": write_haengteuk(out / file_name(students, "행특"), students, seed=seed),
+        "창체": write_changche(out / file_name(students, "창체"), students, seed=seed),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="가상 NEIS 세특/행특/창체 xlsx 생성")
+    ap.add_argument("--students", type=int, nargs="+", default=[30, 300])
+    ap.add_argument("--out", default="bench_data")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for n in args.students:
+        for kind, path in generate(args.out, n, seed=args.seed).items():
+            print(f"{kind}\t{n}명\t{path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# tests/test_parser_seteuk.py
+# 세특 병합셀 파서: 학년(1/2/3) 병합셀이 번호로 잘못 분류되지 않는지, 세 가지 읽기 경로가 같은 결과인지 확인
+import pandas as pd
+import pytest
+
+xlsxwriter = pytest.importorskip("xlsxwriter")
+
+from utils import parser_seteuk
+from utils.parser_seteuk import _classify_info, load_seteuk
+
+STUDENTS = [(10101, "김하늘"), (10102, "이바다")]
+
+
+@pytest.fixture(scope="module")
+def workbook(tmp_path_factory):
+    """번호·성명은 학생 블록 전체, 학년은 학년별 2행, 세특 문장은 한 행씩 병합."""
+    path = tmp_path_factory.mktemp("seteuk") / "세특.xlsx"
+    wb = xlsxwriter.Workbook(str(path))
+    ws = wb.add_worksheet("세특")
+    ws.write(0, 0, "세부능력 및 특기사항")
+
+    row = 2
+    for sid, name in STUDENTS:
+        ws.merge_range(row, 0, row + 5, 0, sid)
+        ws.merge_range(row, 1, row + 5, 1, name)
+        for grade in (1, 2, 3):
+            ws.merge_range(row, 2, row + 1, 2, grade)
+            for k in range(2):
+                ws.merge_range(row + k, 3, row + k, 8, f"국어: {name} {grade}학년 활동 {k}.")
+            row += 2
+    wb.close()
+    return path
+
+
+def test_classify_grade_before_number():
+    assert _classify_info("1") == "학년"
+    assert _classify_info("3") == "학년"
+    assert _classify_info("10101") == "번호"
+    assert _classify_info("김하늘") == "성명"
+
+
+def _expected():
+    rows = []
+    for sid, name in STUDENTS:
+        for grade in (1, 2, 3):
+            for k in range(2):
+                rows.append((str(sid), name, grade, f"국어: {name} {grade}학년 활동 {k}."))
+    return rows
+
+
+def _rows(df):
+    return [(r["번호"], r["성명"], int(r["학년"]), r["세특내용"]) for _, r in df.iterrows()]
+
+
+def test_grade_does_not_overwrite_number(workbook):
+    df = load_seteuk(workbook, fast=False)
+    assert _rows(df) == _expected()
+
+
+@pytest.mark.parametrize("fast,private", [(True, True), (False, True), (False, False)])
+def test_scan_paths_agree(workbook, monkeypatch, fast, private):
+    # 빠른 경로 / openpyxl 내부 파서 / 공개 API 경로가 같은 결과
+    monkeypatch.setattr(parser_seteuk, "_USE_PRIVATE", private)
+    expected = load_seteuk(workbook, fast=False).reset_index(drop=True)
+    actual = load_seteuk(workbook, fast=fast).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected)
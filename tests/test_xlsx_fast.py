@@ -0,0 +1,90 @@
+# tests/test_xlsx_fast.py
+# xlsx 빠른 경로(utils/xlsx_fast)와 openpyxl/pandas 경로가 가상 NEIS 내보내기에서 같은 결과를 내는지 확인
+import zipfile
+from xml.etree.ElementTree import ParseError
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("xlsxwriter")
+
+from bench.synthetic_neis import generate
+from utils import xlsx_fast
+from utils.parser_changche import load_changche
+from utils.parser_haengteuk import load_haengteuk
+from utils.parser_seteuk import load_seteuk
+
+LOADERS = {"세특": load_seteuk, "행특": load_haengteuk, "창체": load_changche}
+
+
+@pytest.fixture(scope="module")
+def workbooks(tmp_path_factory):
+    return generate(tmp_path_factory.mktemp("neis"), students=25, seed=7)
+
+
+@pytest.mark.parametrize("kind", list(LOADERS))
+def test_fast_path_matches_openpyxl(workbooks, kind):
+    loader = LOADERS[kind]
+    expected = loader(workbooks[kind], fast=False)
+    actual = loader(workbooks[kind], fast=True)
+    assert len(actual) > 0
+    # 학년 매핑까지 확인 (가상 파일은 모든 기록에 1~3학년이 있음)
+    assert actual["학년"].notna().all()
+    assert set(actual["학년"].astype(int)) == {1, 2, 3}
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@pytest.mark.parametrize("kind", list(LOADERS))
+def test_fast_path_matches_openpyxl_from_bytes(workbooks, kind):
+    # 업로드 파일(BytesIO)도 같은 결과
+    from io import BytesIO
+    data = workbooks[kind].read_bytes()
+    expected = LOADERS[kind](BytesIO(data), fast=False)
+    actual = LOADERS[kind](BytesIO(data), fast=True)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@pytest.mark.parametrize("error", [ParseError("bad xml"), KeyError("xl/worksheets/sheet9.xml"), IndexError("row")])
+def test_malformed_xml_falls_back_to_openpyxl(workbooks, monkeypatch, error):
+    expected = {kind: loader(workbooks[kind], fast=False) for kind, loader in LOADERS.items()}
+
+    def broken(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(xlsx_fast, "read_excel_fast", broken)
+    monkeypatch.setattr(xlsx_fast, "scan_merged_cells", broken)
+    for kind, loader in LOADERS.items():
+        pd.testing.assert_frame_equal(loader(workbooks[kind], fast=True), expected[kind])
+
+
+def test_corrupt_sheet_xml_falls_back(workbooks, tmp_path):
+    # 시트 XML 끝을 잘라 낸 파일: 빠른 경로는 ParseError, openpyxl 경로의 결과(또는 오류)를 그대로 따름
+    src = workbooks["행특"]
+    broken = tmp_path / "broken.xlsx"
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(broken, "w") as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = data[: len(data) // 2]
+            zout.writestr(item, data)
+
+    with pytest.raises(ParseError):
+        xlsx_fast.read_excel_fast(broken)
+    try:
+        expected = load_haengteuk(broken, fast=False)
+    except Exception as e:
+        with pytest.raises(type(e)):
+            load_haengteuk(broken, fast=True)
+    else:
+        pd.testing.assert_frame_equal(load_haengteuk(broken, fast=True), expected)
+
+
+def test_fast_flag_is_per_call(workbooks, monkeypatch):
+    # 전역 설정을 바꾸지 않고 호출마다 경로를 고름
+    calls = []
+    real = xlsx_fast.read_excel_fast
+    monkeypatch.setattr(xlsx_fast, "read_excel_fast", lambda *a, **k: calls.append(1) or real(*a, **k))
+    load_haengteuk(workbooks["행특"], fast=False)
+    assert calls == []
+    load_haengteuk(workbooks["행특"], fast=True)
+    assert calls
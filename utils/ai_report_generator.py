@@ -1,9 +1,20 @@
+import contextvars
 import json
-import streamlit as st
-from openai import OpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
 
-# Streamlit secrets에서 API 키 로드
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+from utils import llm_cache, llm_ledger
+from utils.evidence_check import EvidenceIndex
+from utils.llm_backend import get_backend
+from utils.json_stream import TopLevelJSONStream
+from utils.prompt_budget import SOURCE_TOKEN_BUDGET, compact_section, count_tokens, split_chunks
+from utils.report_batch import request_slot
+from utils.report_schema import ReportSchemaError, salvage_members, template_from_prompt, validate_report
+
+MODEL = "gpt-4o-mini" # 비용 효율적인 모델 (성능 필요시 gpt-4-turbo 등 고려)
+TEMPERATURE = 0.3 # 창의성보다는 분석의 정확도와 일관성을 위해 낮게 설정
 
 SYSTEM_PROMPT = """
 당신은 대한민국 서울 주요 대학 입학사정관 출신의 20년 경력 진로·학업 컨설턴트이자, 
@@ -86,19 +97,19 @@ def _safe_json_loads(text: str):
     except Exception:
         return None
 
-def generate_sh_insight_report(
+def build_user_prompt(
     student_id: str,
     masked_name: str,
     year_count: int,
     seteuk_text: str,
     haengteuk_text: str,
     changche_text: str,
-):
+) -> str:
     seteuk_text = (seteuk_text or "").strip()
     haengteuk_text = (haengteuk_text or "").strip()
     changche_text = (changche_text or "").strip()
 
-    user_prompt = f"""
+    return f"""
 [분석 대상 학생 정보]
 - 학번: {student_id}
 - 성명(마스킹): {masked_name}
@@ -117,43 +128,503 @@ def generate_sh_insight_report(
 특히 '평가 근거 문장'은 반드시 위 원문 텍스트에서 그대로 발췌해야 하며, 절대 없는 사실을 지어내서는 안 됩니다.
 """
 
+def error_report(student_id: str, masked_name: str, year_count: int, error: Exception) -> dict:
+    """생성 실패 시 UI/PDF가 그대로 그릴 수 있는 빈 보고서 (점수 0)."""
+    return {
+        "학생 정보": {"학번": str(student_id), "성명": str(masked_name), "학년 수": int(year_count)},
+        "종합 평가": f"보고서 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.\n(에러 메시지: {str(error)})",
+        "핵심 강점": [],
+        "보완 추천 영역": [],
+        "3대 평가 항목별 상세 분석": {
+            "학업역량": {"점수": 0, "평가 근거 문장": [], "분석": ""},
+            "학업태도": {"점수": 0, "평가 근거 문장": [], "분석": ""},
+            "학업 외 소양": {"점수": 0, "평가 근거 문장": [], "분석": ""},
+        },
+        "영역별 심화 탐구 주제 제안": {"자율": "", "진로": "", "동아리": ""},
+        "역량 기반 추천 학과": [],
+        "맞춤형 성장 제안": {
+            "생활기록부 중점 보완 전략": "",
+            "추천 학교 행사": [],
+            "추천 활동 설계": []
+        },
+        "추천 도서": [],
+        "raw": ""
+    }
+
+# 학생별 경로 설정(report_routing)이 정한 모델·출력 상한. 작업 스레드까지 컨텍스트로 전달됨
+_overrides: contextvars.ContextVar[dict] = contextvars.ContextVar("llm_overrides", default={})
+
+@contextmanager
+def using(model: Optional[str] = None, max_tokens: Optional[int] = None):
+    """with using(model=..., max_tokens=...): 안에서 만드는 요청에 적용 (None이면 기본값)."""
+    token = _overrides.set({"model": model or MODEL, "max_tokens": max_tokens})
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini", # 비용 효율적인 모델 (성능 필요시 gpt-4-turbo 등 고려)
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.3, # 창의성보다는 분석의 정확도와 일관성을 위해 낮게 설정
-            response_format={"type": "json_object"} # 강제 JSON 모드 (GPT-4/3.5-turbo 지원)
-        )
+        yield
+    finally:
+        _overrides.reset(token)
 
-        content = response.choices[0].message.content
-        data = _safe_json_loads(content)
+def current_model() -> str:
+    return _overrides.get().get("model") or MODEL
 
-        if data is None:
-            raise ValueError("JSON parsing failed")
+def chat_request_body(user_prompt: str, system_prompt: str = SYSTEM_PROMPT) -> dict:
+    """chat.completions 요청 본문 (즉시 호출과 배치 파일이 같은 요청을 쓰도록 한 곳에서 만듦)."""
+    body = {
+        "model": current_model(),
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": TEMPERATURE,
+        "response_format": {"type": "json_object"}, # 강제 JSON 모드 (GPT-4/3.5-turbo 지원)
+    }
+    max_tokens = _overrides.get().get("max_tokens")
+    if max_tokens:
+        # 상한에 걸려 잘린 응답은 parse_report가 닫힌 항목만 살리고 나머지를 보완함
+        body["max_tokens"] = int(max_tokens)
+    return body
+
+def _parse_json(content: str) -> dict:
+    data = _safe_json_loads(content)
+    if data is None:
+        raise ValueError("JSON parsing failed")
+    return data
 
-        return data
+def _chat_json(
+    system_prompt: str,
+    user_prompt: str,
+    parse: Callable[[str], dict] = _parse_json,
+    use_cache: bool = True,
+    kind: str = "report",
+    cache_if: Optional[Callable[[dict], bool]] = None,
+    report: bool = False,
+) -> dict:
+    """
+    JSON 모드로 한 번 호출. 같은 요청은 캐시에서 바로 반환하고, 실패는 예외로 올린다.
+    cache_if를 주면 그 검사를 통과한 결과만 저장한다 (불완전한 결과가 캐시에 남아 매번 보완되지 않게).
+    report=True면 학생의 최종 보고서 요청이라 캐시 적중을 보고서 재사용으로 센다.
+    """
+    # 같은 원문·프롬프트·모델이면 저장된 응답을 그대로 사용
+    key = llm_cache.cache_key(system_prompt, user_prompt, current_model(), TEMPERATURE)
+    cached = llm_cache.get(key, report=report) if use_cache else None
+    if cached is not None:
+        return cached
 
+    # 실제 호출은 백엔드가 담당 (OpenAI / 목 서버 / 녹화·재생), 호출마다 장부에 한 줄
+    backend = get_backend()
+    completion = None
+    parse_state = ""
+    error = None
+    t0 = time.perf_counter()
+    latency_ms = None
+    try:
+        with request_slot():
+            completion = backend.complete(chat_request_body(user_prompt, system_prompt))
+        latency_ms = (time.perf_counter() - t0) * 1000
+        parse_state = "json" if _safe_json_loads(completion.content) is not None else "salvaged"
+        data = parse(completion.content)
     except Exception as e:
-        return {
-            "학생 정보": {"학번": str(student_id), "성명": str(masked_name), "학년 수": int(year_count)},
-            "종합 평가": f"보고서 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.\n(에러 메시지: {str(e)})",
-            "핵심 강점": [],
-            "보완 추천 영역": [],
-            "3대 평가 항목별 상세 분석": {
-                "학업역량": {"점수": 0, "평가 근거 문장": [], "분석": ""},
-                "학업태도": {"점수": 0, "평가 근거 문장": [], "분석": ""},
-                "학업 외 소양": {"점수": 0, "평가 근거 문장": [], "분석": ""},
-            },
-            "영역별 심화 탐구 주제 제안": {"자율": "", "진로": "", "동아리": ""},
-            "역량 기반 추천 학과": [],
-            "맞춤형 성장 제안": {
-                "생활기록부 중점 보완 전략": "",
-                "추천 학교 행사": [],
-                "추천 활동 설계": []
-            },
-            "추천 도서": [],
-            "raw": ""
+        error = e
+        if completion is not None and llm_ledger.outcome_of(e) == "parse_error":
+            parse_state = "failed"
+        raise
+    finally:
+        llm_ledger.record(llm_ledger.CallRecord(
+            kind=kind,
+            model=(completion.model if completion is not None else "") or current_model(),
+            latency_ms=latency_ms if latency_ms is not None else (time.perf_counter() - t0) * 1000,
+            outcome=llm_ledger.outcome_of(error),
+            parse=parse_state,
+            prompt_tokens=completion.prompt_tokens if completion is not None else 0,
+            completion_tokens=completion.completion_tokens if completion is not None else 0,
+            backend=backend.name,
+            error=str(error)[:200] if error is not None else "",
+        ))
+
+    # 정상 응답만 저장 (오류 대체 보고서는 예외 경로라 여기 오지 않음)
+    if use_cache and (cache_if is None or cache_if(data)):
+        try:
+            llm_cache.put(key, data)
+        except OSError:
+            pass
+    return data
+
+# -----------------------------
+# 형식 검사: 빠지거나 잘못된 최상위 항목만 작게 다시 요청해 채움
+# -----------------------------
+REPORT_TEMPLATE = template_from_prompt(SYSTEM_PROMPT)
+# 다시 요청할 횟수 (보완 요청 1회면 대부분 해결됨)
+REPAIR_ROUNDS = 2
+
+def build_partial_system_prompt(keys) -> str:
+    """분석 가이드라인은 그대로 두고, 출력 형식을 keys 항목만으로 줄인 시스템 프롬프트 (보완·항목별 생성 공용)."""
+    guide = SYSTEM_PROMPT.split("[출력 형식]", 1)[0]
+    fragment = json.dumps({k: REPORT_TEMPLATE[k] for k in keys}, ensure_ascii=False, indent=2)
+    return (
+        f"{guide}[출력 형식]\n"
+        "보고서의 일부 항목만 작성합니다. 아래 JSON 스키마의 항목만 엄수하여 출력하십시오. "
+        "(다른 항목, Markdown 코드 블록이나 기타 텍스트 절대 포함 금지)\n\n"
+        f"{fragment}\n"
+    )
+
+def complete_report(
+    data: Any,
+    user_prompt: str,
+    student_id: str,
+    masked_name: str,
+    year_count: int,
+    max_rounds: int = REPAIR_ROUNDS,
+) -> dict:
+    """
+    보고서를 스키마와 비교해, 문제 있는 항목만 같은 원문으로 다시 요청해 합친다.
+    '학생 정보'는 호출 없이 알고 있는 값으로 채운다. 끝내 맞지 않으면 ReportSchemaError.
+    """
+    report, problems = validate_report(data, REPORT_TEMPLATE)
+    if "학생 정보" in problems:
+        report["학생 정보"] = {"학번": str(student_id), "성명": str(masked_name), "학년 수": int(year_count)}
+        problems.pop("학생 정보")
+
+    for _ in range(max_rounds):
+        if not problems:
+            break
+        keys = list(problems)
+        patch = _chat_json(build_partial_system_prompt(keys), user_prompt, use_cache=False, kind="repair")
+        report.update({k: patch[k] for k in keys if k in patch})
+        report, problems = validate_report(report, REPORT_TEMPLATE)
+        problems.pop("학생 정보", None)
+
+    if problems:
+        raise ReportSchemaError(list(problems))
+    # 스키마 순서대로 (UI·PDF·미리보기가 같은 순서로 그림)
+    return {**{k: report[k] for k in REPORT_TEMPLATE}, **report}
+
+def parse_report(content: str, user_prompt: str, student_id: str, masked_name: str, year_count: int) -> dict:
+    """응답 텍스트 → 검사·보완을 마친 보고서. 전체 파싱이 안 되면 닫힌 항목만 건져서 나머지를 보완한다."""
+    data = _safe_json_loads(content)
+    if data is None:
+        data = salvage_members(content)
+    if not data:
+        raise ValueError("JSON parsing failed")
+    return complete_report(data, user_prompt, student_id, masked_name, year_count)
+
+def _emit_changes(on_section, shown: dict, report: dict) -> None:
+    """이미 보여 준 항목과 달라졌거나(보완·정규화) 새로 생긴 항목만 이어서 on_section으로 보냄."""
+    if on_section:
+        for k, v in report.items():
+            if k in REPORT_TEMPLATE and shown.get(k) != v:
+                on_section(k, v)
+
+def _report_json(user_prompt: str, student_id: str, masked_name: str, year_count: int) -> dict:
+    return _chat_json(
+        SYSTEM_PROMPT, user_prompt,
+        parse=lambda content: parse_report(content, user_prompt, student_id, masked_name, year_count),
+        report=True,
+    )
+
+def request_sh_insight_report(
+    student_id: str,
+    masked_name: str,
+    year_count: int,
+    seteuk_text: str,
+    haengteuk_text: str,
+    changche_text: str,
+) -> dict:
+    """API를 한 번 호출해 보고서 dict를 반환. 실패(429 포함)는 예외로 그대로 올린다."""
+    user_prompt = build_user_prompt(
+        student_id, masked_name, year_count, seteuk_text, haengteuk_text, changche_text
+    )
+
+    return _report_json(user_prompt, student_id, masked_name, year_count)
+
+def _record_stream(backend, t0, first_ms, user_prompt, content, outcome, parse_state, error, latency_ms=None):
+    # 스트리밍 응답에는 usage가 없어 토큰 수는 추정치로 남김
+    llm_ledger.record(llm_ledger.CallRecord(
+        kind="stream",
+        model=current_model(),
+        latency_ms=latency_ms if latency_ms is not None else (time.perf_counter() - t0) * 1000,
+        outcome=outcome,
+        parse=parse_state,
+        prompt_tokens=count_tokens(SYSTEM_PROMPT) + count_tokens(user_prompt),
+        completion_tokens=count_tokens(content),
+        tokens_estimated=True,
+        first_token_ms=first_ms,
+        backend=backend.name,
+        error=error[:200],
+    ))
+
+def stream_sh_insight_report(
+    student_id: str,
+    masked_name: str,
+    year_count: int,
+    seteuk_text: str,
+    haengteuk_text: str,
+    changche_text: str,
+    on_section: Optional[Callable[[str, Any], None]] = None,
+) -> dict:
+    """
+    request_sh_insight_report의 스트리밍 버전. 토큰이 들어오는 대로 JSON을 읽어 최상위 항목이
+    닫힐 때마다 on_section(키, 값)을 부른다. 최종 반환값은 전체 응답을 같은 방식으로 파싱한 결과라
+    비스트리밍 호출과 동일하다. 실패는 예외로 올린다.
+    """
+    user_prompt = build_user_prompt(
+        student_id, masked_name, year_count, seteuk_text, haengteuk_text, changche_text
+    )
+
+    key = llm_cache.cache_key(SYSTEM_PROMPT, user_prompt, current_model(), TEMPERATURE)
+    cached = llm_cache.get(key, report=True)
+    if cached is not None:
+        if on_section:
+            for k, v in cached.items():
+                on_section(k, v)
+        return cached
+
+    parser = TopLevelJSONStream()
+    parts = []
+    shown = {}
+    backend = get_backend()
+    t0 = time.perf_counter()
+    first_ms = None
+    try:
+        with request_slot():
+            for delta in backend.stream(chat_request_body(user_prompt)):
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - t0) * 1000
+                parts.append(delta)
+                for k, v in parser.feed(delta):
+                    shown[k] = v
+                    if on_section:
+                        on_section(k, v)
+    except Exception as e:
+        _record_stream(backend, t0, first_ms, user_prompt, "".join(parts), llm_ledger.outcome_of(e), "", str(e))
+        raise
+
+    content = "".join(parts)
+    parse_state = "json" if _safe_json_loads(content) is not None else "salvaged"
+    latency_ms = (time.perf_counter() - t0) * 1000
+    try:
+        data = parse_report(content, user_prompt, student_id, masked_name, year_count)
+    except Exception as e:
+        outcome = llm_ledger.outcome_of(e)
+        _record_stream(backend, t0, first_ms, user_prompt, content, outcome,
+                       "failed" if outcome == "parse_error" else parse_state, str(e), latency_ms)
+        raise
+    _record_stream(backend, t0, first_ms, user_prompt, content, "ok", parse_state, "", latency_ms)
+    # 보완 요청으로 새로 채우거나 고친 항목만 이어서 보여 줌
+    _emit_changes(on_section, shown, data)
+
+    try:
+        llm_cache.put(key, data)
+    except OSError:
+        pass
+    return data
+
+# -----------------------------
+# 항목별 동시 생성: 서로 독립인 항목 묶음을 같은 원문으로 동시에 요청해 합침
+# (응답 길이가 지연 시간을 좌우하므로, 가장 긴 묶음 하나의 시간만 기다리면 됨)
+# -----------------------------
+SECTION_GROUPS = {
+    "평가": ["종합 평가", "핵심 강점", "보완 추천 영역", "3대 평가 항목별 상세 분석"],
+    "성장": ["영역별 심화 탐구 주제 제안", "맞춤형 성장 제안", "추천 도서"],
+    "학과": ["역량 기반 추천 학과"],
+}
+
+def _parse_partial(content: str) -> dict:
+    data = _safe_json_loads(content) or salvage_members(content)
+    if not data:
+        raise ValueError("JSON parsing failed")
+    return data
+
+def _group_complete(keys) -> Callable[[dict], bool]:
+    """묶음 응답이 그 묶음 항목 모두 형식에 맞는지 (맞을 때만 묶음 단위로 캐시)."""
+    template = {k: REPORT_TEMPLATE[k] for k in keys}
+    return lambda part: not validate_report(part, template)[1]
+
+def request_parallel_report(
+    student_id: str,
+    masked_name: str,
+    year_count: int,
+    seteuk_text: str,
+    haengteuk_text: str,
+    changche_text: str,
+    on_section: Optional[Callable[[str, Any], None]] = None,
+) -> dict:
+    """
+    SECTION_GROUPS 묶음마다 같은 원문으로 동시에 요청해 하나의 SH-Insight JSON으로 합친다.
+    묶음이 끝나는 대로 호출한 스레드에서 on_section(키, 값)을 부른다.
+    한 묶음이 깨지면 그 항목만 complete_report가 보완하고, 429는 그대로 올려 상위 재시도에 맡긴다
+    (먼저 끝난 온전한 묶음은 캐시에 남아 재시도 때 다시 호출하지 않음). 합쳐서 검사를 마친 보고서는
+    한 번에 생성한 보고서와 같은 키로 저장해, 다음 실행은 묶음·보완 호출 없이 바로 돌려준다.
+    """
+    from utils.report_batch import is_rate_limited
+
+    user_prompt = build_user_prompt(
+        student_id, masked_name, year_count, seteuk_text, haengteuk_text, changche_text
+    )
+
+    key = llm_cache.cache_key(SYSTEM_PROMPT, user_prompt, current_model(), TEMPERATURE)
+    cached = llm_cache.get(key, report=True)
+    if cached is not None:
+        if on_section:
+            for k, v in cached.items():
+                on_section(k, v)
+        return cached
+
+    merged: Dict[str, Any] = {
+        "학생 정보": {"학번": str(student_id), "성명": str(masked_name), "학년 수": int(year_count)},
+    }
+    if on_section:
+        on_section("학생 정보", merged["학생 정보"])
+
+    rate_limited = None
+    with ThreadPoolExecutor(max_workers=len(SECTION_GROUPS)) as pool:
+        # 호출 장부의 학생·재시도 정보가 작업 스레드까지 이어지도록 컨텍스트를 복사해서 넘김
+        futures = {
+            pool.submit(contextvars.copy_context().run, _chat_json,
+                        build_partial_system_prompt(keys), user_prompt, _parse_partial, True, "partial",
+                        _group_complete(keys)): keys
+            for keys in SECTION_GROUPS.values()
         }
+        for fut in as_completed(futures):
+            try:
+                part = fut.result()
+            except Exception as e:
+                if is_rate_limited(e):
+                    rate_limited = e
+                continue
+            for k in futures[fut]:
+                if k in part:
+                    merged[k] = part[k]
+                    if on_section:
+                        on_section(k, part[k])
+
+    if rate_limited is not None:
+        raise rate_limited
+
+    report = complete_report(merged, user_prompt, student_id, masked_name, year_count)
+    _emit_changes(on_section, merged, report)
+    try:
+        llm_cache.put(key, report)
+    except OSError:
+        pass
+    return report
+
+# -----------------------------
+# 긴 기록: 학년·영역별 요약(map) → 요약본으로 최종 보고서(reduce)
+# -----------------------------
+# 한 조각(학년·영역)당 원문 토큰 상한과 동시에 보낼 요약 요청 수
+DIGEST_CHUNK_TOKENS = 4000
+DIGEST_MAX_WORKERS = 4
+
+DIGEST_SYSTEM_PROMPT = """
+당신은 학생부 평가를 돕는 입학사정관 보조 분석가입니다.
+주어진 생활기록부 일부(특정 학년·영역)를 읽고, 최종 보고서 작성자가 원문 없이도 평가할 수 있도록 근거를 정리하십시오.
+
+[규칙]
+1. "근거 문장"은 반드시 원문에서 한 글자도 바꾸지 않고 그대로 복사하십시오. 요약·수정·번역·생략 부호 사용 금지.
+2. 학업역량·학업태도·학업 외 소양을 판단하는 데 의미 있는 문장을 최대 8개까지 고르십시오.
+3. 원문에 없는 사실은 절대 쓰지 마십시오.
+
+[출력 형식] 아래 JSON만 출력하십시오.
+{
+  "핵심 활동": ["활동 요약 1", "활동 요약 2"],
+  "드러난 역량": ["역량 키워드: 한 줄 설명"],
+  "근거 문장": ["원문 그대로 1", "원문 그대로 2"]
+}
+"""
+
+def digest_section(label: str, text: str) -> dict:
+    """한 학년·영역 원문을 요약. 원문에 그대로 없는 '근거 문장'은 버린다."""
+    data = _chat_json(DIGEST_SYSTEM_PROMPT, f"[{label} 원문]\n{text}", kind="digest")
+
+    index = EvidenceIndex({label: text})
+    quotes = data.get("근거 문장", [])
+    quotes = [q for q in quotes if isinstance(q, str) and index.find(q)] if isinstance(quotes, list) else []
+    return {
+        "핵심 활동": data.get("핵심 활동", []) if isinstance(data.get("핵심 활동"), list) else [],
+        "드러난 역량": data.get("드러난 역량", []) if isinstance(data.get("드러난 역량"), list) else [],
+        "근거 문장": quotes,
+    }
+
+
+def split_sections(sections: Dict[str, str], max_tokens: int = DIGEST_CHUNK_TOKENS) -> Dict[str, str]:
+    """정리 후에도 긴 학년·영역은 줄 단위로 더 나눠 '1학년 세특 (1/2)'처럼 라벨을 붙인다."""
+    out: Dict[str, str] = {}
+    for label, text in sections.items():
+        text = compact_section(text)
+        if not text:
+            continue
+        chunks = split_chunks(text, max_tokens) if count_tokens(text) > max_tokens else [text]
+        if len(chunks) == 1:
+            out[label] = chunks[0]
+        else:
+            for n, chunk in enumerate(chunks, start=1):
+                out[f"{label} ({n}/{len(chunks)})"] = chunk
+    return out
+
+
+def build_digest_prompt(student_id: str, masked_name: str, year_count: int, digests: Dict[str, dict]) -> str:
+    blocks = []
+    for label, d in digests.items():
+        lines = [f"[{label} 요약]"]
+        lines += [f"- 활동: {x}" for x in d["핵심 활동"]]
+        lines += [f"- 역량: {x}" for x in d["드러난 역량"]]
+        if d["근거 문장"]:
+            lines.append("- 근거 문장(원문 그대로):")
+            lines += [f"  \"{q}\"" for q in d["근거 문장"]]
+        blocks.append("\n".join(lines))
+    digest_text = "\n\n".join(blocks) if blocks else "(기록 없음)"
+
+    return f"""
+[분석 대상 학생 정보]
+- 학번: {student_id}
+- 성명(마스킹): {masked_name}
+- 기록된 학년 수: {year_count}
+
+기록 분량이 많아 학년·영역별로 먼저 정리한 요약본입니다.
+
+{digest_text}
+
+위 요약본을 바탕으로 SYSTEM_PROMPT의 가이드라인과 JSON 출력 형식을 엄격히 준수하여 보고서를 작성해주십시오.
+특히 '평가 근거 문장'은 반드시 위 '근거 문장(원문 그대로)' 목록에서 글자 그대로 골라야 하며, 새로 만들거나 고쳐 쓰면 안 됩니다.
+"""
+
+
+def needs_map_reduce(sections: Dict[str, str], budget: int = SOURCE_TOKEN_BUDGET) -> bool:
+    return sum(count_tokens(compact_section(t)) for t in sections.values()) > budget
+
+
+def request_map_reduce_report(
+    student_id: str,
+    masked_name: str,
+    year_count: int,
+    sections: Dict[str, str],
+    max_workers: int = DIGEST_MAX_WORKERS,
+) -> dict:
+    """
+    {"1학년 세특": 원문, ...}을 조각별로 동시에 요약한 뒤, 요약본으로 최종 SH-Insight JSON을 만든다.
+    실패(429 포함)는 예외로 올린다.
+    """
+    chunks = split_sections(sections)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks) or 1))) as pool:
+        futures = {label: pool.submit(contextvars.copy_context().run, digest_section, label, text)
+                   for label, text in chunks.items()}
+        digests = {label: fut.result() for label, fut in futures.items()}
+
+    return _report_json(build_digest_prompt(student_id, masked_name, year_count, digests), student_id, masked_name, year_count)
+
+def generate_sh_insight_report(
+    student_id: str,
+    masked_name: str,
+    year_count: int,
+    seteuk_text: str,
+    haengteuk_text: str,
+    changche_text: str,
+    strategy: str = "single",
+):
+    """strategy: "single"(한 번에 생성) / "parallel"(항목 묶음별 동시 생성). 실패하면 오류 보고서."""
+    request = request_parallel_report if strategy == "parallel" else request_sh_insight_report
+    try:
+        return request(
+            student_id, masked_name, year_count, seteuk_text, haengteuk_text, changche_text
+        )
+    except Exception as e:
+        return error_report(student_id, masked_name, year_count, e)
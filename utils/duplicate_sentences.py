@@ -0,0 +1,192 @@
+# utils/duplicate_sentences.py
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.text_builder import get_id_col, normalize_id_series
+
+# 학생 간 비교 대상 컬럼
+TEXT_COLUMNS = {"세특": "세특내용", "행특": "행특내용"}
+
+# 너무 짧은 문장("성실함." 등)은 우연히 겹치기 쉬우므로 제외
+MIN_SENTENCE_CHARS = 15
+SHINGLE_SIZE = 3
+
+# 120개 해시 = 20밴드 × 6행 → 글자 3-gram 유사도 약 0.6 이상이 후보로 잡힘
+# (30자 안팎 문장에서 한두 어절만 바꾼 정도)
+NUM_PERM = 120
+BANDS = 20
+THRESHOLD = 0.6
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass
+class Occurrence:
+    sid: str
+    kind: str  # "세특" / "행특"
+    sentence: str
+
+
+@dataclass
+class DuplicateCluster:
+    """서로 거의 같은 문장 묶음 (두 명 이상의 학생에게서 나온 것만)."""
+    occurrences: List[Occurrence] = field(default_factory=list)
+
+    @property
+    def students(self) -> List[str]:
+        return sorted({o.sid for o in self.occurrences})
+
+    @property
+    def variants(self) -> List[str]:
+        return list(dict.fromkeys(o.sentence for o in self.occurrences))
+
+    @property
+    def representative(self) -> str:
+        return self.variants[0]
+
+
+def split_sentences(text: str) -> List[str]:
+    parts = (_SPACES.sub(" ", p).strip() for p in _SENT_SPLIT.split(str(text)))
+    return [p for p in parts if len(p) >= MIN_SENTENCE_CHARS]
+
+
+def _shingle_hashes(sentence: str) -> np.ndarray:
+    """공백을 뺀 글자 3-gram의 32비트 해시 (한글은 어절보다 글자 단위가 변형에 강함)."""
+    s = sentence.replace(" ", "")
+    if len(s) <= SHINGLE_SIZE:
+        grams = {s}
+    else:
+        grams = {s[i:i + SHINGLE_SIZE] for i in range(len(s) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    return a, b
+
+
+def minhash_signatures(sentences: List[str], num_perm: int = NUM_PERM, seed: int = 1) -> np.ndarray:
+    """문장별 MinHash 서명 (len(sentences) × num_perm, uint32)."""
+    a, b = _permutations(num_perm, seed)
+    sigs = np.empty((len(sentences), num_perm), dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for i, sentence in enumerate(sentences):
+            hv = _shingle_hashes(sentence)[:, None]
+            sigs[i] = (((hv * a + b) % _MERSENNE) & _MAX_HASH).min(axis=0)
+    return sigs
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x: int, y: int):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[ry] = rx
+
+
+def lsh_groups(sigs: np.ndarray, bands: int = BANDS, threshold: float = THRESHOLD) -> List[List[int]]:
+    """
+    밴드별 버킷으로 후보를 찾고, 버킷 대표와의 추정 유사도가 threshold 이상이면 묶는다.
+    모든 쌍을 비교하지 않으므로 문장 수에 거의 선형.
+    """
+    n, num_perm = sigs.shape
+    rows = num_perm // bands
+    uf = _UnionFind(n)
+
+    for band in range(bands):
+        chunk = np.ascontiguousarray(sigs[:, band * rows:(band + 1) * rows])
+        buckets: Dict[bytes, int] = {}
+        for i in range(n):
+            key = chunk[i].tobytes()
+            head = buckets.setdefault(key, i)
+            if head != i and uf.find(head) != uf.find(i):
+                if np.mean(sigs[head] == sigs[i]) >= threshold:
+                    uf.union(head, i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(uf.find(i), []).append(i)
+    return list(groups.values())
+
+
+def _collect_sentences(frames: Dict[str, pd.DataFrame]) -> List[Occurrence]:
+    occ: List[Occurrence] = []
+    for kind, col in TEXT_COLUMNS.items():
+        df = frames.get(kind)
+        if df is None or df.empty or col not in df.columns:
+            continue
+        id_col = get_id_col(df)
+        if id_col not in df.columns:
+            continue
+        sub = df[[id_col, col]].dropna()
+        for sid, text in zip(normalize_id_series(sub[id_col]), sub[col]):
+            occ.extend(Occurrence(sid, kind, s) for s in split_sentences(text))
+    return occ
+
+
+def find_duplicate_sentences(
+    df_seteuk: Optional[pd.DataFrame],
+    df_haeng: Optional[pd.DataFrame],
+    threshold: float = THRESHOLD,
+    min_students: int = 2,
+) -> List[DuplicateCluster]:
+    """
+    세특내용/행특내용을 문장 단위로 나눠 학생 간 거의 같은 문장 묶음을 찾는다.
+    같은 문장이 여러 번 나오면 한 번만 해시하고, 학생 수가 많은 묶음부터 반환.
+    """
+    occurrences = _collect_sentences({"세특": df_seteuk, "행특": df_haeng})
+    if not occurrences:
+        return []
+
+    by_text: Dict[str, List[Occurrence]] = {}
+    for o in occurrences:
+        by_text.setdefault(o.sentence, []).append(o)
+    unique = list(by_text)
+
+    groups = lsh_groups(minhash_signatures(unique), threshold=threshold)
+
+    clusters = []
+    for g in groups:
+        cluster = DuplicateCluster([o for i in g for o in by_text[unique[i]]])
+        if len(cluster.students) >= min_students:
+            clusters.append(cluster)
+
+    clusters.sort(key=lambda c: (-len(c.students), c.representative))
+    return clusters
+
+
+def clusters_table(clusters: List[DuplicateCluster], max_ids: int = 20) -> pd.DataFrame:
+    """페이지 표시용 요약 표."""
+    rows = []
+    for c in clusters:
+        students = c.students
+        ids = ", ".join(students[:max_ids]) + (f" 외 {len(students) - max_ids}명" if len(students) > max_ids else "")
+        rows.append({
+            "대표 문장": c.representative,
+            "학생 수": len(students),
+            "변형 수": len(c.variants),
+            "구분": "·".join(sorted({o.kind for o in c.occurrences})),
+            "학번": ids,
+        })
+    return pd.DataFrame(rows, columns=["대표 문장", "학생 수", "변형 수", "구분", "학번"])
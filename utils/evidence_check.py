@@ -0,0 +1,142 @@
+# utils/evidence_check.py
+from __future__ import annotations
+
+import os
+import re
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+# flag(원문에 없는 근거 문장을 표시만) / drop(보고서에서 빼고 검증 기록에만 남김) / off
+EVIDENCE_MODE = os.environ.get("SEHWA_EVIDENCE_MODE", "drop")
+
+AREAS = ["학업역량", "학업태도", "학업 외 소양"]
+# 정규화 후 이보다 짧은 근거("성실함" 등)는 어디에나 있을 수 있어 일치로 보지 않음
+MIN_QUOTE_CHARS = 8
+# 강조 표시할 때 일치 구간 앞뒤로 보여 줄 원문 글자 수
+CONTEXT_CHARS = 40
+
+# 비교는 글자(한글·영문·숫자)만으로: 띄어쓰기·줄바꿈·문장부호·따옴표 차이는 무시
+_TOKEN = re.compile(r"[0-9A-Za-z가-힣ㄱ-ㅎㅏ-ㅣ]+")
+_SEP = "\x00"
+
+
+@dataclass
+class EvidenceCheck:
+    area: str
+    quote: str
+    matched: bool
+    source: str = ""        # 일치한 원문 구역 ("세특", "2학년 행특" …)
+    start: int = -1         # 원문 구역 안에서의 일치 구간 [start, end)
+    end: int = -1
+    before: str = ""        # 강조 표시용 앞뒤 원문
+    text: str = ""          # 원문 그대로의 일치 구간
+    after: str = ""
+
+
+def _normalize(text: str) -> Tuple[str, List[int], List[int]]:
+    """(정규화 문자열, 각 글자 덩어리의 정규화 시작 위치, 원문 시작 위치). 위치 복원은 bisect로."""
+    norm_parts: List[str] = []
+    norm_starts: List[int] = []
+    orig_starts: List[int] = []
+    n = 0
+    for m in _TOKEN.finditer(text or ""):
+        norm_starts.append(n)
+        orig_starts.append(m.start())
+        part = m.group().lower()
+        norm_parts.append(part)
+        n += len(part)
+    return "".join(norm_parts), norm_starts, orig_starts
+
+
+class EvidenceIndex:
+    """
+    한 학생의 원문 구역들을 한 번만 정규화해 두고, 근거 문장마다 일치 위치를 원문 좌표로 돌려준다.
+    구역 사이에는 구분 문자를 넣어 두 구역에 걸친 가짜 일치를 막는다.
+    """
+
+    def __init__(self, sources: Dict[str, str]):
+        self.sources = {k: v or "" for k, v in sources.items()}
+        parts = []
+        self._segments = []   # (정규화 시작, 구역명, 덩어리 정규화 시작들, 덩어리 원문 시작들)
+        offset = 0
+        for name, text in self.sources.items():
+            norm, norm_starts, orig_starts = _normalize(text)
+            self._segments.append((offset, name, norm_starts, orig_starts))
+            parts.append(norm)
+            offset += len(norm) + len(_SEP)
+        self._text = _SEP.join(parts)
+        self._seg_starts = [s[0] for s in self._segments]
+
+    def _to_source(self, pos: int, length: int) -> Tuple[str, int, int]:
+        seg_start, name, norm_starts, orig_starts = self._segments[bisect_right(self._seg_starts, pos) - 1]
+
+        def orig(p: int) -> int:
+            k = bisect_right(norm_starts, p) - 1
+            return orig_starts[k] + (p - norm_starts[k])
+
+        local = pos - seg_start
+        return name, orig(local), orig(local + length - 1) + 1
+
+    def find(self, quote: str) -> Optional[Tuple[str, int, int]]:
+        """(구역명, 원문 시작, 원문 끝) 또는 None."""
+        norm, _, _ = _normalize(quote)
+        if len(norm) < MIN_QUOTE_CHARS:
+            return None
+        pos = self._text.find(norm)
+        if pos < 0:
+            return None
+        return self._to_source(pos, len(norm))
+
+    def check(self, area: str, quote: str) -> EvidenceCheck:
+        hit = self.find(str(quote))
+        if hit is None:
+            return EvidenceCheck(area=area, quote=str(quote), matched=False)
+        name, start, end = hit
+        source = self.sources[name]
+        return EvidenceCheck(
+            area=area, quote=str(quote), matched=True, source=name, start=start, end=end,
+            before=source[max(0, start - CONTEXT_CHARS):start],
+            text=source[start:end],
+            after=source[end:end + CONTEXT_CHARS],
+        )
+
+
+def check_report(report: dict, sources: Dict[str, str]) -> List[EvidenceCheck]:
+    """보고서의 '평가 근거 문장' 전부를 원문과 대조."""
+    detail = report.get("3대 평가 항목별 상세 분석")
+    if not isinstance(detail, dict):
+        return []
+    index = EvidenceIndex(sources)
+    checks = []
+    for area in AREAS:
+        quotes = (detail.get(area) or {}).get("평가 근거 문장") if isinstance(detail.get(area), dict) else None
+        for quote in quotes if isinstance(quotes, list) else []:
+            checks.append(index.check(area, quote))
+    return checks
+
+
+def verify_report(report: dict, sources: Dict[str, str], mode: str = EVIDENCE_MODE) -> dict:
+    """
+    근거 문장을 원문과 대조한 결과를 report["근거 검증"]에 붙여 새 dict로 반환한다.
+    mode="drop"이면 원문에 없는 근거 문장을 '평가 근거 문장'에서 뺀다 (PDF에 들어가지 않게).
+    """
+    if mode == "off" or not isinstance(report, dict):
+        return report
+    checks = check_report(report, sources)
+    if not checks:
+        return report
+
+    report = dict(report)
+    if mode == "drop":
+        detail = {k: dict(v) if isinstance(v, dict) else v for k, v in report["3대 평가 항목별 상세 분석"].items()}
+        for area in AREAS:
+            if isinstance(detail.get(area), dict):
+                detail[area]["평가 근거 문장"] = [c.quote for c in checks if c.area == area and c.matched]
+        report["3대 평가 항목별 상세 분석"] = detail
+    report["근거 검증"] = [asdict(c) for c in checks]
+    return report
+
+
+def unverified_count(report: dict) -> int:
+    return sum(1 for c in report.get("근거 검증", []) if not c.get("matched"))
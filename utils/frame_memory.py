@@ -0,0 +1,83 @@
+# utils/frame_memory.py
+from __future__ import annotations
+
+import importlib.util
+from typing import Dict, Optional
+
+import pandas as pd
+
+_HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+# 같은 값이 수천 번 반복되는 컬럼 → category
+CATEGORY_COLS = ["번호", "성명", "영역"]
+# 긴 원문 텍스트 컬럼 → Arrow 문자열
+TEXT_COLS = ["세특내용", "행특내용"]
+
+
+def _text_dtype() -> str:
+    return "string[pyarrow]" if _HAS_ARROW else "string"
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    세션에 오래 보관하는 파싱 결과를 작은 dtype으로 바꾼다.
+    - 번호/성명/영역: category (번호는 공백 제거한 문자열 기준)
+    - 학년: Int8 (정수가 아닌 값이 섞여 있으면 그대로 둠)
+    - 세특내용/행특내용: Arrow 기반 문자열
+    값 자체는 바뀌지 않으므로 기존 필터링·텍스트 추출 로직은 그대로 동작한다.
+    """
+    if df is None or df.empty:
+        return df
+
+    out = df.copy()
+
+    for c in CATEGORY_COLS:
+        if c in out.columns and not isinstance(out[c], pd.DataFrame):
+            s = out[c]
+            if c == "번호":
+                s = s.where(s.isna(), s.astype(str).str.strip())
+            out[c] = s.astype("category")
+
+    if "학년" in out.columns and not isinstance(out["학년"], pd.DataFrame):
+        years = pd.to_numeric(out["학년"], errors="coerce")
+        whole = years.dropna()
+        if ((whole % 1) == 0).all() and whole.between(-128, 127).all():
+            out["학년"] = years.astype("Int8")
+
+    for c in TEXT_COLS:
+        if c in out.columns and not isinstance(out[c], pd.DataFrame):
+            out[c] = out[c].astype(_text_dtype())
+
+    return out
+
+
+def frame_bytes(df: Optional[pd.DataFrame]) -> int:
+    if df is None:
+        return 0
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(
+    frames: Dict[str, pd.DataFrame],
+    before: Optional[Dict[str, pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """
+    프레임별 메모리 사용량 표. before를 주면 압축 전/후와 절감률을 함께 보여준다.
+    """
+    rows = []
+    for name, df in frames.items():
+        row = {"구분": name, "행 수": 0 if df is None else len(df), "메모리(KB)": round(frame_bytes(df) / 1024, 1)}
+        if before is not None and name in before:
+            prev = frame_bytes(before[name])
+            row["압축 전(KB)"] = round(prev / 1024, 1)
+            row["절감률(%)"] = round((1 - frame_bytes(df) / prev) * 100, 1) if prev else 0.0
+        rows.append(row)
+
+    report = pd.DataFrame(rows)
+    if not report.empty:
+        total = {"구분": "합계", "행 수": int(report["행 수"].sum()), "메모리(KB)": round(report["메모리(KB)"].sum(), 1)}
+        if "압축 전(KB)" in report.columns:
+            total["압축 전(KB)"] = round(report["압축 전(KB)"].sum(), 1)
+            total["절감률(%)"] = round((1 - total["메모리(KB)"] / total["압축 전(KB)"]) * 100, 1) if total["압축 전(KB)"] else 0.0
+        report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+    return report
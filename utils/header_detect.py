@@ -0,0 +1,86 @@
+# utils/header_detect.py
+from __future__ import annotations
+
+import re
+from typing import Optional, Sequence
+
+import pandas as pd
+
+from utils import xlsx_fast
+
+# NEIS 내보내기 파일은 헤더가 상단 몇 줄 안에 있으므로 이 범위만 탐색한다.
+HEADER_SCAN_ROWS = 50
+
+
+def find_header_row(head: pd.DataFrame, keywords: Sequence[str]) -> Optional[int]:
+    """
+    상단 일부 행(head)에서 모든 키워드를 포함하는 첫 행의 위치를 반환한다.
+    각 행을 공백으로 이어 붙인 문자열에 대해 열 단위로 벡터화하여 매칭한다.
+    """
+    if head.empty:
+        return None
+
+    cells = head.fillna("").astype(str)
+    lines = cells.iloc[:, 0].str.cat([cells[c] for c in cells.columns[1:]], sep=" ")
+
+    mask = pd.Series(True, index=lines.index)
+    for kw in keywords:
+        mask &= lines.str.contains(kw, regex=False)
+
+    hits = mask.to_numpy().nonzero()[0]
+    return int(hits[0]) if len(hits) else None
+
+
+def combine_header_rows(rows: pd.DataFrame, sep: str = "_") -> pd.Index:
+    """여러 줄 헤더(예: 창체의 '창의적체험활동' / '영역'·'시간')를 한 줄 컬럼명으로 결합."""
+    if len(rows) == 1:
+        return pd.Index(rows.iloc[0].fillna("").tolist())
+
+    parts = rows.fillna("").astype(str)
+    combined = parts.iloc[0]
+    for i in range(1, len(parts)):
+        combined = combined + sep + parts.iloc[i]
+
+    combined = (
+        combined.str.replace(f"{sep}nan", "", regex=False)
+                .str.replace(f"{re.escape(sep)}+$", "", regex=True)
+    )
+    return pd.Index(combined.tolist())
+
+
+def read_excel_with_header(
+    file,
+    keywords: Sequence[str],
+    header_rows: int = 1,
+    max_rows: int = HEADER_SCAN_ROWS,
+    sheet: Optional[int] = None,
+    fast: Optional[bool] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    상단 max_rows 행만 읽어 헤더를 찾은 뒤, 데이터 영역만 다시 읽어
+    결정된 컬럼명을 붙여 반환한다. 헤더를 찾지 못하면 None.
+    sheet: 시트 순번 (None이면 첫 번째 시트)
+    fast: xlsx 빠른 경로 사용 여부 (None이면 기본 설정)
+    """
+    head = xlsx_fast.read_excel(file, sheet=sheet, fast=fast, nrows=max_rows + header_rows - 1)
+
+    header_row = find_header_row(head.iloc[:max_rows], keywords)
+    if header_row is None:
+        return None
+
+    header = head.iloc[header_row:header_row + header_rows]
+    columns = combine_header_rows(header)
+
+    # 데이터 영역만 다시 읽기 (번호 등 정수 값이 float로 바뀌지 않도록 object 유지)
+    df = xlsx_fast.read_excel(
+        file,
+        sheet=sheet,
+        fast=fast,
+        skiprows=header_row + header_rows,
+        dtype=object,
+    )
+    df = df.reindex(columns=range(len(columns)))
+    df.columns = columns
+    df.index = df.index + header_row + header_rows
+
+    return df
@@ -0,0 +1,249 @@
+# utils/ingest.py
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils import xlsx_fast
+from utils.header_detect import HEADER_SCAN_ROWS, find_header_row
+from utils.parser_seteuk import load_seteuk
+from utils.parser_haengteuk import load_haengteuk, HEADER_KEYWORDS as HAENG_KEYWORDS
+from utils.parser_changche import load_changche, HEADER_KEYWORDS as CHANG_KEYWORDS
+from utils.parse_cache import cached_load, read_upload_bytes
+
+# 라벨 → 로더 (명렬 보기에서 쓰는 순서 그대로)
+LOADERS: Dict[str, Callable] = {
+    "세특": load_seteuk,
+    "행특": load_haengteuk,
+    "창체": load_changche,
+}
+
+# 세특 시트는 표 헤더 대신 상단에 이 문구 중 하나가 있다.
+SETEUK_MARKERS = ["세부능력", "특기사항"]
+
+# on_progress(label, seconds, done, total)
+ProgressCallback = Callable[[str, float, int, int], None]
+
+
+# 업로드 합계가 이보다 작으면 프로세스를 띄우는 비용이 파싱보다 커서 그냥 이 프로세스에서 처리
+INPROCESS_MAX_BYTES = int(os.environ.get("SEHWA_INGEST_INPROCESS_BYTES", 2 * 1024 * 1024))
+INGEST_WORKERS = int(os.environ.get("SEHWA_INGEST_WORKERS", os.cpu_count() or 1))
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _shared_pool() -> ProcessPoolExecutor:
+    """
+    프로세스 전체에서 하나인 파싱 풀. 업로드 버튼을 누를 때마다 워커를 새로 띄우지 않게 재사용.
+    Streamlit 서버는 스레드가 여럿이라 fork(리눅스 기본)는 잠금 상태까지 복제될 수 있어 spawn으로 띄움.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=INGEST_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """워커가 죽어 깨진 풀은 버린다 (다음 호출 때 새로 만듦)."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_parallel(
+    tasks: Dict[Hashable, Tuple[Callable, tuple]],
+    on_done: Callable[[Hashable, Any, int, int], None],
+    in_process: bool = False,
+) -> Dict[Hashable, Any]:
+    """
+    {키: (함수, 인자)}를 공유 프로세스 풀에서 실행하고, 끝나는 순서대로 on_done(키, 결과, 완료 수, 전체 수)를 호출.
+    in_process이거나 풀에서 실패한 작업(풀 생성·워커 종료·결과 직렬화 오류 등)은 이 프로세스에서 순차 처리한다.
+    """
+    results: Dict[Hashable, Any] = {}
+    total = len(tasks)
+
+    def _finish(key, value):
+        results[key] = value
+        on_done(key, value, len(results), total)
+
+    if total > 1 and not in_process:
+        pool = None
+        try:
+            pool = _shared_pool()
+            futures = {pool.submit(fn, *args): key for key, (fn, args) in tasks.items()}
+            for fut in as_completed(futures):
+                try:
+                    value = fut.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception:
+                    continue  # 이 작업만 아래 순차 처리로
+                _finish(futures[fut], value)
+        except Exception as e:
+            # 풀 자체가 망가졌으면 버리고 (다음 업로드 때 새로), 남은 작업은 순차 처리
+            if pool is not None and isinstance(e, (BrokenProcessPool, RuntimeError)):
+                _discard_pool(pool)
+
+    for key, (fn, args) in tasks.items():
+        if key not in results:
+            _finish(key, fn(*args))
+
+    return results
+
+
+# -----------------------------
+# 일괄 모드: 여러 파일 / ZIP / 여러 시트
+# -----------------------------
+@dataclass
+class SheetResult:
+    file_name: str
+    sheet_name: str
+    kind: Optional[str]  # "세특" / "행특" / "창체" / None(판별 불가)
+    rows: int
+    seconds: float
+    error: str = ""
+
+
+@dataclass
+class BatchResult:
+    frames: Dict[str, pd.DataFrame]
+    sheets: List[SheetResult] = field(default_factory=list)
+
+    @property
+    def missing(self) -> List[str]:
+        return [k for k in LOADERS if self.frames[k].empty]
+
+
+def classify_sheet(head: pd.DataFrame) -> Optional[str]:
+    """시트 상단 내용으로 세특/행특/창체를 판별 (파일명은 보지 않음)."""
+    if find_header_row(head, CHANG_KEYWORDS) is not None:
+        return "창체"
+    if find_header_row(head, HAENG_KEYWORDS) is not None:
+        return "행특"
+    for marker in SETEUK_MARKERS:
+        if find_header_row(head, [marker]) is not None:
+            return "세특"
+    return None
+
+
+def _expand_uploads(uploads) -> List[Tuple[str, bytes]]:
+    """업로드 목록을 (파일명, xlsx 바이트) 목록으로 펼친다. ZIP은 안의 xlsx를 모두 꺼낸다."""
+    books = []
+    for f in uploads:
+        name = getattr(f, "name", str(f))
+        data = read_upload_bytes(f)
+
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(BytesIO(data)) as zf:
+                for member in zf.namelist():
+                    base = os.path.basename(member)
+                    if member.startswith("__MACOSX/") or base.startswith("~$"):
+                        continue
+                    if base.lower().endswith(".xlsx"):
+                        books.append((base, zf.read(member)))
+        else:
+            books.append((name, data))
+    return books
+
+
+def _sheet_names(data: bytes) -> List[str]:
+    try:
+        return xlsx_fast.list_sheets(BytesIO(data))
+    except xlsx_fast.FALLBACK_ERRORS:
+        wb = load_workbook(BytesIO(data), read_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+
+
+def _kind_from_name(file_name: str) -> Optional[str]:
+    """내용으로 판별이 안 될 때만 쓰는 보조 규칙 (기존 '파일명에 세특/행특/창체 포함' 방식)."""
+    for kind in LOADERS:
+        if kind in file_name:
+            return kind
+    return None
+
+
+def _classify_and_load(data: bytes, sheet: int, name_hint: Optional[str] = None):
+    """워커 프로세스에서 실행: 시트 종류를 판별하고 해당 로더로 파싱."""
+    t0 = time.perf_counter()
+    try:
+        head = xlsx_fast.read_excel(BytesIO(data), sheet=sheet, nrows=HEADER_SCAN_ROWS)
+        kind = classify_sheet(head) or name_hint
+        if kind is None:
+            return None, None, time.perf_counter() - t0, ""
+        df = cached_load(LOADERS[kind], BytesIO(data), sheet=sheet)
+        return kind, df, time.perf_counter() - t0, ""
+    except Exception as e:
+        return None, None, time.perf_counter() - t0, str(e)
+
+
+def _tidy_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """이어 붙이기 전에 빈 이름·중복 이름 컬럼을 정리 (학급별 파일마다 여백 컬럼 수가 다름)."""
+    keep = [bool(str(c).strip()) for c in df.columns] & ~df.columns.duplicated()
+    return df.loc[:, keep]
+
+
+def load_batch(
+    uploads,
+    on_progress: Optional[ProgressCallback] = None,
+    in_process: Optional[bool] = None,
+) -> BatchResult:
+    """
+    학급별 xlsx 여러 개(또는 ZIP)를 받아 모든 파일의 모든 시트를 동시에 파싱한다.
+    시트마다 내용으로 종류를 판별하고, 종류별로 이어 붙인 뒤 중복 행을 제거해 반환.
+    in_process를 주지 않으면 업로드 합계가 INPROCESS_MAX_BYTES 미만일 때만 이 프로세스에서 처리.
+    """
+    books = _expand_uploads(uploads)
+
+    tasks = {}
+    names = {}
+    for b, (file_name, data) in enumerate(books):
+        for s, sheet_name in enumerate(_sheet_names(data)):
+            tasks[(b, s)] = (_classify_and_load, (data, s, _kind_from_name(file_name)))
+            names[(b, s)] = (file_name, sheet_name)
+
+    sheet_results: Dict[Tuple[int, int], SheetResult] = {}
+    parts: Dict[str, List[pd.DataFrame]] = {k: [] for k in LOADERS}
+
+    def _on_done(key, result, done, total):
+        kind, df, seconds, error = result
+        file_name, sheet_name = names[key]
+        sheet_results[key] = SheetResult(file_name, sheet_name, kind, 0 if df is None else len(df), seconds, error)
+        if on_progress:
+            on_progress(f"{file_name} [{sheet_name}] → {kind or '판별 불가'}", seconds, done, total)
+
+    if in_process is None:
+        in_process = sum(len(data) for _, data in books) < INPROCESS_MAX_BYTES
+    results = _run_parallel(tasks, _on_done, in_process)
+
+    # 업로드 순서대로 이어 붙이기
+    for key in tasks:
+        kind, df, _, _ = results[key]
+        if kind is not None and df is not None and not df.empty:
+            parts[kind].append(_tidy_columns(df))
+
+    frames = {}
+    for kind, dfs in parts.items():
+        if dfs:
+            frames[kind] = pd.concat(dfs, ignore_index=True).drop_duplicates().reset_index(drop=True)
+        else:
+            frames[kind] = pd.DataFrame()
+
+    return BatchResult(frames=frames, sheets=[sheet_results[key] for key in tasks])
@@ -0,0 +1,73 @@
+# utils/json_stream.py
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator, List, Tuple
+
+
+class TopLevelJSONStream:
+    """
+    스트리밍으로 들어오는 JSON 객체 텍스트를 조금씩 받아, 최상위 항목("종합 평가", "핵심 강점" …)이
+    닫히는 즉시 (키, 값)으로 돌려준다. 문자열 안의 괄호·따옴표·이스케이프는 건너뛴다.
+
+        stream = TopLevelJSONStream()
+        for delta in deltas:
+            for key, value in stream.feed(delta):
+                ...
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None  # 현재 최상위 항목이 시작된 위치
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        return list(self._scan())
+
+    def _scan(self) -> Iterator[Tuple[str, Any]]:
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            ch = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._member_start is None:
+                    self._member_start = self._pos
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    member = self._take_member(self._pos)
+                    if member is not None:
+                        yield member
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                member = self._take_member(self._pos)
+                if member is not None:
+                    yield member
+
+            self._pos += 1
+
+    def _take_member(self, end: int):
+        if self._member_start is None:
+            return None
+        raw = self.text[self._member_start:end]
+        self._member_start = None
+        try:
+            (key, value), = json.loads("{" + raw + "}").items()
+        except (ValueError, TypeError):
+            return None
+        return key, value
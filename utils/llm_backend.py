@@ -0,0 +1,206 @@
+# utils/llm_backend.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+# openai(기본) / record(실제 호출 + 응답을 fixture로 저장) / replay(fixture만 사용, 네트워크 없음)
+BACKEND = os.environ.get("SEHWA_LLM_BACKEND", "openai")
+FIXTURE_DIR = Path(os.environ.get("SEHWA_LLM_FIXTURES", Path(__file__).resolve().parent.parent / "bench" / "fixtures"))
+
+
+@dataclass
+class Completion:
+    content: str
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class FixtureMissing(KeyError):
+    """replay 모드에서 같은 요청으로 녹화된 응답이 없을 때."""
+
+
+class LLMBackend(ABC):
+    """chat.completions 요청 본문(dict)을 받아 응답을 돌려주는 공통 인터페이스."""
+
+    name = "base"
+
+    @abstractmethod
+    def complete(self, body: dict) -> Completion:
+        ...
+
+    def stream(self, body: dict) -> Iterator[str]:
+        """응답 텍스트 조각을 순서대로. 기본 구현은 한 번에 받아 통째로 돌려줌."""
+        yield self.complete(body).content
+
+
+# -----------------------------
+# OpenAI (OPENAI_BASE_URL을 주면 로컬 목 서버 등 OpenAI 호환 서버로 보냄)
+# -----------------------------
+# 연결 풀: 동시 생성(학생 4명 × 항목별 3요청)과 요약 단계가 겹쳐도 새 TLS 연결 없이 재사용할 만큼
+POOL_MAX_CONNECTIONS = int(os.environ.get("SEHWA_OPENAI_POOL_SIZE", 32))
+POOL_KEEPALIVE = int(os.environ.get("SEHWA_OPENAI_POOL_KEEPALIVE", 16))
+KEEPALIVE_EXPIRY = float(os.environ.get("SEHWA_OPENAI_KEEPALIVE_EXPIRY", 60))   # 초
+CONNECT_TIMEOUT = float(os.environ.get("SEHWA_OPENAI_CONNECT_TIMEOUT", 10))     # 초
+# 비스트리밍 보고서 한 건을 끝까지 기다리는 시간 (스트리밍이면 조각 사이 간격)
+READ_TIMEOUT = float(os.environ.get("SEHWA_OPENAI_TIMEOUT", 180))               # 초
+# SDK 자체 재시도는 끔: 429·일시 오류는 report_batch가 받아 동시 요청 수를 줄이고 백오프 후 다시 보냄
+# (SDK가 안에서 재시도하면 제한기가 429를 늦게 보고, 재시도가 겹쳐 쌓이며, 호출 장부에도 안 남음)
+SDK_MAX_RETRIES = int(os.environ.get("SEHWA_OPENAI_MAX_RETRIES", 0))
+
+
+def _api_key() -> str:
+    key = os.environ.get("OPENAI_API_KEY")
+    if key:
+        return key
+    import streamlit as st
+    return st.secrets["OPENAI_API_KEY"]
+
+
+def make_client():
+    """연결 풀·keep-alive·시간 제한을 명시한 OpenAI 클라이언트를 새로 만든다 (보통은 shared_client 사용)."""
+    from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI, Timeout
+
+    # Limits는 SDK가 쓰는 HTTP 라이브러리의 것을 그대로 (SDK 버전에 따라 패키지 이름이 다름)
+    limits = type(DEFAULT_CONNECTION_LIMITS)(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    timeout = Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+    return OpenAI(
+        api_key=_api_key(),
+        timeout=timeout,
+        max_retries=SDK_MAX_RETRIES,
+        http_client=DefaultHttpxClient(limits=limits, timeout=timeout),
+    )
+
+
+_client_lock = threading.Lock()
+_shared_client = None
+
+
+def shared_client():
+    """
+    프로세스 전체에서 하나인 클라이언트. 첫 호출 때 만든다 (import만으로는 API 키가 필요 없음).
+    동시 생성 스레드들이 처음에 한꺼번에 불러도 하나만 만들어지게 잠금.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _client_lock:
+            if _shared_client is None:
+                _shared_client = make_client()
+    return _shared_client
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client if self._client is not None else shared_client()
+
+    def complete(self, body: dict) -> Completion:
+        response = self.client.chat.completions.create(**body)
+        usage = getattr(response, "usage", None)
+        return Completion(
+            content=response.choices[0].message.content or "",
+            model=getattr(response, "model", "") or body.get("model", ""),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+    def stream(self, body: dict) -> Iterator[str]:
+        for chunk in self.client.chat.completions.create(stream=True, **body):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+# -----------------------------
+# 녹화/재생: 실제 응답을 요청 본문 해시별 JSON으로 저장해 두고 오프라인에서 그대로 재생
+# -----------------------------
+def fixture_key(body: dict) -> str:
+    return hashlib.sha256(json.dumps(body, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:24]
+
+
+class RecordReplayBackend(LLMBackend):
+    """
+    mode="record": inner로 실제 호출하고 응답을 fixture_dir에 저장.
+    mode="replay": fixture만 읽음. 없으면 FixtureMissing.
+    stream()은 재생할 때도 작은 조각으로 나눠 돌려줘 스트리밍 경로를 그대로 태운다.
+    """
+
+    name = "record-replay"
+
+    def __init__(self, mode: str = "replay", fixture_dir: Optional[Path] = None,
+                 inner: Optional[LLMBackend] = None, chunk_chars: int = 16):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay': {mode}")
+        self.mode = mode
+        self.fixture_dir = Path(fixture_dir or FIXTURE_DIR)
+        self.inner = inner
+        self.chunk_chars = chunk_chars
+
+    def _path(self, body: dict) -> Path:
+        return self.fixture_dir / f"{fixture_key(body)}.json"
+
+    def complete(self, body: dict) -> Completion:
+        path = self._path(body)
+        if self.mode == "replay":
+            try:
+                return Completion(**json.loads(path.read_text(encoding="utf-8"))["completion"])
+            except FileNotFoundError:
+                raise FixtureMissing(path.name) from None
+
+        if self.inner is None:
+            self.inner = OpenAIBackend()
+        completion = self.inner.complete(body)
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"request": body, "completion": asdict(completion)}, ensure_ascii=False, indent=1),
+            encoding="utf-8",
+        )
+        return completion
+
+    def stream(self, body: dict) -> Iterator[str]:
+        content = self.complete(body).content
+        for i in range(0, len(content), self.chunk_chars):
+            yield content[i:i + self.chunk_chars]
+
+
+# -----------------------------
+# 프로세스 전체에서 쓰는 현재 백엔드
+# -----------------------------
+_backend: Optional[LLMBackend] = None
+
+
+def _default_backend() -> LLMBackend:
+    if BACKEND in ("record", "replay"):
+        return RecordReplayBackend(mode=BACKEND)
+    return OpenAIBackend()
+
+
+def get_backend() -> LLMBackend:
+    global _backend
+    if _backend is None:
+        _backend = _default_backend()
+    return _backend
+
+
+def set_backend(backend: Optional[LLMBackend]) -> None:
+    """테스트·벤치마크용 교체. None이면 다음 get_backend()에서 환경변수 기준으로 다시 만든다."""
+    global _backend
+    _backend = backend
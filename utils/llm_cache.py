@@ -0,0 +1,172 @@
+# utils/llm_cache.py
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+# 같은 프롬프트·모델·온도의 응답을 디스크에 보관해 새로고침 후 재생성 시 API를 다시 부르지 않음
+CACHE_DIR = Path(os.environ.get("SEHWA_LLM_CACHE_DIR", Path.home() / ".cache" / "sehwaprograms" / "llm"))
+CACHE_TTL_SECONDS = int(os.environ.get("SEHWA_LLM_CACHE_TTL", 30 * 24 * 3600))
+CACHE_MAX_BYTES = int(os.environ.get("SEHWA_LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+CACHE_ENABLED = os.environ.get("SEHWA_LLM_CACHE", "1") != "0"
+
+_lock = threading.Lock()
+# reports: 적중 중 보고서 전체를 통째로 재사용한 것 (요약·항목 묶음·보완 호출 적중은 제외)
+_stats = {"hits": 0, "misses": 0, "stores": 0, "reports": 0}
+
+# 읽기/쓰기 여부와 실행별 통계는 호출한 쪽(세션·생성 실행) 단위로: 모듈 전역을 바꾸면 같은 프로세스의
+# 다른 세션까지 영향을 받음 (작업 스레드로는 contextvars.copy_context().run으로 넘어감)
+_read: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_read", default=True)
+_write: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_write", default=True)
+_run_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("llm_cache_run_stats", default=None)
+
+
+def cache_key(system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+    payload = json.dumps([system_prompt, user_prompt, model, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _path(key: str) -> Path:
+    return CACHE_DIR / f"{key}.json"
+
+
+def _count(name: str) -> None:
+    run = _run_stats.get()
+    with _lock:
+        _stats[name] += 1
+        if run is not None:
+            run[name] += 1
+
+
+def stats() -> Dict[str, int]:
+    """프로세스 시작(또는 reset_stats) 이후 적중/미적중/저장 횟수."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats() -> None:
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
+
+
+def get(key: str, report: bool = False) -> Optional[dict]:
+    """report=True: 학생 한 명의 최종 보고서 키 조회 (적중하면 reports로도 셈)."""
+    if not CACHE_ENABLED or not _read.get():
+        return None
+
+    path = _path(key)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        _count("misses")
+        return None
+
+    if time.time() - entry.get("created", 0) > CACHE_TTL_SECONDS:
+        path.unlink(missing_ok=True)
+        _count("misses")
+        return None
+
+    # LRU: 최근 사용 시각 갱신 (그 사이 다른 스레드가 지웠어도 읽은 내용은 그대로 씀)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    _count("hits")
+    if report:
+        _count("reports")
+    return entry.get("response")
+
+
+def put(key: str, response: dict) -> None:
+    """
+    정상 파싱된 보고서만 저장한다. 오류 보고서(점수 0 대체본)는 호출 측에서 예외 경로로
+    만들어지므로 여기까지 오지 않는다. 같은 키가 있으면 덮어쓴다 (강제 재생성 결과로 교체).
+    """
+    if not CACHE_ENABLED or not _write.get():
+        return
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path(key)
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(
+        json.dumps({"created": time.time(), "response": response}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+    _count("stores")
+
+    evict()
+
+
+def evict(max_bytes: int = CACHE_MAX_BYTES, ttl: int = CACHE_TTL_SECONDS) -> None:
+    """만료된 항목을 지우고, 총 용량이 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제."""
+    if not CACHE_DIR.exists():
+        return
+
+    now = time.time()
+    entries = []
+    for p in CACHE_DIR.glob("*.json"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        # 생성 시각은 파일 안에 있지만, 읽지 않고 mtime(마지막 사용)으로 먼저 거른다
+        if now - st.st_mtime > ttl:
+            p.unlink(missing_ok=True)
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(e[1] for e in entries)
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+
+
+def clear() -> None:
+    if CACHE_DIR.exists():
+        for p in CACHE_DIR.glob("*.json"):
+            p.unlink(missing_ok=True)
+
+
+@contextmanager
+def _set(read: bool, write: bool) -> Iterator[None]:
+    tokens = (_read.set(read), _write.set(write))
+    try:
+        yield
+    finally:
+        _read.reset(tokens[0])
+        _write.reset(tokens[1])
+
+
+def enabled(flag: bool):
+    """with enabled(False): 구간 안에서는 캐시를 읽지도 쓰지도 않음 (현재 컨텍스트에만 적용)."""
+    return _set(flag, flag)
+
+
+def refreshing(flag: bool = True):
+    """with refreshing(): 저장된 응답은 읽지 않고 새로 받은 응답으로 덮어씀 (강제 재생성)."""
+    return _set(not flag, True)
+
+
+@contextmanager
+def counting() -> Iterator[Dict[str, int]]:
+    """
+    with counting() as run: 구간 안(작업 스레드 포함)의 적중/미적중/저장 횟수만 run에 셈.
+    run["reports"]는 보고서 단위 재사용 수 (학생 수와 비교할 때는 hits가 아니라 이것을 씀).
+    """
+    run = {"hits": 0, "misses": 0, "stores": 0, "reports": 0}
+    token = _run_stats.set(run)
+    try:
+        yield run
+    finally:
+        _run_stats.reset(token)
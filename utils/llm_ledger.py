@@ -0,0 +1,297 @@
+# utils/llm_ledger.py
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# LLM 호출 1건당 한 줄(JSONL): 지연 시간·토큰·재시도·파싱 결과를 남겨 동시 요청 수·토큰 상한을 데이터로 정함
+LEDGER_PATH = Path(os.environ.get(
+    "SEHWA_LLM_LEDGER",
+    Path.home() / ".local" / "share" / "sehwaprograms" / "llm_ledger.jsonl",
+))
+LEDGER_ENABLED = os.environ.get("SEHWA_LLM_LEDGER_ENABLED", "1") != "0"
+# 파일이 이 크기를 넘으면 .1, .2 …로 밀어 두고 새 파일에 기록 (가장 오래된 것부터 삭제)
+LEDGER_MAX_BYTES = int(os.environ.get("SEHWA_LLM_LEDGER_MAX_BYTES", 20 * 1024 * 1024))
+LEDGER_BACKUPS = int(os.environ.get("SEHWA_LLM_LEDGER_BACKUPS", 3))
+# 학번은 그대로 남기지 않음: 설치마다 무작위로 만든 솔트(장부 옆 파일)를 섞은 해시라
+# 같은 설치 안에서만 같은 학생끼리 묶이고, 공개된 기본값으로 학번(5자리)을 되짚을 수 없음
+LEDGER_SALT = os.environ.get("SEHWA_LLM_LEDGER_SALT", "")
+
+_lock = threading.Lock()
+_salt: Optional[str] = None
+
+# 호출한 쪽(생성 실행·학생·재시도 차수)을 API 호출 지점까지 인자 없이 전달
+# (ThreadPoolExecutor로 넘길 때는 contextvars.copy_context().run으로 감쌈)
+_context: contextvars.ContextVar[Dict[str, object]] = contextvars.ContextVar("llm_ledger_context", default={})
+
+
+@dataclass
+class CallRecord:
+    kind: str                     # report / stream / partial / repair / digest
+    model: str
+    latency_ms: float
+    outcome: str                  # ok / parse_error / schema_error / rate_limited / error
+    parse: str = ""               # json(바로 파싱) / salvaged(닫힌 항목만 건짐) / failed
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    first_token_ms: Optional[float] = None
+    attempt: int = 0              # 0 = 첫 시도, 429 재시도마다 +1
+    student: str = ""
+    run_id: str = ""
+    strategy: str = ""            # 경로 설정 결과: single / parallel / map_reduce
+    max_tokens: Optional[int] = None
+    route_est_ms: Optional[float] = None  # 경로 설정 때 예상한 학생당 지연
+    backend: str = ""
+    error: str = ""
+    ts: float = field(default_factory=time.time)
+
+
+def _salt_path() -> Path:
+    return LEDGER_PATH.parent / "llm_ledger.salt"
+
+
+def _install_salt() -> str:
+    """설치별 솔트: 처음 한 번 만들어 장부 옆에 저장(소유자만 읽기), 이후 재사용."""
+    global _salt
+    if LEDGER_SALT:
+        return LEDGER_SALT
+    with _lock:
+        if _salt is None:
+            path = _salt_path()
+            try:
+                _salt = path.read_text(encoding="utf-8").strip()
+            except OSError:
+                _salt = ""
+            if not _salt:
+                _salt = secrets.token_hex(16)
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(_salt)
+                except OSError:
+                    # 저장하지 못하면 이 프로세스 동안만 같은 솔트 (재시작 뒤에는 학생 묶음이 끊김)
+                    pass
+        return _salt
+
+
+def student_hash(student_id: str) -> str:
+    if not student_id:
+        return ""
+    return hashlib.sha256(f"{_install_salt()}:{student_id}".encode()).hexdigest()[:12]
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+@contextmanager
+def tagged(**values) -> Iterator[None]:
+    """with tagged(student_id=..., attempt=...): 안에서 일어나는 호출 기록에 값을 붙임 (바깥 값 위에 덮어씀)."""
+    token = _context.set({**_context.get(), **values})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current() -> Dict[str, object]:
+    return dict(_context.get())
+
+
+def record(rec: CallRecord) -> None:
+    ctx = _context.get()
+    if not rec.student:
+        rec.student = student_hash(str(ctx.get("student_id", "") or ""))
+    rec.run_id = rec.run_id or str(ctx.get("run_id", "") or "")
+    rec.attempt = rec.attempt or int(ctx.get("attempt", 0) or 0)
+    rec.strategy = rec.strategy or str(ctx.get("strategy", "") or "")
+    rec.max_tokens = rec.max_tokens or ctx.get("max_tokens")
+    rec.route_est_ms = rec.route_est_ms or ctx.get("route_est_ms")
+    if not LEDGER_ENABLED:
+        return
+    line = json.dumps(asdict(rec), ensure_ascii=False)
+    try:
+        with _lock:
+            LEDGER_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _rotate_if_full()
+            with LEDGER_PATH.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError:
+        # 기록 실패가 보고서 생성을 막으면 안 됨
+        pass
+
+
+def _backup_paths(path: Path) -> List[Path]:
+    return [path.with_name(f"{path.name}.{n}") for n in range(1, LEDGER_BACKUPS + 1)]
+
+
+def _rotate_if_full() -> None:
+    """(_lock 안에서) 현재 파일이 LEDGER_MAX_BYTES를 넘으면 .1로 밀고 가장 오래된 백업은 지움."""
+    try:
+        if LEDGER_PATH.stat().st_size < LEDGER_MAX_BYTES:
+            return
+    except FileNotFoundError:
+        return
+    backups = _backup_paths(LEDGER_PATH)
+    if not backups:
+        LEDGER_PATH.unlink(missing_ok=True)
+        return
+    backups[-1].unlink(missing_ok=True)
+    for older, newer in zip(reversed(backups[1:]), reversed(backups[:-1])):
+        if newer.exists():
+            os.replace(newer, older)
+    os.replace(LEDGER_PATH, backups[0])
+
+
+def outcome_of(exc: Optional[BaseException]) -> str:
+    if exc is None:
+        return "ok"
+    from utils.report_batch import is_rate_limited
+    from utils.report_schema import ReportSchemaError
+
+    if is_rate_limited(exc):
+        return "rate_limited"
+    if isinstance(exc, ReportSchemaError):
+        return "schema_error"
+    if isinstance(exc, ValueError):
+        return "parse_error"
+    return "error"
+
+
+# -----------------------------
+# 읽기·요약 (관리자 화면)
+# -----------------------------
+# 파일별 (mtime, 크기) → 읽은 표. 화면이 다시 그려질 때마다 전체 JSONL을 다시 파싱하지 않게
+_loaded: Dict[Path, tuple] = {}
+
+
+def _read_file(path: Path) -> pd.DataFrame:
+    columns = list(CallRecord.__dataclass_fields__)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _loaded.pop(path, None)
+        return pd.DataFrame(columns=columns)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    hit = _loaded.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+
+    rows: List[dict] = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue
+    df = pd.DataFrame(rows, columns=columns)
+    _loaded[path] = (stamp, df)
+    return df
+
+
+def load(path: Optional[Path] = None, since: Optional[float] = None) -> pd.DataFrame:
+    """현재 파일과 밀려난 백업(.1, .2 …)을 합쳐 읽음. 바뀌지 않은 파일은 이전에 읽은 표를 재사용."""
+    path = Path(path or LEDGER_PATH)
+    frames = [_read_file(p) for p in reversed(_backup_paths(path))] + [_read_file(path)]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=list(CallRecord.__dataclass_fields__))
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    if since is not None:
+        df = df[df["ts"].fillna(0) >= since].reset_index(drop=True)
+    return df.copy()
+
+
+def _pct(s: pd.Series, q: float) -> float:
+    s = s.dropna()
+    return float(s.quantile(q)) if len(s) else float("nan")
+
+
+def summarize_calls(df: pd.DataFrame) -> pd.DataFrame:
+    """호출 종류별 건수·p50/p95 지연·평균 토큰·429·JSON 대체 파싱 비율."""
+    if df.empty:
+        return pd.DataFrame()
+    out = []
+    for kind, g in df.groupby("kind", sort=False):
+        ok = g[g["outcome"] == "ok"]
+        out.append({
+            "종류": kind,
+            "호출": len(g),
+            "성공": len(ok),
+            "p50 지연(초)": round(_pct(ok["latency_ms"], 0.5) / 1000, 2),
+            "p95 지연(초)": round(_pct(ok["latency_ms"], 0.95) / 1000, 2),
+            "p50 첫 토큰(초)": round(_pct(ok["first_token_ms"].astype(float), 0.5) / 1000, 2),
+            "평균 입력 토큰": int(ok["prompt_tokens"].mean()) if len(ok) else 0,
+            "평균 출력 토큰": int(ok["completion_tokens"].mean()) if len(ok) else 0,
+            "429": int((g["outcome"] == "rate_limited").sum()),
+            "재시도 호출": int((g["attempt"] > 0).sum()),
+            "JSON 대체 파싱": int((g["parse"] == "salvaged").sum()),
+            "파싱·형식 실패": int(g["outcome"].isin(["parse_error", "schema_error"]).sum()),
+        })
+    return pd.DataFrame(out)
+
+
+def summarize_reports(df: pd.DataFrame) -> Dict[str, float]:
+    """학생 보고서 1건(같은 실행·같은 학생의 모든 호출) 기준 토큰·지연 분포."""
+    done = df[(df["outcome"] == "ok") & (df["student"] != "")]
+    if done.empty:
+        return {}
+    per = done.groupby(["run_id", "student"]).agg(
+        tokens=("prompt_tokens", "sum"),
+        out_tokens=("completion_tokens", "sum"),
+        calls=("kind", "size"),
+        latency=("latency_ms", "max"),
+    )
+    per["tokens"] += per["out_tokens"]
+    return {
+        "보고서 수": len(per),
+        "보고서당 호출 (평균)": round(float(per["calls"].mean()), 2),
+        "보고서당 토큰 p50": int(per["tokens"].quantile(0.5)),
+        "보고서당 토큰 p95": int(per["tokens"].quantile(0.95)),
+        "가장 긴 호출 p95(초)": round(float(per["latency"].quantile(0.95)) / 1000, 2),
+    }
+
+
+def summarize_routes(df: pd.DataFrame) -> pd.DataFrame:
+    """경로(strategy)별 보고서 수와 예상 대비 실제 지연 (보고서 1건 = 같은 실행·학생의 가장 긴 호출)."""
+    done = df[(df["outcome"] == "ok") & (df["student"] != "") & (df["strategy"].fillna("") != "")]
+    if done.empty:
+        return pd.DataFrame()
+    per = done.groupby(["run_id", "student"]).agg(
+        strategy=("strategy", "first"),
+        est=("route_est_ms", "first"),
+        actual=("latency_ms", "max"),
+    )
+    out = []
+    for strategy, g in per.groupby("strategy"):
+        est = g["est"].astype(float).dropna()
+        out.append({
+            "경로": strategy,
+            "보고서": len(g),
+            "예상 p50(초)": round(float(est.median()) / 1000, 1) if len(est) else float("nan"),
+            "실제 p50(초)": round(float(g["actual"].median()) / 1000, 1),
+            "실제 p95(초)": round(float(g["actual"].quantile(0.95)) / 1000, 1),
+        })
+    return pd.DataFrame(out)
+
+
+def clear(path: Optional[Path] = None) -> None:
+    """장부와 백업을 모두 지움 (솔트는 남겨 두어 이후 기록도 같은 해시를 씀)."""
+    path = Path(path or LEDGER_PATH)
+    with _lock:
+        for p in [path] + _backup_paths(path):
+            p.unlink(missing_ok=True)
@@ -0,0 +1,199 @@
+# utils/parse_cache.py
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+# 캐시 위치/용량은 환경변수로 조정 가능
+CACHE_DIR = Path(os.environ.get("SEHWA_PARSE_CACHE_DIR", Path.home() / ".cache" / "sehwaprograms" / "parse"))
+CACHE_MAX_BYTES = int(os.environ.get("SEHWA_PARSE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+_HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+# 저장 형식이 바뀌면 올린다 (캐시 키에 들어가 예전 형식의 항목은 다시 만들어짐)
+CACHE_FORMAT = 3
+
+
+def read_upload_bytes(file) -> bytes:
+    """Streamlit UploadedFile / 파일 객체 / 경로에서 원본 바이트를 읽는다."""
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if hasattr(file, "read"):
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return file.read()
+    return Path(file).read_bytes()
+
+
+def cache_key(data: bytes, loader: Callable, **kwargs) -> str:
+    """업로드 바이트의 SHA-256 + 파서 이름/버전(+ 시트 등 로더 인자)으로 캐시 키를 만든다."""
+    version = getattr(sys.modules.get(loader.__module__), "PARSER_VERSION", 0)
+
+    h = hashlib.sha256(data)
+    h.update(f"|{loader.__module__}.{loader.__name__}|v{version}|f{CACHE_FORMAT}".encode())
+    if kwargs:
+        h.update(json.dumps(kwargs, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+# -----------------------------
+# 직렬화: object 컬럼은 값의 타입(int/str/None)을 보존하도록 JSON 문자열로 저장
+# 컬럼은 위치("0", "1", ...)로 저장하고 원래 이름은 meta에 둔다 (중복 컬럼명도 그대로 복원)
+# 날짜·시각 셀은 {"__dt__": ISO 문자열}처럼 타입 표시와 함께 저장해 캐시 적중 때도 같은 타입으로
+# -----------------------------
+_TEMPORAL = (
+    ("__ts__", pd.Timestamp, pd.Timestamp.isoformat, pd.Timestamp),
+    ("__dt__", datetime, datetime.isoformat, datetime.fromisoformat),
+    ("__date__", date, date.isoformat, date.fromisoformat),
+    ("__time__", time, time.isoformat, time.fromisoformat),
+    ("__td__", timedelta, timedelta.total_seconds, lambda s: timedelta(seconds=s)),
+)
+
+
+def _default(v):
+    for tag, cls, dump, _ in _TEMPORAL:  # 하위 클래스(Timestamp ⊂ datetime ⊂ date)부터 검사
+        if isinstance(v, cls):
+            return {tag: dump(v)}
+    return str(v)
+
+
+def _object_hook(d: dict):
+    if len(d) == 1:
+        for tag, _, _, load in _TEMPORAL:
+            if tag in d:
+                return load(d[tag])
+    return d
+
+
+def _encode(df: pd.DataFrame):
+    out = df.copy()
+    out.columns = [str(i) for i in range(out.shape[1])]
+    object_cols = [c for c in out.columns if out[c].dtype == object]
+    for c in object_cols:
+        out[c] = [None if v is None else json.dumps(v, ensure_ascii=False, default=_default)
+                  for v in out[c]]
+
+    meta = {
+        "columns": list(df.columns),
+        "object_columns": object_cols,
+    }
+    return out, meta
+
+
+def _decode(df: pd.DataFrame, meta: dict) -> pd.DataFrame:
+    for c in meta["object_columns"]:
+        df[c] = pd.Series(
+            [json.loads(v, object_hook=_object_hook) if isinstance(v, str) else None for v in df[c]],
+            index=df.index,
+            dtype=object,
+        )
+    df.columns = meta["columns"]
+    return df
+
+
+def _paths(key: str):
+    return CACHE_DIR / f"{key}.parquet", CACHE_DIR / f"{key}.json"
+
+
+def get(key: str) -> Optional[pd.DataFrame]:
+    data_path, meta_path = _paths(key)
+    if not (data_path.exists() and meta_path.exists()):
+        return None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        df = pd.read_parquet(data_path)
+        df = _decode(df, meta)
+    except Exception:
+        return None
+
+    # LRU: 최근 사용 시각 갱신 (다른 세션이 방금 지웠으면 그냥 넘어감, 읽은 결과는 유효)
+    try:
+        os.utime(data_path)
+        os.utime(meta_path)
+    except OSError:
+        pass
+    return df
+
+
+def put(key: str, df: pd.DataFrame) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    data_path, meta_path = _paths(key)
+
+    encoded, meta = _encode(df)
+
+    # 쓰는 쪽마다 다른 임시 파일에 쓰고 os.replace로 교체 (같은 업로드를 두 세션이 동시에 캐시해도 섞이지 않음).
+    # meta를 먼저 넣어, 중간에 멈춰도 meta 없는 parquet가 남지 않게 (get은 parquet가 있어야 적중)
+    _atomic_write(meta_path, lambda tmp: tmp.write_text(
+        json.dumps(meta, ensure_ascii=False, default=str), encoding="utf-8"))
+    _atomic_write(data_path, encoded.to_parquet)
+
+    evict()
+
+
+def _atomic_write(path: Path, write: Callable[[Path], object]) -> None:
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+    os.close(fd)
+    tmp = Path(name)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def evict(max_bytes: int = CACHE_MAX_BYTES) -> None:
+    """총 용량이 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제."""
+    if not CACHE_DIR.exists():
+        return
+
+    entries = []
+    for p in CACHE_DIR.glob("*.parquet"):
+        meta = p.with_suffix(".json")
+        try:
+            st = p.stat()
+            size = st.st_size + (meta.stat().st_size if meta.exists() else 0)
+        except OSError:  # 다른 세션이 먼저 지운 항목
+            continue
+        entries.append((st.st_mtime, size, p, meta))
+
+    total = sum(e[1] for e in entries)
+    for _, size, p, meta in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        meta.unlink(missing_ok=True)
+        total -= size
+
+
+def cached_load(loader: Callable, file, **kwargs) -> pd.DataFrame:
+    """
+    loader(file, **kwargs)의 결과를 업로드 바이트 해시 기준으로 디스크에 캐시한다.
+    pyarrow가 없거나 캐시 입출력에 실패하면 그냥 loader를 호출한다.
+    """
+    data = read_upload_bytes(file)
+
+    if not _HAS_PARQUET:
+        return loader(BytesIO(data), **kwargs)
+
+    key = cache_key(data, loader, **kwargs)
+    hit = get(key)
+    if hit is not None:
+        return hit
+
+    df = loader(BytesIO(data), **kwargs)
+    try:
+        put(key, df)
+    except Exception:
+        pass
+    return df
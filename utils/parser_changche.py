@@ -1,35 +1,20 @@
-import pandas as pd
-from openpyxl import load_workbook
+from utils.header_detect import read_excel_with_header
 
-import re
+# 출력이 바뀌는 수정 시 올려서 파싱 캐시를 무효화한다.
+PARSER_VERSION = 2
 
-def load_changche(file):
-    """창체 파일을 분석하여 학생별 활동 데이터프레임을 반환합니다."""
-    
-    df_raw = pd.read_excel(file, header=None)
+HEADER_KEYWORDS = ["번 호", "성", "창의적체험활동"]
 
-    # 1) 헤더 탐색 (번 호, 성명, 창의적체험활동 등이 들어 있는 1차 헤더)
-    header_row1 = None
-    for i, row in df_raw.iterrows():
-        line = " ".join(row.astype(str).tolist())
-        if ("번 호" in line) and ("성" in line) and ("창의적체험활동" in line):
-            header_row1 = i
-            break
-
-    if header_row1 is None:
-        raise ValueError("창체 헤더를 찾지 못했습니다.")
 
-    header_row2 = header_row1 + 1  # 영역/시간 등이 있는 2차 헤더
+def load_changche(file, sheet=None, fast=None):
+    """창체 파일을 분석하여 학생별 활동 데이터프레임을 반환합니다. (sheet: 시트 순번, 기본 첫 시트, fast: xlsx 빠른 경로 사용 여부)"""
 
-    header1 = df_raw.iloc[header_row1].fillna("")
-    header2 = df_raw.iloc[header_row2].fillna("")
-
-    # 2) 멀티 헤더 결합
-    combined = header1.astype(str) + "_" + header2.astype(str)
-    combined = combined.str.replace("_nan", "", regex=False).str.replace("_$", "", regex=True)
+    # 1) 헤더 탐색 (번 호, 성명, 창의적체험활동 등이 들어 있는 1차 헤더)
+    # 2) 바로 아래 2차 헤더(영역/시간 등)와 결합하여 멀티 헤더 구성
+    df = read_excel_with_header(file, HEADER_KEYWORDS, header_rows=2, sheet=sheet, fast=fast)
 
-    df = df_raw.iloc[header_row2 + 1:].copy()
-    df.columns = combined
+    if df is None:
+        raise ValueError("창체 헤더를 찾지 못했습니다.")
 
     # 3) 핵심 컬럼 이름 정규화
     def normalize(c):
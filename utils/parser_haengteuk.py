@@ -1,28 +1,21 @@
 import pandas as pd
-from openpyxl import load_workbook
 
-import re
+from utils.header_detect import read_excel_with_header
 
-def load_haengteuk(file):
-    """행동특성 파일을 분석하여 학생별 학년·행특 내용으로 구성된 DF 반환."""
+# 출력이 바뀌는 수정 시 올려서 파싱 캐시를 무효화한다.
+PARSER_VERSION = 2
 
-    raw = pd.read_excel(file, header=None)
+HEADER_KEYWORDS = ["번 호", "성", "학 년", "행 동"]
 
-    # 1) 헤더 탐지
-    header_row = None
-    for i, row in raw.iterrows():
-        line = " ".join(row.astype(str).tolist())
-        if ("번 호" in line) and ("성" in line) and ("학 년" in line) and ("행 동" in line):
-            header_row = i
-            break
 
-    if header_row is None:
-        raise ValueError("행특 헤더를 찾지 못했습니다.")
+def load_haengteuk(file, sheet=None, fast=None):
+    """행동특성 파일을 분석하여 학생별 학년·행특 내용으로 구성된 DF 반환. (sheet: 시트 순번, 기본 첫 시트, fast: xlsx 빠른 경로 사용 여부)"""
+
+    # 1) 헤더 탐지 + 2) 헤더 지정 후 데이터 읽기
+    df = read_excel_with_header(file, HEADER_KEYWORDS, sheet=sheet, fast=fast)
 
-    # 2) 헤더 지정 후 데이터 읽기
-    header = raw.iloc[header_row].fillna("")
-    df = raw.iloc[header_row + 1:].copy()
-    df.columns = header
+    if df is None:
+        raise ValueError("행특 헤더를 찾지 못했습니다.")
 
     # 3) 컬럼 정규화
     def norm(c):
@@ -1,79 +1,171 @@
-import pandas as pd
-from openpyxl import load_workbook
+from bisect import bisect_right
 
+import openpyxl
+import pandas as pd
 from openpyxl import load_workbook
 
-def load_seteuk(file):
-    """세부능력 및 특기사항을 병합셀에서 추출하여 DF로 구성."""
-
+from utils import xlsx_fast
+
+# openpyxl 내부 파서(WorkSheetParser, ws._get_source 등)는 공개 API가 아니므로
+# 확인한 버전에서만 쓰고, 그 밖의 버전·import 실패 시 공개 API(일반 모드 로드)로 처리
+_TESTED_OPENPYXL = ("3.0", "3.1")
+try:
+    from openpyxl.worksheet._reader import WorkSheetParser
+except ImportError:
+    WorkSheetParser = None
+_USE_PRIVATE = WorkSheetParser is not None and openpyxl.__version__.startswith(_TESTED_OPENPYXL)
+
+# 출력이 바뀌는 수정 시 올려서 파싱 캐시를 무효화한다.
+PARSER_VERSION = 3
+
+INFO_FIELDS = ("번호", "성명", "학년")
+
+
+def _classify_info(text):
+    """병합셀 값이 번호/성명/학년 중 무엇인지 판별 (해당 없으면 None)."""
+    # 학년 (숫자라 번호보다 먼저 봐야 함. 번호는 10101 같은 학번)
+    if text in ["1", "2", "3"]:
+        return "학년"
+    # 번호
+    if text.isdigit():
+        return "번호"
+    # 성명 (한글 2~3자)
+    if len(text) in [2, 3] and all("가" <= ch <= "힣" for ch in text):
+        return "성명"
+    return None
+
+
+def _is_seteuk_text(text):
+    """세특 내용 여부 (문장, 과목 구분 등)."""
+    return len(text) >= 5 and (":" in text or "." in text)
+
+
+def _is_candidate(text):
+    """병합 범위를 알기 전에 보관할 가치가 있는 값(세특 문장 또는 학생 정보)인지."""
+    return _is_seteuk_text(text.strip()) or _classify_info(text) is not None
+
+
+def _scan_sheet(ws):
+    """
+    read-only 시트를 한 번만 스트리밍하여 (병합 범위 목록, 후보 셀 값)을 반환.
+    <mergeCells>는 sheetData 뒤에 오므로, 세특/학생정보 후보가 될 수 있는 값만 보관한다.
+    (openpyxl 내부 파서 사용)
+    """
+    wb = ws.parent
+    candidates = {}
+
+    with ws._get_source() as src:
+        parser = WorkSheetParser(
+            src,
+            ws._shared_strings,
+            data_only=wb.data_only,
+            epoch=wb.epoch,
+            date_formats=wb._date_formats,
+            timedelta_formats=wb._timedelta_formats,
+        )
+        for _, cells in parser.parse():
+            for cell in cells:
+                value = cell["value"]
+                if value is None:
+                    continue
+                text = str(value)
+                if _is_candidate(text):
+                    candidates[(cell["row"], cell["column"])] = text
+
+        merged = parser.merged_cells
+
+    ranges = [cr.bounds for cr in merged.mergeCell] if merged else []
+    return ranges, candidates
+
+
+def _scan_sheet_public(file, sheet=None):
+    """_scan_sheet와 같은 결과를 공개 API로 (일반 모드라 느리고 메모리를 더 씀)."""
+    if hasattr(file, "seek"):
+        file.seek(0)
     wb = load_workbook(file)
-    ws = wb.active
-
+    try:
+        ws = wb.active if sheet is None else wb[wb.sheetnames[sheet]]
+        ranges = [r.bounds for r in ws.merged_cells.ranges]
+        candidates = {}
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value is None:
+                    continue
+                text = str(cell.value)
+                if _is_candidate(text):
+                    candidates[(cell.row, cell.column)] = text
+    finally:
+        wb.close()
+    return ranges, candidates
+
+
+def _build_frame(ranges, candidates):
+    """병합셀 좌상단 값으로 세특 레코드를 만들고 행 인덱스로 번호/성명/학년을 붙인다."""
     records = []
+    info_rows = {k: [] for k in INFO_FIELDS}
 
-    # 1) 병합셀 순회
-    for r in ws.merged_cells.ranges:
-        (min_col, min_row, max_col, max_row) = r.bounds
-        value = ws.cell(row=min_row, column=min_col).value
-
-        # 세특 텍스트 후보 판별
-        if not value:
+    # 1) 병합셀 좌상단만 시트 순서(행, 열)로 분류
+    for min_col, min_row, _, _ in sorted(ranges, key=lambda b: (b[1], b[0])):
+        text = candidates.get((min_row, min_col))
+        if not text:
             continue
 
-        text = str(value).strip()
-        if len(text) < 5:
-            continue
+        if _is_seteuk_text(text.strip()):
+            records.append({"row": min_row, "col": min_col, "세특내용": text.strip()})
 
-        # 세특 내용 여부 (문장, 과목 구분 등)
-        if ":" in text or "." in text:
-            records.append({
-                "row": min_row,
-                "col": min_col,
-                "세특내용": text
-            })
+        field = _classify_info(text)
+        if field:
+            info_rows[field].append((min_row, text))
 
     df = pd.DataFrame(records)
 
     if df.empty:
         return pd.DataFrame(columns=["번호", "성명", "학년", "세특내용"])
 
-    # 2) 학생 정보 병합셀 추출 (번호, 성명, 학년)
-    student_info = []
-
-    for r in ws.merged_cells.ranges:
-        (min_col, min_row, max_col, max_row) = r.bounds
-        val = ws.cell(row=min_row, column=min_col).value
-        if val is None:
-            continue
+    # 2) 정렬된 행 인덱스에서 bisect로 "해당 행 이전의 마지막 값"을 찾아 부여
+    for field in INFO_FIELDS:
+        entries = info_rows[field]
+        rows = [r for r, _ in entries]
+        values = [v for _, v in entries]
 
-        text = str(val)
-        # 번호
-        if text.isdigit():
-            student_info.append({"row": min_row, "번호": text})
-        # 성명 (한글 2~3자)
-        elif len(text) in [2, 3] and all("가" <= ch <= "힣" for ch in text):
-            student_info.append({"row": min_row, "성명": text})
-        # 학년
-        elif text in ["1", "2", "3"]:
-            student_info.append({"row": min_row, "학년": text})
-
-    df_info = pd.DataFrame(student_info)
-
-    # 3) 학생정보와 세특내용 row 기반 매핑
-    df["번호"] = None
-    df["성명"] = None
-    df["학년"] = None
-
-    for i in df.index:
-        row_pos = df.loc[i, "row"]
-        info_subset = df_info[df_info["row"] <= row_pos]
-
-        if not info_subset.empty:
-            last_info = info_subset.sort_values("row").iloc[-1].to_dict()
-            df.loc[i, "번호"] = last_info.get("번호", df.loc[i, "번호"])
-            df.loc[i, "성명"] = last_info.get("성명", df.loc[i, "성명"])
-            df.loc[i, "학년"] = last_info.get("학년", df.loc[i, "학년"])
+        mapped = []
+        for row_pos in df["row"]:
+            i = bisect_right(rows, row_pos)
+            mapped.append(values[i - 1] if i else None)
+        df[field] = mapped
 
     df["학년"] = pd.to_numeric(df["학년"], errors="coerce")
 
     return df[["번호", "성명", "학년", "세특내용"]].dropna(subset=["번호", "성명"])
+
+
+def load_seteuk(file, sheet=None, fast=None):
+    """
+    세부능력 및 특기사항을 병합셀에서 추출하여 DF로 구성.
+    (sheet: 시트 순번, 기본 활성 시트 / fast: xlsx 빠른 경로 사용 여부, 기본 설정값)
+    """
+
+    # 빠른 경로: zip 안의 시트 XML을 직접 스트리밍 (지원하지 않는 구성·깨진 XML이면 openpyxl로)
+    if xlsx_fast.use_fast(fast):
+        try:
+            ranges, candidates = xlsx_fast.scan_merged_cells(file, _is_candidate, sheet=sheet)
+            return _build_frame(ranges, candidates)
+        except xlsx_fast.FALLBACK_ERRORS:
+            pass
+
+    scanned = None
+    if _USE_PRIVATE:
+        if hasattr(file, "seek"):
+            file.seek(0)
+        wb = load_workbook(file, read_only=True)
+        try:
+            ws = wb.active if sheet is None else wb[wb.sheetnames[sheet]]
+            scanned = _scan_sheet(ws)
+        except (AttributeError, TypeError):
+            pass  # 내부 구현이 바뀐 경우 → 공개 API로
+        finally:
+            wb.close()
+
+    if scanned is None:
+        scanned = _scan_sheet_public(file, sheet)
+    return _build_frame(*scanned)
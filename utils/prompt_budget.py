@@ -0,0 +1,206 @@
+# utils/prompt_budget.py
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+_HAS_TIKTOKEN = importlib.util.find_spec("tiktoken") is not None
+
+# 원문(세특+행특+창체) 부분에 쓸 입력 토큰 상한. SYSTEM_PROMPT·안내 문구는 제외한 값
+SOURCE_TOKEN_BUDGET = int(os.environ.get("SEHWA_PROMPT_TOKEN_BUDGET", 12000))
+
+# 줄일 때는 뒤쪽(우선순위 낮은) 구역부터, 각 구역은 최소 이만큼은 남김
+SECTION_PRIORITY = ["세특", "행특", "창체"]
+MIN_SECTION_TOKENS = 400
+
+# 이 길이 미만 문장("성실함." 등)은 중복이어도 지우지 않음
+MIN_DEDUPE_CHARS = 10
+
+_SPACES = re.compile(r"[ \t　\xa0]+")
+_HEADER = re.compile(r"^\[[^\[\]]+\]$")
+_SENT_SPLIT = re.compile(r"(?<=[.!?。])\s+")
+_HANGUL = re.compile(r"[가-힣]")
+
+
+# -----------------------------
+# 토큰 수
+# -----------------------------
+@lru_cache(maxsize=1)
+def _encoder(model: str):
+    if not _HAS_TIKTOKEN:
+        return None
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # 인코딩 파일을 내려받지 못하는 오프라인 환경 등 → 추정치 사용
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken이 없을 때의 추정치. 한글은 글자당 약 0.8토큰, 그 외는 약 3.5자당 1토큰으로 넉넉히 잡음."""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    others = len(text) - hangul - text.count(" ")
+    return math.ceil(hangul * 0.8 + others / 3.5)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    if model is None:
+        model = "gpt-4o-mini"
+    enc = _encoder(model)
+    if enc is None:
+        return estimate_tokens(text)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+# -----------------------------
+# 압축
+# -----------------------------
+def compact_section(text: str) -> str:
+    """
+    의미를 바꾸지 않는 정리만 한다 (남은 문장은 원문 그대로라 '평가 근거 문장' 발췌에 지장 없음).
+    - 줄 안의 연속 공백을 하나로, 빈 줄 여러 개는 하나로
+    - 이미 나온 [컬럼명] 머리글 반복 제거 (학급별 파일을 이어 붙이면 같은 머리글이 여러 번 나옴)
+    - 구역 안에서 이미 나온 문장·줄 반복 제거
+    """
+    if not text:
+        return ""
+
+    seen_headers = set()
+    seen_sentences = set()
+    out: List[str] = []
+
+    for raw in text.splitlines():
+        line = _SPACES.sub(" ", raw).strip()
+        if not line:
+            if out and out[-1]:
+                out.append("")
+            continue
+
+        if _HEADER.match(line):
+            if line in seen_headers:
+                continue
+            seen_headers.add(line)
+            out.append(line)
+            continue
+
+        kept = []
+        for sentence in _SENT_SPLIT.split(line):
+            if len(sentence) >= MIN_DEDUPE_CHARS:
+                if sentence in seen_sentences:
+                    continue
+                seen_sentences.add(sentence)
+            kept.append(sentence)
+        if kept:
+            out.append(" ".join(kept))
+
+    # 내용 없이 남은 머리글·빈 줄 정리
+    cleaned = [l for i, l in enumerate(out)
+               if not (_HEADER.match(l) and (i + 1 == len(out) or not out[i + 1] or _HEADER.match(out[i + 1])))]
+    return "\n".join(cleaned).strip()
+
+
+def _trim_lines(text: str, target: int, counter: Callable[[str], int]) -> tuple:
+    """
+    끝 줄부터 지워 target 토큰 이하로. (잘린 텍스트, 지운 줄 수)
+    남길 줄 수는 이분 탐색으로 찾는다 (한 줄씩 지우며 전체를 다시 세면 긴 기록에서 O(n²)).
+    """
+    lines = text.splitlines()
+    if counter(text) <= target:
+        return text.rstrip(), 0
+
+    # 앞 k줄이 target 이하인 가장 큰 k (앞부분 토큰 수는 k에 대해 단조 증가)
+    lo, hi = 0, len(lines) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if counter("\n".join(lines[:mid])) <= target:
+            lo = mid
+        else:
+            hi = mid - 1
+    dropped = len(lines) - lo
+    trimmed = "\n".join(lines[:lo]).rstrip()
+    if dropped:
+        trimmed += f"\n(… 분량 제한으로 이하 {dropped}줄 생략)"
+    return trimmed, dropped
+
+
+@dataclass
+class BudgetResult:
+    texts: Dict[str, str]
+    tokens_before: int
+    tokens_after: int
+    budget: int
+    dropped_lines: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def trimmed(self) -> bool:
+        return any(self.dropped_lines.values())
+
+
+def fit_to_budget(
+    texts: Dict[str, str],
+    budget: int = SOURCE_TOKEN_BUDGET,
+    model: Optional[str] = None,
+) -> BudgetResult:
+    """
+    {"세특": ..., "행특": ..., "창체": ...} 원문을 정리한 뒤, 그래도 budget을 넘으면
+    우선순위가 낮은 구역(창체 → 행특 → 세특)의 뒷부분부터 줄여 맞춘다.
+    """
+    counter = lambda t: count_tokens(t, model)
+
+    texts = {k: texts.get(k, "") or "" for k in SECTION_PRIORITY}
+    before = sum(counter(t) for t in texts.values())
+
+    fitted = {k: compact_section(t) for k, t in texts.items()}
+    sizes = {k: counter(t) for k, t in fitted.items()}
+    dropped = {k: 0 for k in SECTION_PRIORITY}
+
+    over = sum(sizes.values()) - budget
+    for kind in reversed(SECTION_PRIORITY):
+        if over <= 0:
+            break
+        spare = sizes[kind] - MIN_SECTION_TOKENS
+        if spare <= 0:
+            continue
+        target = sizes[kind] - min(over, spare)
+        fitted[kind], dropped[kind] = _trim_lines(fitted[kind], target, counter)
+        new_size = counter(fitted[kind])
+        over -= sizes[kind] - new_size
+        sizes[kind] = new_size
+
+    return BudgetResult(
+        texts=fitted,
+        tokens_before=before,
+        tokens_after=sum(sizes.values()),
+        budget=budget,
+        dropped_lines=dropped,
+    )
+
+
+def split_chunks(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """줄 단위로 max_tokens 이하 조각들로 나눈다 (한 줄이 상한보다 길면 그 줄만 단독 조각)."""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.splitlines():
+        n = count_tokens(line, model) + 1
+        if current and size + n > max_tokens:
+            chunks.append("\n".join(current).strip())
+            current, size = [], 0
+        current.append(line)
+        size += n
+    if current:
+        chunks.append("\n".join(current).strip())
+    return [c for c in chunks if c]
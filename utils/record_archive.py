@@ -0,0 +1,241 @@
+# utils/record_archive.py
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.text_builder import get_id_col
+
+# 학기마다 누적 업로드되는 세특/행특/창체를 (종류, 학번, 학년) 단위로 보관하는 로컬 SQLite
+ARCHIVE_PATH = Path(os.environ.get(
+    "SEHWA_ARCHIVE_PATH",
+    Path.home() / ".local" / "share" / "sehwaprograms" / "record_archive.sqlite3",
+))
+
+KINDS = ("세특", "행특", "창체")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    kind TEXT NOT NULL,
+    sid TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (kind, sid, grade)
+);
+CREATE TABLE IF NOT EXISTS rows (
+    kind TEXT NOT NULL,
+    sid TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    ord INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rows_partition ON rows (kind, sid, grade);
+CREATE INDEX IF NOT EXISTS idx_rows_sid ON rows (sid);
+"""
+
+
+@dataclass
+class IngestStats:
+    new: int = 0         # 새로 생긴 (종류, 학번, 학년)
+    changed: int = 0     # 내용이 바뀌어 다시 쓴 것
+    unchanged: int = 0   # 그대로라 건너뛴 것
+    removed: int = 0     # 새 내보내기에서 빠져 지운 것
+    rows_written: int = 0
+
+    def summary(self) -> str:
+        return (f"신규 {self.new} · 변경 {self.changed} · 동일 {self.unchanged} · 삭제 {self.removed} "
+                f"(기록한 행 {self.rows_written})")
+
+
+def _plain(v):
+    """JSON에 넣을 수 있는 파이썬 기본값으로 (NaN/NA → None)."""
+    if v is None:
+        return None
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    try:
+        if pd.isna(v):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return v
+
+
+_INT_LIKE = re.compile(r"^(-?\d+)\.0+$")
+
+
+def _key(v) -> str:
+    """학번·학년을 비교용 문자열로 (정수 모양 float은 정수로, 빈 값은 "")."""
+    v = _plain(v)
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    # 이미 문자열로 바뀐 "10101.0"·"nan"도 같은 키로
+    s = _INT_LIKE.sub(r"\1", str(v).strip())
+    return "" if s.lower() in ("nan", "<na>", "none") else s
+
+
+def _partitions(kind: str, df: pd.DataFrame) -> Dict[Tuple[str, str], List[str]]:
+    """{(학번, 학년): [행 JSON, ...]} (원래 행 순서 유지). 학번이 빈 행은 버린다."""
+    if df is None or df.empty:
+        return {}
+    id_col = get_id_col(df)
+    if id_col not in df.columns:
+        return {}
+
+    # 번호 컬럼에 빈 값이 하나라도 있으면 float이 되므로 10101.0 → "10101" 처럼 정수 모양으로 맞춤
+    # (astype(str)만 쓰면 "10101.0", pandas 2.x에선 NaN도 "nan" 문자열이 됨)
+    keys = [_key(v) for v in df[id_col].tolist()]
+    grades = df["학년"].tolist() if "학년" in df.columns else [None] * len(df)
+    columns = [str(c) for c in df.columns]
+
+    parts: Dict[Tuple[str, str], List[str]] = {}
+    for sid, grade, values in zip(keys, grades, df.itertuples(index=False, name=None)):
+        if not sid:
+            continue
+        payload = json.dumps(
+            dict(zip(columns, (_plain(v) for v in values))),
+            ensure_ascii=False,
+            default=str,
+        )
+        parts.setdefault((sid, _key(grade)), []).append(payload)
+    return parts
+
+
+def _digest(payloads: List[str]) -> str:
+    h = hashlib.sha256()
+    for p in payloads:
+        h.update(p.encode())
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+class RecordArchive:
+    """
+    학생 기록 누적 보관소. 새 내보내기 파일과 비교해 바뀐 (종류, 학번, 학년)만 다시 쓴다.
+
+    새 내보내기에 있는 학생·학년인데 그 (종류, 학번, 학년)이 빠졌으면 지운다 (기록 삭제 반영).
+    내보내기에 아예 없는 학생이나 학년은 그대로 둔다: 반별·학년별로 나눠 올리는 경우와
+    전학 등으로 빠진 경우를 파일만으로는 구분할 수 없기 때문. 이런 학생은 remove_students로 지운다.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else ARCHIVE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def ingest(self, frames: Dict[str, pd.DataFrame]) -> IngestStats:
+        """{"세특": df, "행특": df, "창체": df}를 보관소에 병합."""
+        stats = IngestStats()
+        now = datetime.now().isoformat(timespec="seconds")
+
+        with self._connect() as conn:
+            for kind, df in frames.items():
+                stored = {
+                    (sid, grade): digest
+                    for sid, grade, digest in conn.execute(
+                        "SELECT sid, grade, digest FROM partitions WHERE kind = ?", (kind,)
+                    )
+                }
+
+                parts = _partitions(kind, df)
+                sids = {sid for sid, _ in parts}
+                grades = {grade for _, grade in parts}
+                for sid, grade in stored.keys() - parts.keys():
+                    if sid in sids and grade in grades:
+                        self._delete(conn, kind, sid, grade)
+                        stats.removed += 1
+
+                for (sid, grade), payloads in parts.items():
+                    digest = _digest(payloads)
+                    prev = stored.get((sid, grade))
+                    if prev == digest:
+                        stats.unchanged += 1
+                        continue
+
+                    if prev is None:
+                        stats.new += 1
+                    else:
+                        stats.changed += 1
+                        conn.execute(
+                            "DELETE FROM rows WHERE kind = ? AND sid = ? AND grade = ?",
+                            (kind, sid, grade),
+                        )
+
+                    conn.executemany(
+                        "INSERT INTO rows (kind, sid, grade, ord, payload) VALUES (?, ?, ?, ?, ?)",
+                        [(kind, sid, grade, i, p) for i, p in enumerate(payloads)],
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO partitions (kind, sid, grade, digest, row_count, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (kind, sid, grade, digest, len(payloads), now),
+                    )
+                    stats.rows_written += len(payloads)
+
+        return stats
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, kind: str, sid: str, grade: str) -> None:
+        conn.execute("DELETE FROM rows WHERE kind = ? AND sid = ? AND grade = ?", (kind, sid, grade))
+        conn.execute("DELETE FROM partitions WHERE kind = ? AND sid = ? AND grade = ?", (kind, sid, grade))
+
+    def remove_students(self, ids: Iterable[str]) -> int:
+        """전학·졸업 등으로 더 이상 보관하지 않을 학생의 기록을 모두 지운다. 지운 (종류, 학년) 수."""
+        ids = [_key(i) for i in ids]
+        if not ids:
+            return 0
+        marks = ",".join("?" * len(ids))
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM rows WHERE sid IN ({marks})", ids)
+            return conn.execute(f"DELETE FROM partitions WHERE sid IN ({marks})", ids).rowcount
+
+    def student_ids(self) -> List[str]:
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT sid FROM partitions ORDER BY sid")]
+
+    def load_frames(self, ids: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """보관된 기록을 종류별 DF로 복원 (ids를 주면 해당 학생만). 학번·학년 순으로 정렬."""
+        sql = "SELECT kind, payload FROM rows"
+        params: Tuple = ()
+        if ids is not None:
+            ids = [_key(i) for i in ids]
+            sql += f" WHERE sid IN ({','.join('?' * len(ids))})"
+            params = tuple(ids)
+        sql += " ORDER BY kind, sid, grade, ord"
+
+        records: Dict[str, List[dict]] = {k: [] for k in KINDS}
+        with self._connect() as conn:
+            for kind, payload in conn.execute(sql, params):
+                records.setdefault(kind, []).append(json.loads(payload))
+
+        frames = {}
+        for kind, rows in records.items():
+            df = pd.DataFrame(rows)
+            # JSON null → NaN, 학년 등 숫자 컬럼은 파싱 직후와 같은 dtype으로
+            frames[kind] = df.where(df.notna(), np.nan).infer_objects()
+        return frames
+
+    def load_student(self, sid) -> Dict[str, pd.DataFrame]:
+        """한 학생의 전 학년 기록 (원본 파일 없이)."""
+        return self.load_frames([sid])
@@ -0,0 +1,337 @@
+# utils/report_batch.py
+from __future__ import annotations
+
+import contextvars
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils import llm_ledger
+
+# 동시에 보낼 최대 요청 수 (429가 오면 자동으로 줄였다가 성공이 이어지면 다시 늘림)
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0   # 초
+BACKOFF_CAP = 30.0   # 초
+# 연속 성공이 이만큼 쌓이면 동시 요청 수를 하나 늘림
+RAMP_UP_AFTER = 3
+
+
+@dataclass
+class ReportJob:
+    student_id: str
+    masked_name: str
+    year_count: int
+    seteuk_text: str
+    haengteuk_text: str
+    changche_text: str
+    # 기록이 길어 학년·영역별 요약을 거칠 때만 채움 {"1학년 세특": 원문, ...}
+    sections: Optional[Dict[str, str]] = None
+    # "single"(한 번에 생성) / "parallel"(항목 묶음별 동시 생성). sections가 있으면 무시
+    strategy: str = "single"
+    # 경로 설정(report_routing.route) 결과. 비워 두면 기본 모델·상한 없음
+    model: str = ""
+    max_tokens: Optional[int] = None
+    est_seconds: Optional[float] = None
+
+
+# on_done(명렬 순서 index, job, report, 완료 수, 전체 수) — 호출한 스레드에서 실행됨
+DoneCallback = Callable[[int, ReportJob, dict, int, int], None]
+
+
+def _status(exc: Exception) -> Optional[int]:
+    return getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    """openai.RateLimitError 또는 HTTP 429."""
+    if type(exc).__name__ == "RateLimitError":
+        return True
+    return _status(exc) == 429
+
+
+def is_transient(exc: Exception) -> bool:
+    """429 말고도 잠시 뒤 다시 보내면 되는 오류: 5xx, 연결 끊김, 시간 초과 (SDK 자체 재시도는 꺼 둠)."""
+    if type(exc).__name__ in ("APIConnectionError", "APITimeoutError", "InternalServerError"):
+        return True
+    status = _status(exc)
+    return isinstance(status, int) and status >= 500
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    동시 실행 수 상한을 실행 중에 조절하는 세마포어.
+    429 → 상한 절반(최소 1), 연속 성공 → 상한 +1 (최대 max_limit).
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.active = 0
+        self._streak = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self._streak += 1
+            if self._streak >= RAMP_UP_AFTER and self.limit < self.max_limit:
+                self.limit += 1
+                self._streak = 0
+                self._cond.notify_all()
+
+    def on_rate_limited(self):
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._streak = 0
+
+
+# 지금 작업이 쓰는 제한기. 슬롯은 작업(학생)이 아니라 API 요청 한 건마다 잡음:
+# 항목별 동시 생성(학생당 3요청)·보완·요약 요청도 각각 세어 max_concurrency가 실제 동시 요청 수가 되게
+_limiter: contextvars.ContextVar[Optional[AdaptiveLimiter]] = contextvars.ContextVar("report_batch_limiter", default=None)
+
+
+@contextmanager
+def request_slot() -> Iterator[None]:
+    """API 요청 한 건을 감쌈. 제한기 밖(단독 호출)이면 아무것도 하지 않음."""
+    limiter = _limiter.get()
+    if limiter is None:
+        yield
+        return
+    limiter.acquire()
+    try:
+        yield
+    finally:
+        limiter.release()
+
+
+def _backoff(attempt: int, exc: Exception) -> float:
+    """지수 백오프 + full jitter. 서버가 Retry-After를 주면 그보다 짧게 기다리지 않음."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    hinted = _retry_after(exc)
+    return max(delay, hinted) if hinted is not None else delay
+
+
+def job_sources(job: ReportJob) -> Dict[str, str]:
+    """근거 문장을 대조할 원문 (요약 모드면 학년·영역별 원문, 아니면 모델에 보낸 세특/행특/창체)."""
+    if job.sections is not None:
+        return dict(job.sections)
+    return {"세특": job.seteuk_text, "행특": job.haengteuk_text, "창체": job.changche_text}
+
+
+def verify_job_report(job: ReportJob, report: dict) -> dict:
+    """
+    근거 문장 원문 대조. 건져 낸(salvaged) 보고서 등 모양이 예상과 달라 대조가 실패해도
+    보고서는 버리지 않고 대조 전 그대로 돌려준다 (한 학생 때문에 배치 전체가 멈추지 않게).
+    """
+    from utils.evidence_check import verify_report
+    try:
+        return verify_report(report, job_sources(job))
+    except Exception:
+        return report
+
+
+def _route_tags(job: ReportJob) -> dict:
+    """호출 장부에 남길 경로 정보 (예상 대비 실제 지연 비교용)."""
+    return {
+        "strategy": "map_reduce" if job.sections is not None else job.strategy,
+        "max_tokens": job.max_tokens,
+        "route_est_ms": round(job.est_seconds * 1000) if job.est_seconds is not None else None,
+    }
+
+
+def _call(request: Callable[..., dict], job: ReportJob) -> dict:
+    from utils.ai_report_generator import using
+
+    with using(model=job.model or None, max_tokens=job.max_tokens), llm_ledger.tagged(**_route_tags(job)):
+        return _dispatch(request, job)
+
+
+def _dispatch(request: Callable[..., dict], job: ReportJob) -> dict:
+    if job.sections is not None:
+        from utils.ai_report_generator import request_map_reduce_report
+        return request_map_reduce_report(job.student_id, job.masked_name, job.year_count, job.sections)
+    if job.strategy == "parallel":
+        from utils.ai_report_generator import request_parallel_report
+        request = request_parallel_report
+    return request(
+        job.student_id, job.masked_name, job.year_count,
+        job.seteuk_text, job.haengteuk_text, job.changche_text,
+    )
+
+
+def _retrying(call: Callable[[], dict], max_retries: int, limiter: Optional[AdaptiveLimiter] = None) -> dict:
+    """
+    429·일시 오류면 백오프 후 다시 부른다 (429면 limiter 상한도 줄임). 그 밖의 오류나
+    마지막 시도의 실패는 그대로 올린다. 호출 장부에는 몇 번째 시도인지 attempt로 남김.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            with llm_ledger.tagged(attempt=attempt):
+                result = call()
+        except Exception as e:
+            if attempt < max_retries and (is_rate_limited(e) or is_transient(e)):
+                # 동시 요청 수는 429일 때만 줄이고, 일시 오류는 백오프 후 그대로 다시 보냄
+                if limiter is not None and is_rate_limited(e):
+                    limiter.on_rate_limited()
+                time.sleep(_backoff(attempt, e))
+                continue
+            raise
+        if limiter is not None:
+            limiter.on_success()
+        return result
+
+
+def _run_job(job: ReportJob, limiter: AdaptiveLimiter, request: Callable[..., dict], max_retries: int) -> dict:
+    from utils.ai_report_generator import error_report
+
+    token = _limiter.set(limiter)
+    try:
+        with llm_ledger.tagged(student_id=job.student_id):
+            report = _retrying(lambda: _call(request, job), max_retries, limiter)
+    except Exception as e:
+        return error_report(job.student_id, job.masked_name, job.year_count, e)
+    finally:
+        _limiter.reset(token)
+    return verify_job_report(job, report)
+
+
+def generate_reports(
+    jobs: List[ReportJob],
+    on_done: Optional[DoneCallback] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_retries: int = MAX_RETRIES,
+    request: Optional[Callable[..., dict]] = None,
+) -> List[dict]:
+    """
+    여러 학생 보고서를 동시에 생성해 jobs 순서(명렬 순서) 그대로 반환한다.
+    요청은 스레드 풀에서 보내고, on_done은 끝나는 순서대로 호출한 스레드에서 불러
+    Streamlit 진행률 갱신에 바로 쓸 수 있다. 실패한 학생은 오류 보고서(점수 0)로 채운다.
+    """
+    if request is None:
+        from utils.ai_report_generator import request_sh_insight_report as request
+
+    total = len(jobs)
+    results: List[Optional[dict]] = [None] * total
+    if not jobs:
+        return []
+
+    limiter = AdaptiveLimiter(max_concurrency)
+    # 한 번의 생성 실행을 호출 장부에서 묶어 볼 수 있게 run_id를 붙이고, 작업 스레드로 컨텍스트를 넘김
+    run_id = llm_ledger.current().get("run_id") or llm_ledger.new_run_id()
+    with llm_ledger.tagged(run_id=run_id), ThreadPoolExecutor(max_workers=limiter.max_limit) as pool:
+        futures = {
+            pool.submit(contextvars.copy_context().run, _run_job, job, limiter, request, max_retries): i
+            for i, job in enumerate(jobs)
+        }
+        for done, fut in enumerate(as_completed(futures), start=1):
+            i = futures[fut]
+            results[i] = fut.result()
+            if on_done:
+                on_done(i, jobs[i], results[i], done, total)
+
+    return results
+
+
+def generate_reports_live(
+    jobs: List[ReportJob],
+    on_section: Callable[[ReportJob, str, Any], None],
+    on_done: Optional[DoneCallback] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_retries: int = MAX_RETRIES,
+) -> List[dict]:
+    """
+    generate_reports와 같지만, 명렬상 첫 학생(요약 모드가 아닌)은 스트리밍(항목별 동시 생성이면
+    묶음 완료 순)으로 받아 최상위 항목이 완성될 때마다 on_section(job, 키, 값)을 부른다. 나머지 학생은 그동안
+    백그라운드 스레드에서 동시에 생성하고, on_done/on_section은 모두 호출한 스레드에서 실행된다.
+    """
+    from utils.ai_report_generator import error_report, request_parallel_report, stream_sh_insight_report, using
+
+    live = next((i for i, job in enumerate(jobs) if job.sections is None), None)
+    if live is None:
+        return generate_reports(jobs, on_done, max_concurrency, max_retries)
+
+    total = len(jobs)
+    results: List[Optional[dict]] = [None] * total
+    rest = [i for i in range(total) if i != live]
+    finished = queue.Queue()
+    done = 0
+
+    def _background():
+        generate_reports(
+            [jobs[i] for i in rest],
+            on_done=lambda k, job, report, *_: finished.put((rest[k], report)),
+            max_concurrency=max(1, max_concurrency - 1),
+            max_retries=max_retries,
+        )
+
+    def _drain(block: bool):
+        nonlocal done
+        while True:
+            try:
+                i, report = finished.get(block=block, timeout=0.1) if block else finished.get_nowait()
+            except queue.Empty:
+                return
+            results[i] = report
+            done += 1
+            if on_done:
+                on_done(i, jobs[i], report, done, total)
+
+    run_id = llm_ledger.current().get("run_id") or llm_ledger.new_run_id()
+    with llm_ledger.tagged(run_id=run_id):
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(_background,), daemon=True)
+    if rest:
+        worker.start()
+
+    job = jobs[live]
+
+    def _section(key, value):
+        on_section(job, key, value)
+        _drain(block=False)
+
+    live_request = request_parallel_report if job.strategy == "parallel" else stream_sh_insight_report
+    try:
+        # 보고 있는 학생도 429·일시 오류는 다른 학생과 같은 백오프로 다시 시도 (한 번의 429로 점수 0이 되지 않게)
+        with llm_ledger.tagged(run_id=run_id, student_id=job.student_id, **_route_tags(job)), \
+                using(model=job.model or None, max_tokens=job.max_tokens):
+            results[live] = _retrying(lambda: live_request(
+                job.student_id, job.masked_name, job.year_count,
+                job.seteuk_text, job.haengteuk_text, job.changche_text,
+                on_section=_section,
+            ), max_retries)
+        results[live] = verify_job_report(job, results[live])
+    except Exception as e:
+        results[live] = error_report(job.student_id, job.masked_name, job.year_count, e)
+    done += 1
+    if on_done:
+        on_done(live, job, results[live], done, total)
+
+    while worker.is_alive():
+        _drain(block=True)
+    _drain(block=False)
+
+    return results
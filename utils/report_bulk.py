@@ -0,0 +1,361 @@
+# utils/report_bulk.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import llm_cache, llm_ledger
+from utils.report_batch import ReportJob, verify_job_report
+
+# 학년 전체(300명+)처럼 즉시 응답이 필요 없는 대량 생성은 Batch API로 보냄
+# (요청당 비용이 낮고, 동시 요청 한도(429)에 걸리지 않음)
+ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+POLL_SECONDS = 30.0
+# 실패한 학생만 모아 다시 제출하는 최대 횟수 (첫 제출 포함)
+MAX_ROUNDS = 3
+# 파일 업로드·배치 생성·상태 확인 요청의 SDK 재시도 횟수
+BATCH_SDK_RETRIES = 2
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# 제출한 배치 작업 상태(batch id·회차·받은 보고서)를 실행마다 JSON으로 보관:
+# 새로고침·탭 닫기·연결 끊김 뒤에도 같은 배치를 이어서 확인·수거 (비용을 낸 배치를 버리지 않게)
+# 학생 명렬·보고서가 들어 있으므로 실행마다 owner를 두고 제출한 사람에게만 보여 줌 (파일도 소유자만 읽기)
+BULK_DIR = Path(os.environ.get(
+    "SEHWA_BULK_DIR",
+    Path.home() / ".local" / "share" / "sehwaprograms" / "bulk",
+))
+
+
+@dataclass
+class BulkStatus:
+    round: int        # 1부터
+    batch_id: str
+    status: str       # validating / in_progress / finalizing / completed ...
+    completed: int
+    failed: int
+    total: int
+
+
+# on_status(BulkStatus) — 폴링할 때마다 호출
+StatusCallback = Callable[[BulkStatus], None]
+
+
+def _custom_id(index: int, job: ReportJob) -> str:
+    # 같은 학번이 두 번 들어와도 구분되도록 명렬 순서를 앞에 붙임
+    return f"{index}-{job.student_id}"
+
+
+def _index(custom_id: str) -> int:
+    return int(custom_id.split("-", 1)[0])
+
+
+def build_batch_file(jobs: Dict[int, ReportJob]) -> bytes:
+    """{명렬 index: job} → Batch API 입력 JSONL."""
+    from utils.ai_report_generator import build_user_prompt, chat_request_body
+
+    lines = []
+    for i, job in jobs.items():
+        prompt = build_user_prompt(
+            job.student_id, job.masked_name, job.year_count,
+            job.seteuk_text, job.haengteuk_text, job.changche_text,
+        )
+        lines.append(json.dumps({
+            "custom_id": _custom_id(i, job),
+            "method": "POST",
+            "url": ENDPOINT,
+            "body": chat_request_body(prompt),
+        }, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def submit(client, jobs: Dict[int, ReportJob]) -> str:
+    """JSONL 업로드 후 배치 작업을 만들고 batch id를 반환."""
+    uploaded = client.files.create(file=("sh_insight_reports.jsonl", build_batch_file(jobs)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=ENDPOINT,
+        completion_window=COMPLETION_WINDOW,
+        metadata={"source": "sh-insight"},
+    )
+    return batch.id
+
+
+def _read_lines(client, file_id: Optional[str]) -> List[dict]:
+    if not file_id:
+        return []
+    text = client.files.content(file_id).text
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def collect(client, batch) -> Tuple[Dict[int, dict], Dict[int, str]]:
+    """결과/오류 파일을 읽어 ({index: 보고서}, {index: 실패 사유})로 나눈다."""
+    from utils.ai_report_generator import _safe_json_loads
+    from utils.report_schema import salvage_members
+
+    reports: Dict[int, dict] = {}
+    errors: Dict[int, str] = {}
+
+    for line in _read_lines(client, getattr(batch, "output_file_id", None)) + \
+            _read_lines(client, getattr(batch, "error_file_id", None)):
+        i = _index(line["custom_id"])
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or (response.get("body") or {}).get("error") or {}
+            errors[i] = str(error.get("message") if isinstance(error, dict) else error) or \
+                f"HTTP {response.get('status_code')}"
+            continue
+
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            errors[i] = "응답 형식 오류"
+            continue
+
+        # 잘린 응답이면 닫힌 항목만이라도 살려 둠 (나머지는 poll_bulk에서 보완)
+        data = _safe_json_loads(content) or salvage_members(content)
+        if not data:
+            errors[i] = "JSON parsing failed"
+        else:
+            reports[i] = data
+
+    return reports, errors
+
+
+# -----------------------------
+# 이어 받기 가능한 실행 상태 (제출 → 폴링 → 수거·보완 → 실패분 재제출)
+# -----------------------------
+@dataclass
+class BulkRun:
+    run_id: str
+    jobs: List[dict]                     # ReportJob을 asdict로
+    max_rounds: int = MAX_ROUNDS
+    round: int = 0                       # 지금 기다리는 회차 (0 = 아직 제출 전)
+    batch_id: str = ""
+    status: str = "pending"              # 마지막으로 본 배치 상태, 끝나면 "done"
+    completed: int = 0
+    failed: int = 0
+    pending: List[int] = field(default_factory=list)       # 이번 회차에 제출한 명렬 index
+    results: Dict[str, dict] = field(default_factory=dict)  # {str(index): 보고서} (JSON 키는 문자열)
+    last_errors: Dict[str, str] = field(default_factory=dict)
+    meta: dict = field(default_factory=dict)                # 화면이 결과를 다시 그릴 때 쓰는 값
+    created: float = field(default_factory=time.time)
+    owner: str = ""                                         # 제출한 사용자(로그인 계정 또는 세션 키)
+
+    @property
+    def done(self) -> bool:
+        return self.status == "done"
+
+    def report_jobs(self) -> List[ReportJob]:
+        return [ReportJob(**job) for job in self.jobs]
+
+    def progress(self) -> BulkStatus:
+        return BulkStatus(
+            round=self.round, batch_id=self.batch_id, status=self.status,
+            completed=self.completed, failed=self.failed, total=len(self.pending),
+        )
+
+
+# 같은 실행을 두 세션이 동시에 폴링해 재제출이 겹치지 않게 (실행별 잠금)
+_run_locks: Dict[str, threading.Lock] = {}
+_run_locks_guard = threading.Lock()
+
+
+def _run_lock(run_id: str) -> threading.Lock:
+    with _run_locks_guard:
+        return _run_locks.setdefault(run_id, threading.Lock())
+
+
+def _run_path(run_id: str) -> Path:
+    return BULK_DIR / f"{run_id}.json"
+
+
+def save_run(run: BulkRun) -> None:
+    BULK_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    path = _run_path(run.run_id)
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    # 학년 수 등에 섞여 들어온 numpy 정수도 그대로 저장
+    data = json.dumps(asdict(run), ensure_ascii=False, default=lambda o: o.item())
+    with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_run(run_id: str, owner: Optional[str] = None) -> Optional[BulkRun]:
+    """owner를 주면 그 사용자가 제출한 실행일 때만 반환."""
+    try:
+        run = BulkRun(**json.loads(_run_path(run_id).read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+    return run if owner is None or run.owner == owner else None
+
+
+def list_runs(owner: Optional[str] = None, include_done: bool = False) -> List[BulkRun]:
+    """보관된 실행 (최근 것부터). 기본은 아직 끝나지 않은 것만, owner를 주면 그 사용자의 것만."""
+    if not BULK_DIR.exists():
+        return []
+    runs = [load_run(p.stem, owner) for p in BULK_DIR.glob("*.json")]
+    runs = [r for r in runs if r is not None and (include_done or not r.done)]
+    return sorted(runs, key=lambda r: r.created, reverse=True)
+
+
+def discard_run(run_id: str, owner: Optional[str] = None) -> None:
+    """보관 기록만 지움 (이미 제출한 배치는 OpenAI 쪽에서 그대로 진행됨). owner가 다르면 그대로 둠."""
+    if owner is not None and load_run(run_id, owner) is None:
+        return
+    _run_path(run_id).unlink(missing_ok=True)
+
+
+def _client(client=None):
+    if client is not None:
+        return client
+    # Batch API는 OpenAI 전용 (OPENAI_BASE_URL로 로컬 대역 서버 지정 가능)
+    from utils.llm_backend import OpenAIBackend, get_backend
+    backend = get_backend()
+    if not isinstance(backend, OpenAIBackend):
+        raise RuntimeError(f"대량 배치 모드는 OpenAI 백엔드에서만 쓸 수 있습니다 (현재: {backend.name})")
+    # 업로드·상태 확인은 동시 요청 제한기를 거치지 않으므로 SDK 재시도를 켜 둠 (연결 풀은 그대로 공유)
+    return backend.client.with_options(max_retries=BATCH_SDK_RETRIES)
+
+
+def _prompt(job: ReportJob) -> str:
+    from utils.ai_report_generator import build_user_prompt
+    return build_user_prompt(
+        job.student_id, job.masked_name, job.year_count,
+        job.seteuk_text, job.haengteuk_text, job.changche_text,
+    )
+
+
+def _cache_key(job: ReportJob) -> str:
+    from utils.ai_report_generator import MODEL, SYSTEM_PROMPT, TEMPERATURE
+    return llm_cache.cache_key(SYSTEM_PROMPT, _prompt(job), MODEL, TEMPERATURE)
+
+
+def _submit_pending(run: BulkRun, client, pending: List[int]) -> None:
+    jobs = run.report_jobs()
+    if not pending or run.round >= run.max_rounds:
+        run.pending, run.batch_id, run.status = [], "", "done"
+        return
+    run.round += 1
+    run.pending = pending
+    run.batch_id = submit(client, {i: jobs[i] for i in pending})
+    run.status, run.completed, run.failed = "submitted", 0, 0
+
+
+def start_bulk(
+    jobs: List[ReportJob],
+    client=None,
+    max_rounds: int = MAX_ROUNDS,
+    meta: Optional[dict] = None,
+    owner: str = "",
+) -> BulkRun:
+    """
+    캐시에 없는 학생만 배치로 제출하고 바로 돌아온다 (기다리지 않음).
+    제출 직후 상태를 디스크에 저장하므로, 이후에는 run_id(와 같은 owner)로 poll_bulk를 불러 이어 간다.
+    """
+    run = BulkRun(run_id=uuid.uuid4().hex[:12], jobs=[asdict(j) for j in jobs],
+                  max_rounds=max_rounds, meta=dict(meta or {}), owner=owner)
+    for i, job in enumerate(jobs):
+        cached = llm_cache.get(_cache_key(job), report=True)
+        if cached is not None:
+            run.results[str(i)] = cached
+    pending = [i for i in range(len(jobs)) if str(i) not in run.results]
+    _submit_pending(run, _client(client) if pending else None, pending)
+    save_run(run)
+    return run
+
+
+def poll_bulk(
+    run_id: str,
+    client=None,
+    on_status: Optional[StatusCallback] = None,
+    owner: Optional[str] = None,
+) -> Optional[BulkRun]:
+    """
+    배치 상태를 한 번 확인한다 (기다리지 않음). 끝났으면 결과를 수거·보완하고,
+    실패·누락된 학생이 남았으면 다음 회차로 다시 제출한다. 바뀐 상태는 저장하고 반환.
+    owner를 주면 다른 사용자의 실행은 건드리지 않고 None.
+    """
+    from utils.ai_report_generator import complete_report
+
+    with _run_lock(run_id):
+        run = load_run(run_id, owner)
+        if run is None or run.done:
+            return run
+        client = _client(client)
+
+        batch = client.batches.retrieve(run.batch_id)
+        counts = getattr(batch, "request_counts", None)
+        run.status = batch.status
+        run.completed = getattr(counts, "completed", 0) or 0
+        run.failed = getattr(counts, "failed", 0) or 0
+        if on_status:
+            on_status(run.progress())
+        if batch.status not in TERMINAL_STATUSES:
+            save_run(run)
+            return run
+
+        jobs = run.report_jobs()
+        reports, errors = collect(client, batch)
+        for i, report in reports.items():
+            if i not in run.pending:
+                continue
+            # 빠지거나 잘못된 항목만 즉시 호출로 보완 (보완도 실패하면 다음 회차에 통째로 재제출)
+            job = jobs[i]
+            try:
+                with llm_ledger.tagged(student_id=job.student_id, attempt=run.round - 1):
+                    report = complete_report(report, _prompt(job), job.student_id, job.masked_name, job.year_count)
+            except Exception as e:
+                errors[i] = str(e)
+                continue
+            run.results[str(i)] = report
+            try:
+                llm_cache.put(_cache_key(job), report)
+            except OSError:
+                pass
+
+        # 오류로 돌아온 것 + 결과 파일에 아예 없는 것(만료·취소) 모두 재제출 대상
+        run.last_errors = {str(i): errors.get(i, f"batch {batch.status}")
+                           for i in run.pending if str(i) not in run.results}
+        _submit_pending(run, client, [int(i) for i in run.last_errors])
+        save_run(run)
+        return run
+
+
+def bulk_reports(run: BulkRun) -> List[dict]:
+    """끝난 실행의 보고서를 명렬 순서대로. 끝내 실패한 학생은 오류 보고서(점수 0)."""
+    from utils.ai_report_generator import error_report
+
+    return [
+        verify_job_report(job, run.results[str(i)]) if str(i) in run.results
+        else error_report(job.student_id, job.masked_name, job.year_count,
+                          RuntimeError(run.last_errors.get(str(i), "")))
+        for i, job in enumerate(run.report_jobs())
+    ]
+
+
+def run_bulk(
+    jobs: List[ReportJob],
+    client=None,
+    poll_seconds: float = POLL_SECONDS,
+    max_rounds: int = MAX_ROUNDS,
+    on_status: Optional[StatusCallback] = None,
+) -> List[dict]:
+    """
+    start_bulk → poll_bulk 반복을 끝까지 기다리는 버전 (벤치마크·스크립트용, 화면에서는 쓰지 않음).
+    캐시에 있는 학생은 제출하지 않고, 실패·누락된 학생만 모아 최대 max_rounds번까지 다시 제출한다.
+    """
+    run = start_bulk(jobs, client, max_rounds)
+    while not run.done:
+        run = poll_bulk(run.run_id, client, on_status)
+        if not run.done and run.status not in TERMINAL_STATUSES:
+            time.sleep(poll_seconds)
+    discard_run(run.run_id)
+    return bulk_reports(run)
@@ -314,8 +314,12 @@ def build_pdf_bytes(
 
             evid = _safe_list(v.get("평가 근거 문장", []))
             evid_rows = [[Paragraph("<b>평가 근거 문장</b>", styles["BodyCustom"])]]
+            # flag 모드에서 원문과 대조되지 않은 근거는 표시해 둠 (drop 모드면 이미 빠져 있음)
+            unmatched = {c.get("quote") for c in report.get("근거 검증", []) or []
+                         if c.get("area") == key and not c.get("matched")}
             for e in evid[:6]:
-                evid_rows.append([Paragraph(f"• {e}", styles["BodyCustom"])])
+                mark = " (원문 미확인)" if e in unmatched else ""
+                evid_rows.append([Paragraph(f"• {e}{mark}", styles["BodyCustom"])])
 
             evid_table = Table(evid_rows, colWidths=[174 * mm])
             evid_table.setStyle(TableStyle([
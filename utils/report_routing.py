@@ -0,0 +1,125 @@
+# utils/report_routing.py
+from __future__ import annotations
+
+import json
+import os
+import statistics
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from utils.prompt_budget import SOURCE_TOKEN_BUDGET
+
+# 학생당 목표 응답 시간(초). 한 번에 생성하면 이보다 오래 걸릴 것 같으면 항목별 동시 생성으로 보냄
+LATENCY_TARGET = float(os.environ.get("SEHWA_LATENCY_TARGET", 45))
+
+# 입력(원문) 토큰 구간별 모델·출력 토큰 상한: [(이 토큰 이하, 모델, max_tokens), ...]
+# SEHWA_ROUTE_TIERS='[[1500, "gpt-4o-mini", 2500], [12000, "gpt-4o-mini", 4000]]' 처럼 바꿀 수 있음
+# 마지막 구간을 넘으면(= SOURCE_TOKEN_BUDGET 초과) 학년·영역별 요약 후 분석
+DEFAULT_TIERS: List[Tuple[int, str, int]] = [
+    (1500, "gpt-4o-mini", 2500),               # 행특 몇 줄 수준: 보고서도 짧게
+    (SOURCE_TOKEN_BUDGET, "gpt-4o-mini", 4000),
+]
+ROUTE_TIERS = [tuple(t) for t in json.loads(os.environ["SEHWA_ROUTE_TIERS"])] \
+    if os.environ.get("SEHWA_ROUTE_TIERS") else DEFAULT_TIERS
+MAP_REDUCE_MODEL = os.environ.get("SEHWA_MAP_REDUCE_MODEL", "gpt-4o-mini")
+MAP_REDUCE_MAX_TOKENS = int(os.environ.get("SEHWA_MAP_REDUCE_MAX_TOKENS", 4000))
+
+# 지연 추정: 고정 지연 + 입력 토큰/입력 속도 + 출력 토큰/출력 속도 (호출 장부로 보정 가능)
+BASE_SECONDS = 1.0
+INPUT_TOKENS_PER_SEC = 5000.0
+OUTPUT_TOKENS_PER_SEC = 60.0
+# 전체 보고서 출력 중 가장 긴 항목 묶음("평가")이 차지하는 비율
+PARALLEL_SLOWEST_SHARE = 0.45
+
+
+@dataclass
+class Route:
+    strategy: str          # single / parallel / map_reduce
+    model: str
+    max_tokens: int
+    input_tokens: int
+    est_seconds: float
+    reason: str
+
+    def describe(self) -> str:
+        label = {"single": "한 번에 분석", "parallel": "항목별 동시 분석", "map_reduce": "학년·영역별 요약 후 분석"}
+        return f"{label.get(self.strategy, self.strategy)} · {self.model} · 예상 {self.est_seconds:.0f}초"
+
+
+@dataclass
+class Speed:
+    base_seconds: float = BASE_SECONDS
+    input_tps: float = INPUT_TOKENS_PER_SEC
+    output_tps: float = OUTPUT_TOKENS_PER_SEC
+
+    def seconds(self, input_tokens: int, output_tokens: int) -> float:
+        return self.base_seconds + input_tokens / self.input_tps + output_tokens / self.output_tps
+
+
+def calibrate(ledger: Optional[pd.DataFrame], model: Optional[str] = None, min_calls: int = 5) -> Speed:
+    """
+    호출 장부의 성공한 비스트리밍 호출(usage가 실제 값인 것)로 출력 속도(토큰/초)를 추정.
+    기록이 min_calls보다 적으면 기본값.
+    """
+    speed = Speed()
+    if ledger is None or ledger.empty:
+        return speed
+    ok = ledger[(ledger["outcome"] == "ok") & (~ledger["tokens_estimated"].astype(bool))
+                & (ledger["completion_tokens"] > 0)]
+    if model:
+        ok = ok[ok["model"].astype(str).str.startswith(model)]
+    if len(ok) < min_calls:
+        return speed
+    rates = [
+        row.completion_tokens / max(0.1, row.latency_ms / 1000 - speed.base_seconds - row.prompt_tokens / speed.input_tps)
+        for row in ok.itertuples()
+    ]
+    speed.output_tps = float(statistics.median(rates))
+    return speed
+
+
+def estimate_output_tokens(max_tokens: int) -> int:
+    # 상한은 잘림 방지용 여유를 둔 값이라, 보고서는 대개 그 절반 안팎에서 끝남
+    return int(max_tokens * 0.5)
+
+
+def route(
+    input_tokens: int,
+    over_budget: bool = False,
+    latency_target: float = LATENCY_TARGET,
+    speed: Optional[Speed] = None,
+    allow_parallel: bool = True,
+    tiers: Optional[List[Tuple[int, str, int]]] = None,
+    strategy: Optional[str] = None,
+) -> Route:
+    """
+    input_tokens: 정리 후 원문 토큰 수(fit_to_budget의 tokens_after)
+    over_budget: 정리해도 상한을 넘어 잘라야 했는지(fit_to_budget의 trimmed) → 요약 후 분석
+    strategy: "single"/"parallel"로 방식을 고정(모델·상한·예상 시간은 그대로 계산). 요약 후 분석이 우선
+    """
+    speed = speed or Speed()
+    tiers = tiers or ROUTE_TIERS
+
+    if over_budget:
+        out = estimate_output_tokens(MAP_REDUCE_MAX_TOKENS)
+        return Route(
+            strategy="map_reduce", model=MAP_REDUCE_MODEL, max_tokens=MAP_REDUCE_MAX_TOKENS,
+            input_tokens=input_tokens,
+            # 요약(동시) 1단계 + 최종 1회. 요약 입력은 조각 상한 기준으로 대략 잡음
+            est_seconds=speed.seconds(min(input_tokens, 4000), 600) + speed.seconds(SOURCE_TOKEN_BUDGET // 2, out),
+            reason=f"입력 {input_tokens:,}토큰 > 상한 {SOURCE_TOKEN_BUDGET:,}",
+        )
+
+    limit, model, max_tokens = next((t for t in tiers if input_tokens <= t[0]), tiers[-1])
+    out = estimate_output_tokens(max_tokens)
+    single = speed.seconds(input_tokens, out)
+    parallel = speed.seconds(input_tokens, int(out * PARALLEL_SLOWEST_SHARE))
+    if strategy == "single" or (strategy is None and (single <= latency_target or not allow_parallel)):
+        reason = "한 번에 선택" if strategy else \
+            f"예상 {single:.0f}초 ≤ 목표 {latency_target:.0f}초" if single <= latency_target else "항목별 동시 생성 꺼짐"
+        return Route("single", model, max_tokens, input_tokens, single, reason)
+    reason = "항목별 동시 선택" if strategy else f"한 번에 생성 예상 {single:.0f}초 > 목표 {latency_target:.0f}초"
+    return Route("parallel", model, max_tokens, input_tokens, parallel, reason)
+
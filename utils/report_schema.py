@@ -0,0 +1,136 @@
+# utils/report_schema.py
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+from utils.json_stream import TopLevelJSONStream
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_OUT_OF = re.compile(r"(-?\d+(?:\.\d+)?)\s*/\s*10(?!\d)")  # "8/10"
+
+# "점수" 항목의 허용 범위 (10점 만점). 벗어나면 고치지 않고 보완 요청 대상으로
+SCORE_RANGE = (0, 10)
+
+
+class ReportSchemaError(ValueError):
+    """보완 요청 후에도 형식이 맞지 않는 항목이 남았을 때. keys에 해당 최상위 항목."""
+
+    def __init__(self, keys: List[str]):
+        super().__init__(f"보고서 형식 오류: {', '.join(keys)}")
+        self.keys = keys
+
+
+class _Mismatch(ValueError):
+    pass
+
+
+# -----------------------------
+# 스키마: SYSTEM_PROMPT의 [출력 형식] 예시 JSON을 그대로 틀로 사용
+# -----------------------------
+def template_from_prompt(prompt: str) -> dict:
+    """프롬프트의 '[출력 형식]' 뒤 JSON 예시를 읽어 틀(dict)로 반환 (프롬프트와 검사 기준이 어긋나지 않게)."""
+    body = prompt.split("[출력 형식]", 1)[-1]
+    return json.loads(body[body.find("{"):body.rfind("}") + 1])
+
+
+def _is_empty(value: Any) -> bool:
+    # 빈 목록은 UI·PDF가 '-'로 그리므로 허용, 빈 문장("종합 평가": "")은 빠진 것으로 봄
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _is_full_mark(text: str, m: re.Match) -> bool:
+    """m이 "10점 만점"·"만점 10점"처럼 만점을 가리키는 숫자인지."""
+    after = text[m.end():].lstrip()
+    after = after[1:].lstrip() if after.startswith("점") else after
+    return after.startswith("만점") or text[:m.start()].rstrip().endswith("만점")
+
+
+def _number_in(text: str):
+    """
+    문자열 속 점수 숫자. "8/10"이면 8, 아니면 만점을 가리키는 숫자를 뺀 나머지가 하나일 때 그것
+    ("10점 만점에 8점" → 8). "7~8점"처럼 하나로 정해지지 않으면 None (애매한 값은 보완 요청으로).
+    """
+    m = _OUT_OF.search(text)
+    if m:
+        return m.group(1)
+    numbers = [m.group() for m in _NUMBER.finditer(text) if not _is_full_mark(text, m)]
+    return numbers[0] if len(numbers) == 1 else None
+
+
+def _conform(value: Any, template: Any, path: str) -> Any:
+    """value를 template 모양으로 맞춰 반환. 고칠 수 있는 것(숫자 문자열·단일 문자열)은 고치고, 아니면 _Mismatch."""
+    if isinstance(template, dict):
+        if not isinstance(value, dict):
+            raise _Mismatch(f"{path}: 객체가 아님")
+        out = dict(value)
+        for key, sub in template.items():
+            if key not in value:
+                raise _Mismatch(f"{path}.{key}: 없음")
+            out[key] = _conform(value[key], sub, f"{path}.{key}")
+        return out
+
+    if isinstance(template, list):
+        if isinstance(value, str) and template and isinstance(template[0], str):
+            value = [value] if value.strip() else []
+        if not isinstance(value, list):
+            raise _Mismatch(f"{path}: 목록이 아님")
+        if not template:
+            return value
+        return [_conform(v, template[0], f"{path}[{i}]") for i, v in enumerate(value)]
+
+    if isinstance(template, (int, float)) and not isinstance(template, bool):
+        # PDF가 int(점수)로 그리므로 "8점" 같은 문자열은 숫자로 바꿔 둠
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            number = value
+        else:
+            found = _number_in(value) if isinstance(value, str) else None
+            if found is None:
+                raise _Mismatch(f"{path}: 숫자 하나로 읽을 수 없음")
+            number = float(found)
+            number = int(number) if number.is_integer() else number
+        if path.endswith("점수") and not SCORE_RANGE[0] <= number <= SCORE_RANGE[1]:
+            raise _Mismatch(f"{path}: {SCORE_RANGE[0]}~{SCORE_RANGE[1]} 범위 밖 ({number})")
+        return number
+
+    if isinstance(template, str):
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        raise _Mismatch(f"{path}: 문자열이 아님")
+
+    return value
+
+
+def validate_report(data: Any, template: dict) -> Tuple[dict, Dict[str, str]]:
+    """
+    보고서를 틀과 비교해 (고친 보고서, {문제 있는 최상위 항목: 사유})를 반환한다.
+    최상위 항목이 없거나 빈 문장("종합 평가": "")이거나 안쪽 키가 빠져도 그 최상위 항목 전체를 문제로 본다.
+    틀에 없는 항목(raw 등)은 그대로 둔다.
+    """
+    report = dict(data) if isinstance(data, dict) else {}
+    problems: Dict[str, str] = {}
+    for key, sub in template.items():
+        if _is_empty(report.get(key)):
+            problems[key] = "없음"
+            continue
+        try:
+            report[key] = _conform(report[key], sub, key)
+        except _Mismatch as e:
+            problems[key] = str(e)
+    return report, problems
+
+
+def salvage_members(text: str) -> dict:
+    """
+    JSON 전체 파싱에 실패한 응답(출력 한도로 잘림 등)에서 끝까지 닫힌 최상위 항목만 건진다.
+    """
+    if not text:
+        return {}
+    text = text.replace("```json", "").replace("```", "")
+    start = text.find("{")
+    if start == -1:
+        return {}
+    return dict(TopLevelJSONStream().feed(text[start:]))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import base64
+import html
 from io import BytesIO
 from typing import Any, Dict, Optional
 
@@ -41,6 +42,30 @@ def _highlight(text, keywords):
             text = text.replace(k, f"<span style='{style}'>{k}</span>")
     return text
 
+def _evidence_html(area, quotes, checks, limit=3):
+    """평가 근거 문장 목록 (앞 limit개). 원문 대조 결과가 있으면 원문 속 일치 구간을 형광펜으로, 못 찾은 문장은 ⚠️로 표시"""
+    shown = quotes[:limit]
+    checks = [c for c in (checks or []) if c.get("area") == area]
+    if not checks:
+        return _list_to_html(shown)
+
+    style = "background:linear-gradient(to top, #fef08a 50%, transparent 50%); font-weight:700;"
+    esc = lambda t: html.escape(str(t)).replace("\n", " ")  # 한 줄 HTML 유지
+    by_quote = {c["quote"]: c for c in checks}
+    items = []
+    for q in shown:
+        c = by_quote.get(q)
+        if c and c.get("matched"):
+            ctx = f"…{esc(c['before'])}<span style='{style}'>{esc(c['text'])}</span>{esc(c['after'])}…"
+            items.append(f"<li style='margin-bottom:6px;'>{esc(q)}<div style='font-size:12px; color:#64748b; margin-top:2px;'>✅ {esc(c['source'])} 원문: {ctx}</div></li>")
+        else:
+            items.append(f"<li style='margin-bottom:6px; color:#b91c1c;'>⚠️ {esc(q)} <span style='font-size:12px;'>(원문에서 찾지 못함)</span></li>")
+    # 제외 여부는 잘라내기 전 전체 목록 기준 (표시 개수 밖의 문장을 '제외됨'으로 세지 않게)
+    dropped = sum(1 for c in checks if not c.get("matched") and c["quote"] not in quotes)
+    if dropped:
+        items.append(f"<li style='margin-bottom:4px; list-style:none; font-size:12px; color:#94a3b8;'>원문과 일치하지 않아 제외된 근거 {dropped}개</li>")
+    return "".join(items) if items else "<li style='margin-bottom:4px;'>-</li>"
+
 def inject_report_css(st=None):
     if st is None: import streamlit as st
     st.markdown("""
@@ -122,7 +147,7 @@ def render_report_modal(st, report: Dict[str, Any], sid: str, sname: str, radar_
             score = _normalize_score(v.get('점수', 0))
             
             # HTML 문자열 한 줄로 연결
-            card_html = f"<div class='detail-card'><div class='detail-head'><span class='detail-title'>{key}</span><div>{_get_star_html(score)} <span style='font-weight:bold; color:#666;'>({score}/10)</span></div></div><div style='font-size:15px; color:#333; margin-bottom:8px;'>{v.get('분석', '-')}</div><div class='evidence-box'><div style='font-weight:800; margin-bottom:5px;'>📢 평가 근거 문장</div><ul style='padding-left:20px; margin:0;'>{_list_to_html(v.get('평가 근거 문장', [])[:3])}</ul></div></div>"
+            card_html = f"<div class='detail-card'><div class='detail-head'><span class='detail-title'>{key}</span><div>{_get_star_html(score)} <span style='font-weight:bold; color:#666;'>({score}/10)</span></div></div><div style='font-size:15px; color:#333; margin-bottom:8px;'>{v.get('분석', '-')}</div><div class='evidence-box'><div style='font-weight:800; margin-bottom:5px;'>📢 평가 근거 문장</div><ul style='padding-left:20px; margin:0;'>{_evidence_html(key, v.get('평가 근거 문장', []), report.get('근거 검증'))}</ul></div></div>"
             st.markdown(card_html, unsafe_allow_html=True)
 
         # 5. 성장 제안
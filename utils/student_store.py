@@ -0,0 +1,110 @@
+# utils/student_store.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.text_builder import get_id_col, normalize_id_series
+
+# 보고서 생성에 필요한 최소 기록 학년 수
+MIN_YEARS = 2
+
+KINDS = ("세특", "행특", "창체")
+
+
+@dataclass
+class StudentRecords:
+    """한 학생의 세특/행특/창체 조각과 사전 계산된 학년 수."""
+    sid: str
+    seteuk: pd.DataFrame
+    haeng: pd.DataFrame
+    chang: pd.DataFrame
+    year_count: int
+
+    @property
+    def eligible(self) -> bool:
+        return self.year_count >= MIN_YEARS
+
+
+def _year_keys(df: pd.DataFrame, keys: pd.Series) -> pd.DataFrame:
+    """(학생, 학년 문자열) 쌍. calc_year_count와 같은 문자열 기준."""
+    if "학년" not in df.columns:
+        return pd.DataFrame(columns=["sid", "year"])
+    years = df["학년"]
+    mask = years.notna().to_numpy()
+    return pd.DataFrame({
+        "sid": keys.to_numpy()[mask],
+        "year": years[mask].astype(str).str.strip().to_numpy(),
+    })
+
+
+class StudentStore:
+    """
+    파싱 직후 한 번 만들어 두는 학생별 인덱스.
+    세 프레임을 정규화된 번호로 묶어 두고, 학생별 조각을 O(1)로 꺼낸다.
+    """
+
+    def __init__(self, df_seteuk: pd.DataFrame, df_haeng: pd.DataFrame, df_chang: pd.DataFrame):
+        self.frames: Dict[str, pd.DataFrame] = {"세특": df_seteuk, "행특": df_haeng, "창체": df_chang}
+        self._positions: Dict[str, Dict[str, np.ndarray]] = {}
+
+        year_pairs = []
+        for kind, df in self.frames.items():
+            id_col = get_id_col(df)
+            if df is None or df.empty or id_col not in df.columns:
+                self._positions[kind] = {}
+                continue
+
+            keys = normalize_id_series(df[id_col])
+            self._positions[kind] = {
+                str(k): v for k, v in keys.groupby(keys, sort=False, observed=True).indices.items()
+            }
+            year_pairs.append(_year_keys(df, keys))
+
+        if year_pairs:
+            pairs = pd.concat(year_pairs, ignore_index=True).drop_duplicates()
+            self.year_counts: Dict[str, int] = pairs.groupby("sid").size().astype(int).to_dict()
+        else:
+            self.year_counts = {}
+
+    def _slice(self, kind: str, sid: str) -> pd.DataFrame:
+        df = self.frames[kind]
+        pos = self._positions[kind].get(sid)
+        if pos is None:
+            return df.iloc[0:0]
+        return df.iloc[pos]
+
+    def get(self, sid) -> StudentRecords:
+        sid = str(sid).strip()
+        return StudentRecords(
+            sid=sid,
+            seteuk=self._slice("세특", sid),
+            haeng=self._slice("행특", sid),
+            chang=self._slice("창체", sid),
+            year_count=self.year_count(sid),
+        )
+
+    def year_count(self, sid) -> int:
+        return int(self.year_counts.get(str(sid).strip(), 0))
+
+    def eligible(self, sid) -> bool:
+        return self.year_count(sid) >= MIN_YEARS
+
+    def student_ids(self) -> List[str]:
+        ids: Dict[str, None] = {}
+        for kind in KINDS:
+            ids.update(dict.fromkeys(self._positions[kind]))
+        return list(ids)
+
+    def eligibility(self, ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """명렬 표에 붙일 학생별 자료 학년 수 / 생성 가능 여부."""
+        ids = self.student_ids() if ids is None else [str(i).strip() for i in ids]
+        counts = [self.year_count(i) for i in ids]
+        return pd.DataFrame({
+            "학번": ids,
+            "자료 학년 수": counts,
+            "생성 가능": [c >= MIN_YEARS for c in counts],
+        })
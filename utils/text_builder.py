@@ -1,7 +1,7 @@
 # utils/text_builder.py
 from __future__ import annotations
 
-from typing import Iterable, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
 import pandas as pd
 
 
@@ -26,6 +26,31 @@ def calc_year_count(*dfs: pd.DataFrame) -> int:
     return len(years)
 
 
+DROP_COLS = {
+    "번호", "학번", "학생번호", "성명", "이름", "학년", "반", "담임",
+    "과목", "영역", "구분", "학기", "연도", "학년도"
+}
+PREFERRED_KW = ["세부", "특기", "행동", "종합", "의견", "창체", "체험", "활동", "기록", "내용", "서술", "요약"]
+
+
+def _text_columns(df: pd.DataFrame) -> List:
+    """텍스트 후보 컬럼 (선호 키워드가 들어간 컬럼이 있으면 그것만)."""
+    cols = [c for c in df.columns if str(c).strip() and str(c) not in DROP_COLS]
+    preferred = [c for c in cols if any(k in str(c) for k in PREFERRED_KW)]
+    return preferred if preferred else cols
+
+
+def _column(df: pd.DataFrame, c) -> pd.Series:
+    s = df[c]
+    if isinstance(s, pd.DataFrame):  # 중복 컬럼명 방어
+        s = s.iloc[:, 0]
+    return s
+
+
+def _is_text_series(s: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)
+
+
 def extract_text(df: Optional[pd.DataFrame]) -> str:
     """
     원문이 '기록이 없음'으로 나오는 빈약 현상을 줄이기 위해,
@@ -34,26 +59,15 @@ def extract_text(df: Optional[pd.DataFrame]) -> str:
     if df is None or df.empty:
         return ""
 
-    drop_cols = {
-        "번호", "학번", "학생번호", "성명", "이름", "학년", "반", "담임",
-        "과목", "영역", "구분", "학기", "연도", "학년도"
-    }
-
-    cols = [c for c in df.columns if str(c).strip() and str(c) not in drop_cols]
-    if not cols:
+    target_cols = _text_columns(df)
+    if not target_cols:
         return ""
 
-    preferred_kw = ["세부", "특기", "행동", "종합", "의견", "창체", "체험", "활동", "기록", "내용", "서술", "요약"]
-    preferred = [c for c in cols if any(k in str(c) for k in preferred_kw)]
-    target_cols = preferred if preferred else cols
-
     blocks = []
     for c in target_cols:
-        s = df[c]
-        if isinstance(s, pd.DataFrame):  # 중복 컬럼명 방어
-            s = s.iloc[:, 0]
+        s = _column(df, c)
 
-        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+        if _is_text_series(s):
             vals = (
                 s.dropna()
                  .astype(str)
@@ -65,3 +79,101 @@ def extract_text(df: Optional[pd.DataFrame]) -> str:
                 blocks.append(f"[{c}]\n" + "\n".join(vals))
 
     return "\n\n".join(blocks).strip()
+
+
+def extract_texts_by_id(df: Optional[pd.DataFrame], ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    extract_text를 학생별로 따로 부르는 것과 같은 결과를, 프레임 전체에 대해
+    컬럼별 벡터 연산 + groupby 한 번으로 만든다. {정규화된 번호: 텍스트}
+    """
+    if df is None or df.empty:
+        return {}
+
+    id_col = get_id_col(df)
+    if id_col not in df.columns:
+        return {}
+
+    keys = normalize_id_series(_column(df, id_col))
+    if ids is not None:
+        mask = keys.isin(set(ids)).to_numpy()
+        df, keys = df[mask], keys[mask]
+
+    blocks: Dict[str, List[str]] = {}
+    for c in _text_columns(df):
+        s = _column(df, c)
+        if not _is_text_series(s):
+            continue
+
+        vals = s.dropna().astype(str).str.strip()
+        vals = vals[(vals != "") & (vals.str.lower() != "nan")]
+        if vals.empty:
+            continue
+
+        joined = vals.groupby(keys[vals.index].to_numpy(), sort=False).agg("\n".join)
+        header = f"[{c}]\n"
+        for sid, text in joined.items():
+            blocks.setdefault(str(sid), []).append(header + text)
+
+    return {sid: "\n\n".join(parts).strip() for sid, parts in blocks.items()}
+
+
+def build_student_texts(
+    df_seteuk: Optional[pd.DataFrame],
+    df_haeng: Optional[pd.DataFrame],
+    df_chang: Optional[pd.DataFrame],
+    ids: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, str]]:
+    """학생별 {"세특": ..., "행특": ..., "창체": ...} 프롬프트 원문을 한 번에 만든다."""
+    per_kind = {
+        "세특": extract_texts_by_id(df_seteuk, ids),
+        "행특": extract_texts_by_id(df_haeng, ids),
+        "창체": extract_texts_by_id(df_chang, ids),
+    }
+
+    all_ids: Dict[str, None] = dict.fromkeys(ids) if ids is not None else {}
+    for texts in per_kind.values():
+        all_ids.update(dict.fromkeys(texts))
+
+    return {
+        sid: {kind: texts.get(sid, "") for kind, texts in per_kind.items()}
+        for sid in all_ids
+    }
+
+
+def _grade_label(value) -> str:
+    try:
+        return f"{int(float(value))}학년"
+    except (TypeError, ValueError):
+        return f"{str(value).strip()}학년"
+
+
+def build_student_sections(
+    df_seteuk: Optional[pd.DataFrame],
+    df_haeng: Optional[pd.DataFrame],
+    df_chang: Optional[pd.DataFrame],
+    ids: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, str]]:
+    """
+    학생별 {"1학년 세특": ..., "2학년 행특": ..., "창체": ...} 처럼 학년·영역 단위로 나눈 원문.
+    학년 정보가 없는 행은 영역 이름만 붙인다. (긴 기록을 나눠 요약할 때 사용)
+    """
+    sections: Dict[str, Dict[str, str]] = {}
+    for kind, df in (("세특", df_seteuk), ("행특", df_haeng), ("창체", df_chang)):
+        if df is None or df.empty:
+            continue
+
+        if "학년" in df.columns:
+            grades = _column(df, "학년")
+            # 학년이 nullable 정수(Int8)면 == 결과에 NA가 섞이므로 False로 채워 bool 마스크로
+            parts = [(_grade_label(g) + " " + kind, df[grades.eq(g).fillna(False).to_numpy(dtype=bool)])
+                     for g in pd.unique(grades.dropna())]
+            parts.sort(key=lambda p: p[0])
+            parts.append((kind, df[grades.isna().fillna(True).to_numpy(dtype=bool)]))
+        else:
+            parts = [(kind, df)]
+
+        for label, part in parts:
+            for sid, text in extract_texts_by_id(part, ids).items():
+                if text:
+                    sections.setdefault(sid, {})[label] = text
+    return sections
@@ -0,0 +1,362 @@
+# utils/xlsx_fast.py
+# openpyxl 없이 xlsx zip 안의 XML(sheetN.xml / sharedStrings.xml / <mergeCells>)을
+# iterparse로 스트리밍해 읽는 빠른 경로.
+# 수식·날짜 셀 등 지원하지 않는 구성을 만나면 UnsupportedLayout을 던지고,
+# 호출 측은 기존 openpyxl/pandas 경로로 되돌아간다 (깨진 XML 등 FALLBACK_ERRORS도 마찬가지).
+from __future__ import annotations
+
+import os
+import posixpath
+import zipfile
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import ParseError, iterparse
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+from openpyxl.utils.cell import coordinate_to_tuple, range_boundaries
+from pandas.io.parsers import TextParser
+
+# 환경변수로 끌 수 있음 (SEHWA_XLSX_FAST_PATH=0)
+FAST_PATH_ENABLED = os.environ.get("SEHWA_XLSX_FAST_PATH", "1") != "0"
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+ROW_TAG = f"{NS}row"
+CELL_TAG = f"{NS}c"
+VALUE_TAG = f"{NS}v"
+FORMULA_TAG = f"{NS}f"
+INLINE_TAG = f"{NS}is"
+TEXT_TAG = f"{NS}t"
+RUN_TAG = f"{NS}r"
+SHEET_DATA_TAG = f"{NS}sheetData"
+MERGE_CELL_TAG = f"{NS}mergeCell"
+
+
+class UnsupportedLayout(Exception):
+    """빠른 경로가 처리하지 않는 시트 구성."""
+
+
+# 빠른 경로에서 이 예외들이 나면 openpyxl 경로로 다시 읽음:
+# 지원하지 않는 구성 + 이상하거나 깨진 XML(파싱 실패·없는 관계·잘못된 좌표 등)
+FALLBACK_ERRORS = (UnsupportedLayout, ParseError, KeyError, IndexError, ValueError)
+
+
+def use_fast(fast: Optional[bool] = None) -> bool:
+    """호출마다 정하는 빠른 경로 사용 여부 (None이면 SEHWA_XLSX_FAST_PATH 설정)."""
+    return FAST_PATH_ENABLED if fast is None else fast
+
+
+# -----------------------------
+# zip 내부 파일 탐색
+# -----------------------------
+def _open_zip(file) -> zipfile.ZipFile:
+    if hasattr(file, "seek"):
+        file.seek(0)
+    try:
+        return zipfile.ZipFile(file)
+    except zipfile.BadZipFile as e:
+        raise UnsupportedLayout(str(e))
+
+
+def _sheet_path(zf: zipfile.ZipFile, active: bool, sheet: Optional[int] = None) -> str:
+    """
+    sheet 번째 시트의 zip 내부 경로.
+    sheet가 None이면 첫 번째(active=False) 또는 활성(active=True) 시트.
+    """
+    wb_root = _parse_whole(zf, "xl/workbook.xml")
+
+    index = sheet or 0
+    if active and sheet is None:
+        view = wb_root.find(f"{NS}bookViews/{NS}workbookView")
+        if view is not None:
+            index = int(view.get("activeTab", 0))
+
+    sheets = wb_root.findall(f"{NS}sheets/{NS}sheet")
+    if index >= len(sheets):
+        raise UnsupportedLayout("sheet index out of range")
+    rid = sheets[index].get(f"{REL_NS}id")
+
+    rels = _parse_whole(zf, "xl/_rels/workbook.xml.rels")
+    for rel in rels.findall(f"{PKG_REL_NS}Relationship"):
+        if rel.get("Id") == rid:
+            if not rel.get("Type", "").endswith("/worksheet"):
+                raise UnsupportedLayout("not a worksheet")
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+
+    raise UnsupportedLayout("worksheet relation not found")
+
+
+def list_sheets(file) -> List[str]:
+    """통합문서의 시트 이름 목록 (workbook.xml 순서)."""
+    zf = _open_zip(file)
+    try:
+        wb_root = _parse_whole(zf, "xl/workbook.xml")
+    finally:
+        zf.close()
+    return [s.get("name") for s in wb_root.findall(f"{NS}sheets/{NS}sheet")]
+
+
+def _parse_whole(zf: zipfile.ZipFile, name: str):
+    try:
+        with zf.open(name) as src:
+            for _, elem in iterparse(src):
+                pass
+    except KeyError:
+        raise UnsupportedLayout(f"{name} missing")
+    return elem
+
+
+def _text_content(node) -> str:
+    """<si>/<is> 의 일반 텍스트 (<t> + <r><t>, 발음 표기 <rPh>는 제외)."""
+    parts = []
+    plain = node.find(TEXT_TAG)
+    if plain is not None and plain.text:
+        parts.append(plain.text)
+    for run in node.findall(RUN_TAG):
+        t = run.find(TEXT_TAG)
+        if t is not None and t.text:
+            parts.append(t.text)
+    return "".join(parts)
+
+
+def _read_shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as src:
+        for _, node in iterparse(src):
+            if node.tag == f"{NS}si":
+                strings.append(_text_content(node).replace("x005F_", ""))
+                node.clear()
+    return strings
+
+
+def _read_date_styles(zf: zipfile.ZipFile) -> set:
+    """날짜 서식이 걸린 cellXfs 인덱스 집합."""
+    if "xl/styles.xml" not in zf.namelist():
+        return set()
+
+    root = _parse_whole(zf, "xl/styles.xml")
+    custom = {
+        int(fmt.get("numFmtId")): fmt.get("formatCode", "")
+        for fmt in root.findall(f"{NS}numFmts/{NS}numFmt")
+    }
+
+    dates = set()
+    for i, xf in enumerate(root.findall(f"{NS}cellXfs/{NS}xf")):
+        fmt_id = int(xf.get("numFmtId", 0))
+        code = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id, "General"))
+        if is_date_format(code):
+            dates.add(i)
+    return dates
+
+
+# -----------------------------
+# 시트 스트리밍
+# -----------------------------
+class SheetStream:
+    """
+    시트 XML을 한 번 스트리밍하며 행 단위로 (열, 값, 형식) 목록을 내보낸다.
+    순회가 끝나면 merged_ranges에 <mergeCells> 범위(min_col, min_row, max_col, max_row)가 채워진다.
+    data_type: 'n'(숫자) / 's'(문자) / 'b'(논리) / 'e'(오류)
+    """
+
+    def __init__(self, file, active: bool = False, data_only: bool = True, sheet: Optional[int] = None):
+        self.zf = _open_zip(file)
+        self.path = _sheet_path(self.zf, active, sheet)
+        self.shared_strings = _read_shared_strings(self.zf)
+        self.date_styles = _read_date_styles(self.zf)
+        self.data_only = data_only
+        self.merged_ranges: List[Tuple[int, int, int, int]] = []
+
+    def close(self) -> None:
+        self.zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cell_value(self, c):
+        data_type = c.get("t", "n")
+
+        if c.find(FORMULA_TAG) is not None and not self.data_only:
+            raise UnsupportedLayout("formula cell")
+
+        if data_type == "inlineStr":
+            node = c.find(INLINE_TAG)
+            return (_text_content(node), "s") if node is not None else (None, "n")
+
+        value = c.findtext(VALUE_TAG) or None
+        if value is None:
+            return None, data_type
+
+        if data_type == "n":
+            if int(c.get("s", 0)) in self.date_styles:
+                raise UnsupportedLayout("date cell")
+            if "." in value or "E" in value or "e" in value:
+                return float(value), "n"
+            return int(value), "n"
+        if data_type == "s":
+            return self.shared_strings[int(value)], "s"
+        if data_type == "str":
+            return value, "s"
+        if data_type == "b":
+            return bool(int(value)), "b"
+        if data_type == "e":
+            return value, "e"
+        raise UnsupportedLayout(f"cell type {data_type}")
+
+    def iter_rows(self) -> Iterator[Tuple[int, List[Tuple[int, object, str]]]]:
+        """(행 번호, [(열 번호, 값, 형식), ...])를 시트 순서대로 내보낸다."""
+        row_counter = 0
+        sheet_data = None
+
+        with self.zf.open(self.path) as src:
+            for event, elem in iterparse(src, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == SHEET_DATA_TAG:
+                        sheet_data = elem
+                    continue
+
+                if elem.tag == ROW_TAG:
+                    r = elem.get("r")
+                    row_counter = int(r) if r else row_counter + 1
+
+                    cells = []
+                    col_counter = 0
+                    for c in elem.iter(CELL_TAG):
+                        ref = c.get("r")
+                        col_counter = coordinate_to_tuple(ref)[1] if ref else col_counter + 1
+                        value, data_type = self._cell_value(c)
+                        cells.append((col_counter, value, data_type))
+
+                    # 처리한 행은 트리에서 떼어내 메모리를 일정하게 유지
+                    if sheet_data is not None:
+                        sheet_data.remove(elem)
+                    yield row_counter, cells
+
+                elif elem.tag == MERGE_CELL_TAG:
+                    self.merged_ranges.append(range_boundaries(elem.get("ref")))
+                    elem.clear()
+
+
+# -----------------------------
+# pandas.read_excel 대체
+# -----------------------------
+def _convert(value, data_type):
+    """pandas openpyxl 엔진의 셀 변환 규칙과 동일."""
+    if value is None:
+        return ""
+    if data_type == "e":
+        return np.nan
+    if data_type == "n":
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+def read_sheet_rows(file, max_rows: Optional[int] = None, sheet: Optional[int] = None) -> List[list]:
+    """시트(기본: 첫 번째)를 pandas(get_sheet_data)와 같은 list-of-rows 형태로 읽는다."""
+    data: List[list] = []
+    last_row_with_data = -1
+
+    with SheetStream(file, sheet=sheet) as stream:
+        for row_idx, cells in stream.iter_rows():
+            # 빠진 행은 빈 행으로 채움
+            while len(data) < row_idx - 1:
+                data.append([])
+                if max_rows is not None and len(data) >= max_rows:
+                    break
+            if max_rows is not None and len(data) >= max_rows:
+                break
+
+            row = [""] * max((col for col, _, _ in cells), default=0)
+            for col, value, data_type in cells:
+                row[col - 1] = _convert(value, data_type)
+            while row and row[-1] == "":
+                row.pop()
+            if row:
+                last_row_with_data = len(data)
+            data.append(row)
+
+            if max_rows is not None and len(data) >= max_rows:
+                break
+
+    data = data[: last_row_with_data + 1]
+    if data:
+        width = max(len(r) for r in data)
+        data = [r + [""] * (width - len(r)) for r in data]
+    return data
+
+
+def read_excel_fast(
+    file,
+    skiprows: Optional[int] = None,
+    nrows: Optional[int] = None,
+    dtype=None,
+    sheet: Optional[int] = None,
+) -> pd.DataFrame:
+    """pd.read_excel(file, sheet_name=sheet, header=None, skiprows=..., nrows=..., dtype=...)와 같은 결과."""
+    rows_needed = None if nrows is None else (skiprows or 0) + nrows
+    data = read_sheet_rows(file, max_rows=rows_needed, sheet=sheet)
+    if not data:
+        return pd.DataFrame()
+
+    parser = TextParser(
+        data,
+        header=None,
+        dtype=dtype,
+        skiprows=skiprows,
+        nrows=nrows,
+        skip_blank_lines=False,
+    )
+    return parser.read(nrows=nrows)
+
+
+def read_excel(file, sheet: Optional[int] = None, fast: Optional[bool] = None, **kwargs) -> pd.DataFrame:
+    """가능하면 빠른 경로, 아니면 pd.read_excel(header=None). fast=False면 항상 pd.read_excel."""
+    if use_fast(fast):
+        try:
+            return read_excel_fast(file, sheet=sheet, **kwargs)
+        except FALLBACK_ERRORS:
+            pass
+
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return pd.read_excel(file, sheet_name=sheet or 0, header=None, **kwargs)
+
+
+# -----------------------------
+# 병합셀 스캔 (세특)
+# -----------------------------
+def scan_merged_cells(
+    file,
+    keep: Callable[[str], bool],
+    sheet: Optional[int] = None,
+) -> Tuple[list, Dict[Tuple[int, int], str]]:
+    """
+    시트(기본: 활성 시트)를 한 번 스트리밍하여 (병합 범위 목록, keep(text)를 만족하는 셀 값)을 반환.
+    값은 openpyxl(data_only=False)로 읽었을 때의 str(value)와 같다.
+    """
+    candidates: Dict[Tuple[int, int], str] = {}
+
+    with SheetStream(file, active=True, data_only=False, sheet=sheet) as stream:
+        for row_idx, cells in stream.iter_rows():
+            for col, value, _ in cells:
+                if value is None:
+                    continue
+                text = str(value)
+                if keep(text):
+                    candidates[(row_idx, col)] = text
+        ranges = list(stream.merged_ranges)
+
+    return ranges, candidates